@@ -0,0 +1,153 @@
+# app/ai_cache.py
+"""
+ai node cevapları için iki katmanlı cache.
+
+Anahtar: sha256(provider, base_url, path, istek gövdesi) — model, mesajlar ve
+temperature gibi tüm parametreler gövdede olduğu için byte-identical istek aynı
+anahtarı üretir.
+
+- Bellek katmanı: TTLCache (LRU + TTL), process başına.
+- Disk katmanı: ai_response_cache tablosu; process'ler ve restart'lar arasında
+  paylaşılır. Diskten gelen cevap belleğe alınır.
+- Eviction: TTL (expires_at) ve AI_CACHE_DB_MAX_ENTRIES; her AI_CACHE_PRUNE_EVERY
+  yazmada bir, en uzun süredir kullanılmayan kayıtlar silinir.
+
+Workflow.ai_cache_enabled=False veya node data'da "cache": false ise cache atlanır.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.cache import TTLCache
+from app.config import settings
+from app.db import AsyncReadSessionLocal, run_write
+
+
+def ai_cache_key(provider: Optional[str], base_url: Optional[str], path: str, payload: Dict[str, Any]) -> str:
+    canonical = json.dumps(
+        [provider or "", base_url or "", path, payload],
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    def __init__(self):
+        self.memory = TTLCache(maxsize=settings.AI_CACHE_MEMORY_SIZE, ttl=settings.AI_CACHE_TTL_SECONDS)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        now = datetime.utcnow()
+        async with AsyncReadSessionLocal() as db:
+            value = (
+                await db.execute(
+                    select(models.AIResponseCache.response).where(
+                        models.AIResponseCache.key == key,
+                        models.AIResponseCache.expires_at > now,
+                    )
+                )
+            ).scalar_one_or_none()
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self.memory.set(key, value)
+        # Tekrarlayan hit'ler bellekten döner; disk LRU bilgisi sadece diskten okunduğunda güncellenir
+        await run_write(lambda session: self._touch(session, key, now))
+        return value
+
+    async def set(self, key: str, provider: Optional[str], model: Optional[str], response: Any) -> None:
+        self.memory.set(key, response)
+        self.writes += 1
+        prune = self.writes % max(1, settings.AI_CACHE_PRUNE_EVERY) == 0
+
+        async def _store(session: AsyncSession) -> None:
+            now = datetime.utcnow()
+            stmt = sqlite_insert(models.AIResponseCache).values(
+                key=key,
+                provider=provider,
+                model=model,
+                response=response,
+                hits=0,
+                created_at=now,
+                last_used_at=now,
+                expires_at=now + timedelta(seconds=settings.AI_CACHE_TTL_SECONDS),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[models.AIResponseCache.key],
+                set_={
+                    "response": stmt.excluded.response,
+                    "last_used_at": stmt.excluded.last_used_at,
+                    "expires_at": stmt.excluded.expires_at,
+                },
+            )
+            await session.execute(stmt)
+            if prune:
+                await prune_ai_cache(session)
+
+        await run_write(_store)
+
+    @staticmethod
+    async def _touch(session: AsyncSession, key: str, now: datetime) -> None:
+        await session.execute(
+            update(models.AIResponseCache)
+            .where(models.AIResponseCache.key == key)
+            .values(hits=models.AIResponseCache.hits + 1, last_used_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    def clear_memory(self) -> None:
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+async def prune_ai_cache(session: AsyncSession) -> int:
+    """Süresi dolan kayıtları ve AI_CACHE_DB_MAX_ENTRIES üstündeki en eski kullanılanları siler."""
+    table = models.AIResponseCache
+    result = await session.execute(
+        delete(table).where(table.expires_at <= datetime.utcnow()).execution_options(synchronize_session=False)
+    )
+    removed = result.rowcount or 0
+
+    total = (await session.execute(select(func.count()).select_from(table))).scalar_one()
+    overflow = total - settings.AI_CACHE_DB_MAX_ENTRIES
+    if overflow > 0:
+        oldest = select(table.key).order_by(table.last_used_at).limit(overflow)
+        result = await session.execute(
+            delete(table)
+            .where(table.key.in_(oldest.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        removed += result.rowcount or 0
+    return removed
+
+
+ai_cache = AIResponseCache()
@@ -0,0 +1,219 @@
+# app/blobstore.py
+"""
+Diskte içerik-adresli (sha256) blob deposu.
+
+Büyük run input/output'ları workflow_runs tablosuna gömülmez; JSON gövdesi
+BLOB_STORE_DIR altına sha256 adıyla bir kez yazılır, run satırında sadece
+referans tutulur:
+    {"$blob": "<sha256>", "size": 123456, "content_type": "application/json"}
+
+Aynı içerik kaç run'da geçerse geçsin diskte tek kopyadır; `blobs` tablosundaki
+refcount, referans veren satır sayısını tutar. refcount'u 0'a düşen blob'lar
+gc_blobs() ile (python -m app.maintenance gc-blobs) silinir.
+
+GC ile eşzamanlı run'lar: offload_payload var olan dosyayı yeniden yazmaz ama mtime'ını
+tazeler; gc_blobs grace süresinden yeni dosyalara dokunmaz ve satırı sadece refcount hâlâ
+<= 0 ise siler. retain_payload dosya yoksa BlobMissingError ile açıkça hata verir
+(referansı olmayan dosyaya işaret eden run satırı yazılmaz).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+
+BLOB_REF_KEY = "$blob"
+JSON_CONTENT_TYPE = "application/json"
+
+
+class BlobMissingError(RuntimeError):
+    """Referans verilen blob dosyası diskte yok (ör. GC ile yarışta silindi)."""
+
+
+class BlobStore:
+    """sha256 -> <root>/<ilk 2>/<sonraki 2>/<sha256> dosya düzeni."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path_for(digest))
+
+    def write(self, data: bytes) -> Tuple[str, int]:
+        """İçeriği yazar (zaten varsa sadece mtime'ını tazeler) ve (sha256, boyut) döner."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        try:
+            # Yeni referans geliyor: gc_blobs grace süresi boyunca bu dosyayı silmesin
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Yarım dosya görünmesin: geçici dosyaya yaz, sonra atomik rename
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        return digest, len(data)
+
+    def read(self, digest: str) -> bytes:
+        with open(self.path_for(digest), "rb") as fh:
+            return fh.read()
+
+    def delete(self, digest: str) -> bool:
+        try:
+            os.unlink(self.path_for(digest))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def iter_digests(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.startswith(".tmp-"):
+                    yield name, os.path.join(dirpath, name)
+
+
+blob_store = BlobStore(settings.BLOB_STORE_DIR)
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and BLOB_REF_KEY in value
+
+
+def blob_digest(value: Any) -> Optional[str]:
+    return value[BLOB_REF_KEY] if is_blob_ref(value) else None
+
+
+async def offload_payload(value: Any) -> Any:
+    """
+    JSON değeri BLOB_INLINE_MAX_BYTES'tan büyükse blob store'a yazar ve referans döner,
+    küçükse değeri aynen döner. Dosya yazımı transaction dışında yapılır; refcount'u
+    retain_payload() yazma transaction'ı içinde artırır.
+    """
+    if value is None or is_blob_ref(value):
+        return value
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    if len(data) <= settings.BLOB_INLINE_MAX_BYTES:
+        return value
+    digest, size = await asyncio.to_thread(blob_store.write, data)
+    return {BLOB_REF_KEY: digest, "size": size, "content_type": JSON_CONTENT_TYPE}
+
+
+async def retain_payload(session: AsyncSession, value: Any) -> None:
+    """
+    Referanssa blobs.refcount'u bir artırır (satır yoksa oluşturur).
+    Dosya diskte yoksa BlobMissingError: çağıranın transaction'ı geri alınır.
+    """
+    digest = blob_digest(value)
+    if digest is None:
+        return
+    stmt = sqlite_insert(models.Blob).values(
+        sha256=digest,
+        size=value.get("size", 0),
+        refcount=1,
+        created_at=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Blob.sha256],
+        set_={"refcount": models.Blob.refcount + 1},
+    )
+    await session.execute(stmt)
+    if not blob_store.exists(digest):
+        raise BlobMissingError(f"Blob {digest} is missing from the blob store")
+
+
+async def release_payload(session: AsyncSession, value: Any) -> None:
+    """Referanssa refcount'u bir azaltır; dosya gc_blobs() ile silinir."""
+    digest = blob_digest(value)
+    if digest is None:
+        return
+    await session.execute(
+        update(models.Blob)
+        .where(models.Blob.sha256 == digest)
+        .values(refcount=models.Blob.refcount - 1)
+    )
+
+
+async def discard_payload(session: AsyncSession, value: Any) -> None:
+    """
+    offload_payload ile yazılıp hiç retain edilmeyen referansı geri alır (yazma işi içinde).
+    blobs satırı yoksa (başka referans yok) dosya hemen silinir; varsa refcount'a dokunulmaz,
+    dosyayı gerekirse gc_blobs siler.
+    """
+    digest = blob_digest(value)
+    if digest is None:
+        return
+    row = (await session.execute(select(models.Blob.sha256).where(models.Blob.sha256 == digest))).first()
+    if row is None:
+        await asyncio.to_thread(blob_store.delete, digest)
+
+
+async def resolve_payload(value: Any) -> Any:
+    """Referanssa blob'u okuyup JSON olarak döner; değilse değeri aynen döner."""
+    digest = blob_digest(value)
+    if digest is None:
+        return value
+    data = await asyncio.to_thread(blob_store.read, digest)
+    return json.loads(data)
+
+
+def _older_than(digest: str, cutoff: float) -> bool:
+    try:
+        return os.path.getmtime(blob_store.path_for(digest)) < cutoff
+    except FileNotFoundError:
+        return True
+
+
+def gc_blobs(db: Session, orphan_grace_seconds: int = 3600) -> Dict[str, int]:
+    """
+    refcount <= 0 olan blob'ları diskten ve tablodan siler. Tabloda hiç kaydı olmayan
+    (ör. yazıldıktan sonra transaction'ı düşen) ve grace süresinden eski dosyaları da temizler.
+
+    Satırlar yazma transaction'ı içinde `refcount <= 0` tekrar kontrol edilerek silinir
+    (arada retain_payload ile referans alan blob silinmez); dosyalar sadece gerçekten
+    silinen satırlar için ve commit'ten sonra silinir. Grace süresinden yeni dosyalar
+    (offload_payload'ın az önce yazdığı / tazelediği) atlanır.
+    """
+    cutoff = time.time() - orphan_grace_seconds
+    candidates = [
+        digest
+        for digest in db.execute(select(models.Blob.sha256).where(models.Blob.refcount <= 0)).scalars().all()
+        if _older_than(digest, cutoff)
+    ]
+    digests: list = []
+    if candidates:
+        digests = db.execute(
+            delete(models.Blob)
+            .where(models.Blob.sha256.in_(candidates), models.Blob.refcount <= 0)
+            .returning(models.Blob.sha256)
+        ).scalars().all()
+    db.commit()
+    deleted_files = sum(1 for digest in digests if blob_store.delete(digest))
+
+    known = set(db.execute(select(models.Blob.sha256)).scalars().all())
+    orphans = 0
+    for digest, path in blob_store.iter_digests():
+        if digest not in known and os.path.getmtime(path) < cutoff:
+            os.unlink(path)
+            orphans += 1
+
+    return {"released": len(digests), "deleted_files": deleted_files, "orphans": orphans}
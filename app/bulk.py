@@ -0,0 +1,303 @@
+# app/bulk.py
+"""
+Toplu export / import (admin).
+
+Export: sorgu server-side cursor ile (yield_per) EXPORT_YIELD_PER satırlık
+parçalar halinde okunur, her parça NDJSON veya CSV olarak hemen istemciye yazılır.
+Tablo ne kadar büyük olursa olsun bellekte tek parça kadar satır bulunur.
+
+Import: istek gövdesi (NDJSON veya CSV) önce SpooledTemporaryFile'a aktarılır
+(küçükse bellekte, büyükse diskte), yazma kuyruğunu tutmadan thread'de tamamen
+doğrulanır. Doğrulanmış kayıtlar IMPORT_BATCH_SIZE'lık batch'ler halinde ikinci bir
+spool'a pickle'lanır; tek run_write işi bunları thread'de açıp executemany INSERT'lerle
+yazar (yazma sırasında event loop'ta parse / şema doğrulaması yapılmaz).
+Herhangi bir satır hata verirse işin tamamı geri alınır.
+"""
+import asyncio
+import csv
+import io
+import json
+import pickle
+import tempfile
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, IO, Iterator, List, Optional, Sequence, Type
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Select, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.config import settings
+from app.db import AsyncReadSessionLocal
+from app.scheduler import TIMER_NODE_TYPES
+from app.workflow_nodes import node_rows
+
+NDJSON = "ndjson"
+CSV = "csv"
+JSON_ARRAY = "json"
+MEDIA_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv", JSON_ARRAY: "application/json"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+# ============================================================
+# Export
+# ============================================================
+async def export_rows(
+    query: Select,
+    columns: Sequence[str],
+    fmt: str,
+    to_dict: Optional[Callable[[Any], Dict[str, Any]]] = None,
+) -> AsyncIterator[str]:
+    """
+    query'nin satırlarını parça parça NDJSON / CSV / JSON dizisi metnine çevirir.
+    to_dict verilmezse satır, columns sırasıyla dict'e çevrilir.
+    Okuma bağlantısı export boyunca açık kalır (WAL sayesinde tutarlı anlık görüntü, yazmaları bloklamaz).
+    """
+    to_dict = to_dict or (lambda row: dict(zip(columns, row)))
+    async with AsyncReadSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_YIELD_PER))
+        if fmt == CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            async for partition in result.partitions():
+                writer.writerows([_csv_cell(row.get(column)) for column in columns] for row in map(to_dict, partition))
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        elif fmt == JSON_ARRAY:
+            # Tek JSON dizisi, ama yine parça parça yazılır
+            opened = False
+            async for partition in result.partitions():
+                body = ",".join(json.dumps(to_dict(row), ensure_ascii=False, default=_json_default) for row in partition)
+                yield ("," if opened else "[") + body
+                opened = True
+            yield "]" if opened else "[]"
+        else:
+            async for partition in result.partitions():
+                yield "".join(
+                    json.dumps(to_dict(row), ensure_ascii=False, default=_json_default) + "\n" for row in partition
+                )
+
+
+# ============================================================
+# Import
+# ============================================================
+class ImportRecordError(ValueError):
+    def __init__(self, line: int, message: str):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+def import_format(request: Request) -> str:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return CSV
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json", ""):
+        return NDJSON
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Body must be NDJSON (application/x-ndjson) or CSV (text/csv)",
+    )
+
+
+async def spool_body(request: Request) -> IO[bytes]:
+    """İstek gövdesini bellek sınırı aşılınca diske taşan geçici dosyaya akıtır."""
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.IMPORT_SPOOL_MEMORY_BYTES)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.IMPORT_MAX_BYTES:
+            spool.close()
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Import body exceeds {settings.IMPORT_MAX_BYTES} bytes",
+            )
+        spool.write(chunk)
+    return spool
+
+
+def iter_records(spool: IO[bytes], fmt: str, schema: Type[BaseModel]) -> Iterator[Dict[str, Any]]:
+    """Dosyayı baştan okuyup her kaydı şemayla doğrulanmış dict olarak üretir (sabit bellek)."""
+    spool.seek(0)
+    text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+    try:
+        if fmt == CSV:
+            rows = ((index + 2, row) for index, row in enumerate(csv.DictReader(text)))  # 1. satır başlık
+        else:
+            rows = _ndjson_rows(text)
+        for line, raw in rows:
+            if fmt == CSV:
+                raw = _csv_record(line, raw, schema)
+            if not isinstance(raw, dict):
+                raise ImportRecordError(line, "record must be an object")
+            try:
+                record = schema(**raw).dict()
+            except ValidationError as exc:
+                first = exc.errors()[0]
+                field = ".".join(str(part) for part in first.get("loc", ()))
+                raise ImportRecordError(line, f"{field}: {first.get('msg')}" if field else first.get("msg"))
+            yield record
+    except UnicodeDecodeError:
+        raise ImportRecordError(0, "body is not valid UTF-8")
+    finally:
+        text.detach()  # wrapper kapanırken spool'u kapatmasın
+
+
+def _csv_record(line: int, raw: Dict[str, Any], schema: Type[BaseModel]) -> Dict[str, Any]:
+    record = {key: (value if value != "" else None) for key, value in raw.items() if key}
+    # CSV'de JSON olarak yazılmış kolonlar (ör. graph_json)
+    for key in getattr(schema, "json_fields", ()):
+        if isinstance(record.get(key), str):
+            try:
+                record[key] = json.loads(record[key])
+            except ValueError:
+                raise ImportRecordError(line, f"'{key}' is not valid JSON")
+    return record
+
+
+def _ndjson_rows(text) -> Iterator[tuple]:
+    for line, raw_line in enumerate(text, start=1):
+        raw_line = raw_line.strip()
+        if not raw_line:
+            continue
+        try:
+            yield line, json.loads(raw_line)
+        except ValueError:
+            raise ImportRecordError(line, "invalid JSON")
+
+
+def validate_records(spool: IO[bytes], fmt: str, schema: Type[BaseModel], batches: IO[bytes]) -> int:
+    """
+    Tüm kayıtları doğrular ve sayar (thread'de çalıştırılır); hata varsa ImportRecordError.
+    Doğrulanmış kayıtlar IMPORT_BATCH_SIZE'lık listeler halinde `batches`'e pickle'lanır.
+    """
+    count = 0
+    for batch in _batches(iter_records(spool, fmt, schema), settings.IMPORT_BATCH_SIZE):
+        count += len(batch)
+        if count > settings.IMPORT_MAX_ROWS:
+            raise ImportRecordError(count, f"import is limited to {settings.IMPORT_MAX_ROWS} records")
+        pickle.dump(batch, batches, protocol=pickle.HIGHEST_PROTOCOL)
+    batches.seek(0)
+    return count
+
+
+def _batches(records: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load_batch(batches: IO[bytes]) -> Optional[List[Dict[str, Any]]]:
+    try:
+        return pickle.load(batches)
+    except EOFError:
+        return None
+
+
+async def read_batches(batches: IO[bytes]) -> AsyncIterator[List[Dict[str, Any]]]:
+    """validate_records'un yazdığı batch'leri sırayla (thread'de açarak) verir."""
+    while True:
+        batch = await asyncio.to_thread(_load_batch, batches)
+        if batch is None:
+            return
+        yield batch
+
+
+async def import_workflows(
+    session: AsyncSession, batches: IO[bytes], timer_workflow_ids: Optional[List[int]] = None
+) -> Dict[str, int]:
+    """
+    Workflow'ları executemany ile ekler (run_write içinde, tek transaction).
+    workflow_nodes satırları da aynı batch'te yazılır; FTS index'i trigger'larla güncellenir.
+    timer_workflow_ids verilirse timer node'u olan aktif workflow'ların id'leri eklenir
+    (commit sonrası scheduler'a bildirilsin diye).
+    """
+    workflow = models.Workflow
+    stmt = insert(workflow).returning(workflow.id, sort_by_parameter_order=True)
+    totals = {"workflows": 0, "nodes": 0}
+    async for batch in read_batches(batches):
+        now = datetime.utcnow()
+        for record in batch:
+            record["created_at"] = record.get("created_at") or now
+            record["updated_at"] = now
+            record["version"] = 1
+        ids = (await session.execute(stmt, batch)).scalars().all()
+        nodes = []
+        for workflow_id, record in zip(ids, batch):
+            rows = node_rows(record.get("graph_json"))
+            nodes.extend({"workflow_id": workflow_id, "node_id": node_id, **fields} for node_id, fields in rows.items())
+            if timer_workflow_ids is not None and record.get("is_active", True):
+                if any(fields["type"] in TIMER_NODE_TYPES for fields in rows.values()):
+                    timer_workflow_ids.append(workflow_id)
+        if nodes:
+            await session.execute(insert(models.WorkflowNode), nodes)
+        totals["workflows"] += len(ids)
+        totals["nodes"] += len(nodes)
+    return totals
+
+
+async def import_users(session: AsyncSession, batches: IO[bytes], skip_existing: bool) -> Dict[str, int]:
+    """Kullanıcıları executemany ile ekler; skip_existing iken var olan email'ler atlanır."""
+    user = models.User
+    stmt = sqlite_insert(user)
+    if skip_existing:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[user.email])
+    stmt = stmt.returning(user.id)
+    totals = {"users": 0, "skipped": 0}
+    async for batch in read_batches(batches):
+        now = datetime.utcnow()
+        for record in batch:
+            record["created_at"] = record.get("created_at") or now
+        inserted = len((await session.execute(stmt, batch)).all())
+        totals["users"] += inserted
+        totals["skipped"] += len(batch) - inserted
+    return totals
+
+
+async def run_import(
+    request: Request,
+    schema: Type[BaseModel],
+    write: Callable[[IO[bytes]], Any],
+) -> Dict[str, int]:
+    """
+    Gövdeyi spool'la, yazma kuyruğunu tutmadan doğrula, sonra doğrulanmış batch'leri
+    `write(batches)` ile yaz.
+    """
+    fmt = import_format(request)
+    spool = await spool_body(request)
+    batches = tempfile.SpooledTemporaryFile(max_size=settings.IMPORT_SPOOL_MEMORY_BYTES)
+    try:
+        try:
+            count = await asyncio.to_thread(validate_records, spool, fmt, schema, batches)
+        except ImportRecordError as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+        finally:
+            spool.close()
+        if count == 0:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No records to import")
+        return await write(batches)
+    finally:
+        batches.close()
@@ -0,0 +1,88 @@
+# app/chat.py
+"""
+Chat yardımcıları: mesaj ekleme, model bağlamı ve asistan cevabının stream edilmesi.
+
+Konuşma hiçbir zaman bütünüyle belleğe alınmaz: modele sadece son
+CHAT_CONTEXT_MESSAGES mesaj (session_id, id) index'i üzerinden geriye doğru okunup
+gönderilir, cevap da provider'dan geldikçe parça parça istemciye aktarılır.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.config import settings
+from app.http_clients import http_clients
+from app.integrations import auth_headers, get_credential, get_provider
+
+
+class ChatError(Exception):
+    """Provider bulunamadı / hata döndü; stream içinde error event'ine çevrilir."""
+
+
+async def append_messages(session: AsyncSession, session_id: int, messages: List[Dict[str, str]]) -> List[models.ChatMessage]:
+    """Mesajları tek flush'ta (toplu INSERT) ekler; çağıranın transaction'ı içinde."""
+    rows = [models.ChatMessage(session_id=session_id, role=m["role"], content=m["content"]) for m in messages]
+    session.add_all(rows)
+    await session.flush()
+    return rows
+
+
+async def recent_messages(db: AsyncSession, session_id: int, limit: int) -> List[Dict[str, str]]:
+    """Son `limit` mesaj, eskiden yeniye (model bağlamı için)."""
+    result = await db.execute(
+        select(models.ChatMessage.role, models.ChatMessage.content)
+        .where(models.ChatMessage.session_id == session_id)
+        .order_by(models.ChatMessage.id.desc())
+        .limit(limit)
+    )
+    return [{"role": row.role, "content": row.content} for row in reversed(result.all())]
+
+
+async def stream_completion(
+    user_id: Optional[int],
+    messages: List[Dict[str, str]],
+    provider_ref: Optional[str] = None,
+    model: Optional[str] = None,
+    **options: Any,
+) -> AsyncIterator[str]:
+    """
+    OpenAI uyumlu /chat/completions isteğini stream=True ile atar,
+    gelen SSE satırlarındaki içerik parçalarını (delta.content) sırayla üretir.
+    """
+    provider = await get_provider(provider_ref or settings.CHAT_DEFAULT_PROVIDER)
+    if provider is None:
+        raise ChatError(f"Integration provider not found: {provider_ref or settings.CHAT_DEFAULT_PROVIDER}")
+    credential = await get_credential(user_id, provider.id)
+
+    payload: Dict[str, Any] = {"model": model or settings.CHAT_DEFAULT_MODEL, "messages": messages, "stream": True}
+    payload.update({key: value for key, value in options.items() if value is not None})
+
+    async with http_clients.stream(
+        "POST",
+        "/chat/completions",
+        key=provider.name,
+        base_url=provider.base_url,
+        headers=auth_headers(credential),
+        json=payload,
+    ) as response:
+        if response.is_redirect or response.status_code >= 400:
+            # Provider client'ı yönlendirme takip etmez; 3xx de hatadır
+            await response.aread()
+            raise ChatError(f"POST {response.request.url} -> HTTP {response.status_code}")
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data)
+            except ValueError:
+                continue
+            for choice in chunk.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    yield delta
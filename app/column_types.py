@@ -0,0 +1,89 @@
+# app/column_types.py
+"""
+Özel SQLAlchemy kolon tipleri.
+
+CompressedJSON: JSON değerini saklar; serileştirilmiş hali COMPRESS_MIN_BYTES'tan
+büyükse zlib ile sıkıştırılmış BLOB olarak, küçükse düz JSON metni olarak yazar.
+Eski (sıkıştırılmamış) satırlar olduğu gibi okunur, yani geçiş kademelidir;
+toplu dönüştürme için: python -m app.maintenance compress-json
+
+Decode sadece kolon SELECT edildiğinde yapılır; listeleme/ETag sorguları bu
+kolonları hiç seçmediği için büyük graph'lar o yollarda açılmaz.
+
+RawJSONBytes: aynı kolonu parse etmeden, JSON metninin UTF-8 byte'ları olarak okur
+(sıkıştırılmışsa sadece zlib açılır). Cevaba olduğu gibi eklenir (app/serialization.py):
+    select(type_coerce(models.Workflow.graph_json, RawJSONBytes()).label("graph_json"))
+"""
+import json
+import zlib
+from typing import Any, Optional, Union
+
+from sqlalchemy.types import Text, TypeDecorator
+
+from app.config import settings
+
+# Sıkıştırılmış değerlerin başındaki işaret (codec + format sürümü)
+ZLIB_MAGIC = b"ZJ1:"
+
+
+def encode_json(value: Any) -> Union[str, bytes]:
+    """Değeri saklanacak hale getirir: küçükse str (JSON), büyükse ZLIB_MAGIC + zlib bytes."""
+    text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    raw = text.encode("utf-8")
+    if len(raw) < settings.JSON_COMPRESS_MIN_BYTES:
+        return text
+    return ZLIB_MAGIC + zlib.compress(raw, settings.JSON_COMPRESS_LEVEL)
+
+
+def decode_json(stored: Union[str, bytes, memoryview, None]) -> Any:
+    if stored is None:
+        return None
+    if isinstance(stored, memoryview):
+        stored = stored.tobytes()
+    if isinstance(stored, bytes):
+        if stored.startswith(ZLIB_MAGIC):
+            stored = zlib.decompress(stored[len(ZLIB_MAGIC):])
+        return json.loads(stored)
+    return json.loads(stored)
+
+
+def json_bytes(stored: Union[str, bytes, memoryview, None]) -> Optional[bytes]:
+    """Saklanan değeri json.loads etmeden JSON metni (UTF-8 bytes) olarak döner."""
+    if stored is None:
+        return None
+    if isinstance(stored, memoryview):
+        stored = stored.tobytes()
+    if isinstance(stored, bytes):
+        if stored.startswith(ZLIB_MAGIC):
+            return zlib.decompress(stored[len(ZLIB_MAGIC):])
+        return stored
+    return stored.encode("utf-8")
+
+
+def is_compressed(stored: Optional[Union[str, bytes]]) -> bool:
+    return isinstance(stored, (bytes, memoryview)) and bytes(stored[: len(ZLIB_MAGIC)]) == ZLIB_MAGIC
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON kolonu; büyük değerleri şeffaf şekilde sıkıştırır. None -> SQL NULL."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[Union[str, bytes]]:
+        if value is None:
+            return None
+        return encode_json(value)
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        return decode_json(value)
+
+
+class RawJSONBytes(TypeDecorator):
+    """CompressedJSON kolonunu sadece okumak için: değer parse edilmez, JSON bytes döner."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_result_value(self, value: Any, dialect) -> Optional[bytes]:
+        return json_bytes(value)
@@ -1,5 +1,7 @@
 # app/config.py
 import os
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 
 
@@ -14,5 +16,188 @@ class Settings(BaseSettings):
     # Varsayılan: ./data/flowmind.db
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./data/flowmind.db")
 
+    # SQLite storage profili (her bağlantıda PRAGMA olarak uygulanır)
+    SQLITE_JOURNAL_MODE: str = "WAL"        # okuyucular yazıcıyı beklemez
+    SQLITE_SYNCHRONOUS: str = "NORMAL"      # WAL'da güvenli; fsync sadece checkpoint'te
+    SQLITE_CACHE_SIZE_KB: int = 64_000      # bağlantı başına page cache
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5_000
+    # Yeni DB'lerde silinen sayfalar PRAGMA incremental_vacuum ile geri verilebilsin
+    # (var olan DB için bir kez: python -m app.maintenance enable-incremental-vacuum)
+    SQLITE_AUTO_VACUUM: str = "INCREMENTAL"
+    # Sadece okuma yapan bağlantı havuzu
+    SQLITE_READ_POOL_SIZE: int = 8
+    # Group-commit: tek transaction'da birleştirilecek en fazla yazma işi
+    WRITE_BATCH_MAX: int = 64
+    # CompressedJSON kolonları: bu boyuttan büyük JSON'lar zlib ile sıkıştırılır
+    JSON_COMPRESS_MIN_BYTES: int = 1024
+    JSON_COMPRESS_LEVEL: int = 6
+
+    # ===========================
+    # Blob store (büyük run input/output'ları)
+    # ===========================
+    BLOB_STORE_DIR: str = "./data/blobs"
+    # Bu boyuttan büyük run payload'ları tabloya değil blob store'a yazılır
+    BLOB_INLINE_MAX_BYTES: int = 64 * 1024
+
+    # ===========================
+    # Auth
+    # ===========================
+    # get_current_user için token -> kullanıcı cache'i.
+    # Cache process başına tutulur: pasifleştirme / silme sadece değişikliği yapan process'te
+    # anında düşer; diğer process'ler (uvicorn worker'ları, app.worker) pasif / silinmiş
+    # kullanıcının token'ını en fazla TTL kadar daha kabul eder. Bu yüzden kısa tutulur.
+    AUTH_USER_CACHE_SIZE: int = 10_000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 10.0
+    # Admin yazma endpoint'leri X-Admin-Token header'ında bu değeri ister; boşsa kapalıdır (403)
+    ADMIN_API_TOKEN: str = ""
+    # scrypt parametreleri (değişirse eski hash'ler sonraki login'de yenilenir)
+    PASSWORD_SCRYPT_N: int = 2 ** 14
+    PASSWORD_SCRYPT_R: int = 8
+    PASSWORD_SCRYPT_P: int = 1
+    # Parola hash'leme process havuzu; dolu kuyrukta istekler 429 ile reddedilir
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    # ===========================
+    # Listeleme / sayfalama
+    # ===========================
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
+    # ===========================
+    # Workflow çalıştırma
+    # ===========================
+    # Bir run içinde aynı anda koşabilecek varsayılan node sayısı
+    RUN_MAX_CONCURRENCY: int = 8
+    # İstekle gelebilecek en yüksek concurrency değeri
+    RUN_MAX_CONCURRENCY_LIMIT: int = 64
+    # Derlenmiş graph cache'inde tutulacak workflow sayısı
+    GRAPH_CACHE_SIZE: int = 512
+
+    # ===========================
+    # Run kuyruğu / worker
+    # ===========================
+    RUN_MAX_ATTEMPTS: int = 3
+    # Retry bekleme süresi: base * 2^(deneme-1), en fazla max
+    RUN_RETRY_BACKOFF_SECONDS: float = 5.0
+    RUN_RETRY_BACKOFF_MAX_SECONDS: float = 300.0
+    # Worker bu süre içinde heartbeat atmazsa iş başka worker'a geçer (visibility timeout)
+    RUN_LEASE_SECONDS: float = 60.0
+    # Tek seferde çekilecek (ve aynı anda koşacak) run sayısı
+    WORKER_BATCH_SIZE: int = 4
+    WORKER_POLL_INTERVAL_SECONDS: float = 1.0
+    # API process'i içinde çalışan worker sayısı (0 -> sadece `python -m app.worker`)
+    RUN_EMBEDDED_WORKERS: int = 1
+
+    # ===========================
+    # Run event stream (SSE / WebSocket)
+    # ===========================
+    # Run başına hafızada tutulan son event sayısı (geç bağlanan / kopan client replay'i)
+    RUN_EVENT_BUFFER_SIZE: int = 256
+    # Run bittikten sonra event buffer'ının hafızada kalma süresi
+    RUN_EVENT_RETENTION_SECONDS: float = 60.0
+    # Run başka process'te koşuyorsa durum, run başına tek poller ile bu aralıkla okunur
+    RUN_EVENT_POLL_SECONDS: float = 1.0
+    # Boşta bağlantıyı canlı tutmak için keepalive aralığı
+    RUN_EVENT_KEEPALIVE_SECONDS: float = 15.0
+
+    # ===========================
+    # Dış HTTP istekleri (http / ai node'ları)
+    # ===========================
+    # Provider başına havuz limitleri; bağlantılar keep-alive ile tekrar kullanılır
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 30.0
+    # `h2` paketi kuruluysa HTTP/2 açılır, değilse HTTP/1.1 ile devam edilir
+    HTTP2_ENABLED: bool = True
+    # Provider adına göre override, ör. {"openai": {"read_timeout": 120, "max_connections": 50}}
+    HTTP_PROVIDER_LIMITS: Dict[str, Dict[str, float]] = {}
+    # IntegrationProvider kayıtları nadiren değişir; node başına DB'ye gidilmesin
+    PROVIDER_CACHE_TTL_SECONDS: float = 300.0
+    # True -> kendi credential'ı olmayan kullanıcılar paylaşılan (user_id NULL) kaydı kullanır.
+    # Bu kayıtları sadece admin oluşturur; açmak o anahtarı tüm kullanıcılara açar.
+    INTEGRATION_SHARED_CREDENTIALS: bool = False
+
+    # ===========================
+    # AI cevap cache'i (bellek + SQLite)
+    # ===========================
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    # Bellek katmanı (LRU) ve disk katmanı kayıt sınırları
+    AI_CACHE_MEMORY_SIZE: int = 1000
+    AI_CACHE_DB_MAX_ENTRIES: int = 50_000
+    # Her N yazmada bir süresi dolan / fazla kayıtlar silinir
+    AI_CACHE_PRUNE_EVERY: int = 200
+
+    # ===========================
+    # Node output memo (değişmeyen node'lar yeniden çalışmaz)
+    # ===========================
+    NODE_MEMO_ENABLED: bool = True
+    # (workflow, node) başına saklanan en yeni memo sayısı
+    NODE_MEMO_KEEP_PER_NODE: int = 5
+
+    # ===========================
+    # Scheduler (timer / cron node'ları)
+    # ===========================
+    SCHEDULER_ENABLED: bool = True
+    # Lider bu süre içinde lock'u yenilemezse başka process liderliği alır
+    SCHEDULER_LOCK_TTL_SECONDS: float = 30.0
+    # Başka process'lerde değişen workflow'ları yakalamak için updated_at kontrol aralığı
+    SCHEDULER_SYNC_SECONDS: float = 10.0
+
+    # ===========================
+    # Tam metin arama (SQLite FTS5)
+    # ===========================
+    # Snippet'te eşleşme etrafında gösterilen token sayısı
+    SEARCH_SNIPPET_TOKENS: int = 12
+    # offset sınırı: derin sayfalar yerine sorgunun daraltılması beklenir
+    SEARCH_MAX_OFFSET: int = 1000
+
+    # ===========================
+    # Chat
+    # ===========================
+    # Asistan cevabı üretilirken modele gönderilen son mesaj sayısı
+    CHAT_CONTEXT_MESSAGES: int = 50
+    # Tek istekte eklenebilecek mesaj sayısı
+    CHAT_APPEND_MAX_BATCH: int = 100
+    CHAT_DEFAULT_PROVIDER: str = "openai"
+    CHAT_DEFAULT_MODEL: str = "gpt-4o-mini"
+
+    # ===========================
+    # Toplu export / import (admin)
+    # ===========================
+    # Export'ta server-side cursor'dan tek seferde çekilen satır sayısı
+    EXPORT_YIELD_PER: int = 500
+    # Import'ta tek executemany'deki kayıt sayısı
+    IMPORT_BATCH_SIZE: int = 500
+    IMPORT_MAX_ROWS: int = 100_000
+    IMPORT_MAX_BYTES: int = 512 * 1024 * 1024
+    # Gövde bu boyuta kadar bellekte, üstü geçici dosyada tutulur
+    IMPORT_SPOOL_MEMORY_BYTES: int = 8 * 1024 * 1024
+
+    # ===========================
+    # Admin istatistikleri (trigger'lı sayaçlar)
+    # ===========================
+    # Sayaçların tablolardan yeniden hesaplanma aralığı (0 -> kapalı)
+    STATS_RECONCILE_SECONDS: float = 3600.0
+
+    # ===========================
+    # Run geçmişi saklama (app/retention.py)
+    # ===========================
+    # Workflow başına saklanan en yeni bitmiş run sayısı (0 -> sınırsız)
+    RUN_RETENTION_KEEP_PER_WORKFLOW: int = 1000
+    # Bundan eski bitmiş run'lar günlük özetlere toplanıp silinir (0 -> süresiz)
+    RUN_RETENTION_DAYS: int = 30
+    # Tek write işinde sıkıştırılan run sayısı
+    RUN_RETENTION_BATCH_SIZE: int = 500
+    # Arka plan sıkıştırma aralığı (0 -> kapalı)
+    RUN_RETENTION_INTERVAL_SECONDS: float = 3600.0
+    # Her turda dosyaya geri verilecek en fazla boş sayfa (0 -> incremental_vacuum yok)
+    RUN_RETENTION_VACUUM_PAGES: int = 2000
+
 
 settings = Settings()
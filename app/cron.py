@@ -0,0 +1,103 @@
+# app/cron.py
+"""
+Küçük cron ifadesi çözücü (5 alan, UTC):
+
+    dakika  saat  ayın-günü  ay  haftanın-günü
+    */5     *     *          *   *
+    0       9     *          *   1-5
+    30      2     1,15       *   *
+
+Desteklenen sözdizimi: *, sayı, a-b, */n, a-b/n, virgülle liste.
+Haftanın günü 0-7 (0 ve 7 = pazar). Ayın günü ve haftanın günü ikisi de
+kısıtlıysa klasik cron gibi "ikisinden biri" eşleşmesi yeterlidir.
+"""
+from datetime import datetime, timedelta
+from typing import FrozenSet, Tuple
+
+
+class CronError(ValueError):
+    pass
+
+
+_FIELDS: Tuple[Tuple[str, int, int], ...] = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+
+
+def _parse_field(text: str, name: str, low: int, high: int) -> FrozenSet[int]:
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f"Invalid step in {name} field: {text}")
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise CronError(f"Invalid range in {name} field: {text}")
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = end = int(part)
+            if step != 1:
+                end = high
+        else:
+            raise CronError(f"Invalid {name} field: {text}")
+        if start < low or end > high or start > end:
+            raise CronError(f"{name} field out of range: {text}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    __slots__ = ("expression", "minutes", "hours", "days", "months", "weekdays", "_day_any", "_weekday_any")
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise CronError(f"Cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        fields = [_parse_field(part, *spec) for part, spec in zip(parts, _FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        # cron'da 7 de pazar; Python'da pazartesi=0 olduğu için burada cron biçiminde (pazar=0) tutulur
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        self._day_any = parts[2] == "*"
+        self._weekday_any = parts[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self._day_any or self._weekday_any:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """after'dan kesin sonraki ilk eşleşen dakika."""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+                continue
+            if moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+                continue
+            return moment
+        raise CronError(f"Cron expression never fires: {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
@@ -1,49 +1,289 @@
 # app/db.py
+"""
+Veritabanı katmanı (SQLite).
+
+Storage profili:
+- Her bağlantıda WAL + synchronous/cache_size/mmap_size/busy_timeout PRAGMA'ları.
+- Okuma ve yazma için ayrı bağlantı havuzları:
+    * read engine  -> PRAGMA query_only, çok bağlantı (get_db bunu verir)
+    * write engine -> tek bağlantı, BEGIN IMMEDIATE
+- Tüm yazmalar WriteQueue üzerinden gider: kuyrukta biriken küçük işler tek
+  transaction'da (her biri kendi SAVEPOINT'inde) çalışır ve tek fsync ile commit edilir.
+"""
+import asyncio
 import os
-from sqlalchemy import create_engine
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateColumn
 
 from app.config import settings
 
+T = TypeVar("T")
+
+
+def _is_memory_url(url: str) -> bool:
+    return url.rstrip("/") in ("sqlite:", "sqlite+aiosqlite:") or ":memory:" in url
+
+
+def _ensure_sqlite_dir(url: str) -> None:
+    # Örnek: sqlite:///./data/flowmind.db  ->  ./data/flowmind.db
+    raw_path = url.split(":///", 1)[-1]
+
+    db_dir = os.path.dirname(raw_path)
+    if db_dir and not os.path.exists(db_dir):
+        # data/ klasörü yoksa oluştur
+        os.makedirs(db_dir, exist_ok=True)
+
+
+def _install_sqlite_profile(sync_engine: Engine, readonly: bool = False) -> None:
+    """
+    Storage profilini engine'e bağlar.
+    pysqlite/aiosqlite'ın kendi transaction yönetimi kapatılır (SAVEPOINT'lerin
+    doğru çalışması için) ve BEGIN'i biz atarız.
+    """
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        if not readonly:
+            # Sadece henüz tablo yoksa etkili; var olan DB'de VACUUM'a kadar bekler
+            cursor.execute(f"PRAGMA auto_vacuum = {settings.SQLITE_AUTO_VACUUM}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        # negatif değer = KiB cinsinden
+        cursor.execute(f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        if readonly:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    @event.listens_for(sync_engine, "begin")
+    def _on_begin(conn):
+        # Yazıcı kilidi transaction başında alınır -> sonradan "database is locked" yok
+        conn.exec_driver_sql("BEGIN" if readonly else "BEGIN IMMEDIATE")
+
 
 def _create_engine():
     url = settings.DATABASE_URL
     connect_args = {}
 
     if url.startswith("sqlite"):
-        # Örnek: sqlite:///./data/flowmind.db  ->  ./data/flowmind.db
-        raw_path = url.replace("sqlite:///", "", 1)
-
-        db_dir = os.path.dirname(raw_path)
-        if db_dir and not os.path.exists(db_dir):
-            # data/ klasörü yoksa oluştur
-            os.makedirs(db_dir, exist_ok=True)
+        _ensure_sqlite_dir(url)
 
         # SQLite için gerekli
         connect_args = {"check_same_thread": False}
 
-    return create_engine(url, connect_args=connect_args)
+    sync_engine = create_engine(url, connect_args=connect_args)
+    if url.startswith("sqlite"):
+        _install_sqlite_profile(sync_engine)
+    return sync_engine
+
+
+def _async_url(url: str) -> str:
+    """sqlite:///... -> sqlite+aiosqlite:///... (driver zaten belirtilmişse dokunma)."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    return url
+
+
+def create_async_engines(url: str, tuned: bool = True) -> Tuple[AsyncEngine, AsyncEngine]:
+    """
+    (write_engine, read_engine) çiftini üretir.
+    tuned=False: varsayılan SQLite davranışı (benchmark'ta "önce" ölçümü için).
+    In-memory veritabanında iki havuz aynı veriyi göremeyeceği için tek engine döner.
+    """
+    url = _async_url(url)
+    if url.startswith("sqlite"):
+        _ensure_sqlite_dir(url)
+
+    if not tuned or not url.startswith("sqlite") or _is_memory_url(url):
+        single = create_async_engine(url)
+        return single, single
+
+    # aiosqlite varsayılanı NullPool (her istekte yeni bağlantı + PRAGMA'lar);
+    # bağlantılar havuzda tutulur. SQLite tek yazıcı kabul ettiği için yazma havuzu tek bağlantı.
+    write_engine = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    _install_sqlite_profile(write_engine.sync_engine)
+
+    read_engine = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+    )
+    _install_sqlite_profile(read_engine.sync_engine, readonly=True)
+    return write_engine, read_engine
 
 
+class WriteQueue:
+    """
+    Tek yazıcılı group-commit kuyruğu.
+
+    submit(fn) ile verilen her `async fn(session)` işi kuyruğa girer. Arka plandaki
+    tek worker, o an kuyrukta bekleyen işleri (en fazla max_batch) alır, her birini
+    kendi SAVEPOINT'inde çalıştırır ve hepsini tek commit ile diske yazar. Bir işin
+    hatası sadece kendi SAVEPOINT'ini geri alır; hata submit() çağırana fırlatılır.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, max_batch: int = 64):
+        self._session_factory = session_factory
+        self._max_batch = max(1, max_batch)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        return self._queue
+
+    async def submit(self, fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((fn, future))
+        return await future
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            # Önceki commit sürerken biriken işler aynı transaction'a katılır
+            while len(batch) < self._max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch: List[Tuple[Callable, asyncio.Future]]) -> None:
+        results: List[Tuple[asyncio.Future, Any, Optional[BaseException]]] = []
+        try:
+            async with self._session_factory() as session:
+                for fn, future in batch:
+                    if future.done():  # çağıran iptal etmiş
+                        continue
+                    try:
+                        async with session.begin_nested():
+                            value = await fn(session)
+                    except Exception as exc:
+                        results.append((future, None, exc))
+                    else:
+                        results.append((future, value, None))
+                await session.commit()
+        except Exception as exc:
+            # Commit başarısız -> batch'teki hiçbir iş kalıcı olmadı
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for future, value, exc in results:
+            if future.done():
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(value)
+
+
+# Sync engine: init_db ve script'ler için
 engine = _create_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine'ler: tüm router'lar bunları kullanır (aiosqlite)
+async_engine, async_read_engine = create_async_engines(settings.DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,  # commit sonrası response için tekrar SELECT atılmasın
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+write_queue = WriteQueue(AsyncSessionLocal, max_batch=settings.WRITE_BATCH_MAX)
+
 Base = declarative_base()
 
 
-def get_db():
-    """FastAPI dependency: request başına DB session üretir."""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """
+    FastAPI dependency: request başına okuma session'ı üretir.
+    Yazmalar bu session ile değil run_write() ile yapılır.
+    """
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def run_write(fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """Yazma işini group-commit kuyruğuna verir ve sonucunu bekler."""
+    return await write_queue.submit(fn)
+
+
+async def dispose_engines() -> None:
+    await write_queue.close()
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
+
+def _sync_schema(conn: Connection) -> None:
+    """
+    Hafif migration: create_all var olan tablolara dokunmadığı için
+    modele sonradan eklenen kolonları (ALTER TABLE ADD COLUMN) ve index'leri ekler.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            # NOT NULL kolonlar için modelde server_default verilmeli
+            column_ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}")
+
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
 
 
 def init_db():
-    """Uygulama açılışında tabloları oluştur."""
+    """Uygulama açılışında tabloları oluştur, eksik kolon/index'leri ekle."""
     # modelleri import et ki Base metadata dolsun
     from app import models  # noqa: F401
+    from app.search import install_search
+    from app.stats import install_stat_triggers
 
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        _sync_schema(conn)
+        install_search(conn)
+        install_stat_triggers(conn)
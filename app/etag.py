@@ -0,0 +1,86 @@
+# app/etag.py
+"""
+Workflow'lar için strong ETag üretimi ve If-None-Match / If-Match kontrolü.
+
+Tek workflow'un ETag'i (id, version) çiftinden türetilir; bu yüzden 304 kararı
+graph_json okunmadan, sadece version kolonu ile verilebilir. Liste sayfalarının
+ETag'i sayfadaki (id, version) çiftlerinin özetidir.
+"""
+import hashlib
+from typing import Any, Iterable, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.pagination import keyset_page, split_page
+
+ETAG_HEADER = "ETag"
+
+
+def workflow_etag(workflow_id: int, version: int) -> str:
+    return f'"wf-{workflow_id}-v{version}"'
+
+
+def page_etag(rows: Iterable[Any], next_cursor: Optional[str] = None) -> str:
+    """Sayfadaki kayıtların (id, version) çiftlerinden ETag üretir."""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(f"{row.id}:{row.version};".encode("ascii"))
+    digest.update((next_cursor or "").encode("ascii"))
+    return f'"page-{digest.hexdigest()}"'
+
+
+def _etag_list(header: str):
+    return [part.strip() for part in header.split(",") if part.strip()]
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """If-None-Match eşleşiyor mu (weak karşılaştırma, RFC 9110 13.1.2)."""
+    if not header:
+        return False
+    candidates = _etag_list(header)
+    if "*" in candidates:
+        return True
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def check_if_match(header: Optional[str], etag: str) -> None:
+    """If-Match verilmiş ve eşleşmiyorsa 412 fırlatır (strong karşılaştırma)."""
+    if not header:
+        return
+    candidates = _etag_list(header)
+    if "*" in candidates or etag in candidates:
+        return
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Workflow was modified (ETag mismatch)",
+        headers={ETAG_HEADER: etag},
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag})
+
+
+async def probe_workflow_page_etag(
+    db: AsyncSession,
+    conditions: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+) -> str:
+    """
+    Listeleme sayfasının ETag'ini sadece (id, version, created_at) okuyarak hesaplar.
+    If-None-Match eşleşirse sayfanın geri kalanı (graph_json dahil) hiç okunmaz.
+    """
+    query = keyset_page(
+        select(models.Workflow.id, models.Workflow.version, models.Workflow.created_at).where(*conditions),
+        models.Workflow.created_at,
+        models.Workflow.id,
+        cursor,
+        limit,
+    )
+    result = await db.execute(query)
+    rows, next_cursor = split_page(result.all(), limit)
+    return page_etag(rows, next_cursor)
@@ -0,0 +1,226 @@
+# app/events.py
+"""
+Run event'leri için process içi pub/sub.
+
+Executor ve run kuyruğu event'leri publish() ile yayınlar; SSE ve WebSocket
+client'ları subscribe() ile dinler. Her run için tek bir kanal vardır:
+
+- Event'ler kanalın sınırlı replay buffer'ına (RUN_EVENT_BUFFER_SIZE) eklenir,
+  abone başına kuyruk tutulmaz. Aboneler buffer'dan kendi son seq'lerinden
+  sonrasını okur; geç bağlanan veya kopup `Last-Event-ID` ile dönen client
+  kaçırdıklarını buradan alır.
+- Run bu process'te koşmuyorsa (ör. `python -m app.worker`) kanal için tek bir
+  DB poller başlatılır; kaç client izlerse izlesin SQLite'a run başına bir sorgu gider.
+
+Event biçimi: {"seq", "run_id", "type", "node_id", "data", "ts"}
+"""
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from sqlalchemy import select
+
+from app import models
+from app.config import settings
+from app.db import AsyncReadSessionLocal
+
+RUN_STARTED = "run.started"
+RUN_RETRY = "run.retry"
+RUN_FINISHED = "run.finished"
+RUN_STATUS = "run.status"
+NODE_STARTED = "node.started"
+NODE_LOG = "node.log"
+NODE_OUTPUT = "node.output"
+NODE_FINISHED = "node.finished"
+STREAM_GAP = "stream.gap"
+
+TERMINAL_STATUSES = ("success", "failed")
+
+
+class _Channel:
+    __slots__ = ("run_id", "buffer", "seq", "local", "closed", "subscribers", "poller", "changed", "expire_handle")
+
+    def __init__(self, run_id: int):
+        self.run_id = run_id
+        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=settings.RUN_EVENT_BUFFER_SIZE)
+        self.seq = 0
+        self.local = False          # run bu process'te mi koşuyor (event'leri executor mu üretiyor)
+        self.closed = False
+        self.subscribers = 0
+        self.poller: Optional[asyncio.Task] = None
+        self.changed = asyncio.Event()
+        self.expire_handle: Optional[asyncio.TimerHandle] = None
+
+
+class RunEventHub:
+    def __init__(self):
+        self._channels: Dict[int, _Channel] = {}
+
+    def _channel(self, run_id: int) -> _Channel:
+        channel = self._channels.get(run_id)
+        if channel is None:
+            channel = self._channels[run_id] = _Channel(run_id)
+        return channel
+
+    # ------------------------------------------------------------
+    # Yayın tarafı
+    # ------------------------------------------------------------
+    def publish(
+        self,
+        run_id: Optional[int],
+        type: str,
+        node_id: Optional[str] = None,
+        local: bool = True,
+        **data: Any,
+    ) -> None:
+        if run_id is None:
+            return
+        channel = self._channel(run_id)
+        if local and not channel.local:
+            channel.local = True
+            if channel.poller is not None:
+                channel.poller.cancel()
+                channel.poller = None
+        if channel.expire_handle is not None:
+            # Retry sonrası aynı run tekrar koşuyor
+            channel.expire_handle.cancel()
+            channel.expire_handle = None
+            channel.closed = False
+        channel.seq += 1
+        channel.buffer.append(
+            {
+                "seq": channel.seq,
+                "run_id": run_id,
+                "type": type,
+                "node_id": node_id,
+                "data": data,
+                "ts": datetime.utcnow().isoformat(),
+            }
+        )
+        # Bekleyen tüm aboneleri tek seferde uyandır
+        channel.changed.set()
+        channel.changed = asyncio.Event()
+
+    def close(self, run_id: int) -> None:
+        """Run bitti: aboneler kalan event'leri okuyup çıkar, buffer bir süre daha tutulur."""
+        channel = self._channels.get(run_id)
+        if channel is None or channel.closed:
+            return
+        channel.closed = True
+        channel.changed.set()
+        channel.changed = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        channel.expire_handle = loop.call_later(settings.RUN_EVENT_RETENTION_SECONDS, self._expire, run_id)
+
+    def detach(self, run_id: int) -> None:
+        """Run kuyruğa geri döndü (retry); başka process alabilir, izleyen varsa poller devralır."""
+        channel = self._channels.get(run_id)
+        if channel is None or channel.closed:
+            return
+        channel.local = False
+        if channel.subscribers == 0:
+            # İzleyen yok: abone çıkışındaki gibi kanal bırakılır (kimse poller başlatmayacak)
+            self._channels.pop(run_id, None)
+        elif channel.poller is None:
+            channel.poller = asyncio.create_task(self._poll(channel))
+
+    def _expire(self, run_id: int) -> None:
+        channel = self._channels.get(run_id)
+        if channel is None:
+            return
+        channel.expire_handle = None
+        if channel.closed and channel.subscribers == 0:
+            del self._channels[run_id]
+
+    # ------------------------------------------------------------
+    # Dinleme tarafı
+    # ------------------------------------------------------------
+    async def subscribe(
+        self,
+        run_id: int,
+        after_seq: int = 0,
+        keepalive: Optional[float] = None,
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        after_seq'ten sonraki event'leri sırayla verir; run bitince biter.
+        keepalive verilirse o süre boyunca event gelmezse None verir (bağlantı canlı tutma).
+        """
+        channel = self._channel(run_id)
+        channel.subscribers += 1
+        if not channel.local and not channel.closed and channel.poller is None:
+            channel.poller = asyncio.create_task(self._poll(channel))
+        # Kanal bu arada yeniden oluşmuşsa (seq baştan başladıysa) client'ın seq'i geçersizdir
+        last = after_seq if after_seq <= channel.seq else 0
+        try:
+            while True:
+                waiter = channel.changed
+                if channel.buffer and channel.buffer[0]["seq"] > last + 1 and last < channel.seq:
+                    # Buffer'dan taşan event'ler kaçırıldı; client tam durumu ayrıca çekmeli
+                    yield self._gap_event(channel, last)
+                for event in list(channel.buffer):
+                    if event["seq"] > last:
+                        last = event["seq"]
+                        yield event
+                if channel.closed:
+                    return
+                try:
+                    await asyncio.wait_for(waiter.wait(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            channel.subscribers -= 1
+            if channel.subscribers == 0:
+                if channel.poller is not None:
+                    channel.poller.cancel()
+                    channel.poller = None
+                if not channel.local and not channel.closed:
+                    self._channels.pop(run_id, None)
+                elif channel.closed and channel.expire_handle is None:
+                    self._expire(run_id)
+
+    @staticmethod
+    def _gap_event(channel: _Channel, last: int) -> Dict[str, Any]:
+        return {
+            "seq": channel.buffer[0]["seq"] - 1,
+            "run_id": channel.run_id,
+            "type": STREAM_GAP,
+            "node_id": None,
+            "data": {"missed_from": last + 1, "missed_to": channel.buffer[0]["seq"] - 1},
+            "ts": datetime.utcnow().isoformat(),
+        }
+
+    async def _poll(self, channel: _Channel) -> None:
+        """Başka process'te koşan run için durum değişikliklerini yayınlar (kanal başına tek)."""
+        run = models.WorkflowRun
+        last_state = None
+        while True:
+            async with AsyncReadSessionLocal() as db:
+                row = (
+                    await db.execute(
+                        select(run.status, run.attempts, run.error_message).where(run.id == channel.run_id)
+                    )
+                ).first()
+            if row is None:
+                self.publish(channel.run_id, RUN_FINISHED, local=False, status="not_found")
+                self.close(channel.run_id)
+                return
+            state = (row.status, row.attempts)
+            if state != last_state:
+                last_state = state
+                if row.status in TERMINAL_STATUSES:
+                    self.publish(channel.run_id, RUN_FINISHED, local=False, status=row.status, error=row.error_message)
+                    self.close(channel.run_id)
+                    return
+                self.publish(channel.run_id, RUN_STATUS, local=False, status=row.status, attempts=row.attempts)
+            await asyncio.sleep(settings.RUN_EVENT_POLL_SECONDS)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "channels": len(self._channels),
+            "subscribers": sum(channel.subscribers for channel in self._channels.values()),
+            "pollers": sum(1 for channel in self._channels.values() if channel.poller is not None),
+        }
+
+
+run_events = RunEventHub()
@@ -0,0 +1,464 @@
+# app/executor.py
+"""
+Workflow çalıştırma motoru.
+
+graph_json topolojik sıraya göre işlenir; bağımlılıkları biten her node hemen
+başlatılır. Böylece birbirinden bağımsız dallar asyncio üzerinde paralel koşar
+ve geniş bir fan-out graph'ın süresi, tüm node'ların toplamı yerine en uzun
+yolun süresine yaklaşır. Aynı anda koşan node sayısı run başına sınırlıdır.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import httpx
+from sqlalchemy import select
+
+from app import models
+from app.ai_cache import ai_cache, ai_cache_key
+from app.blobstore import resolve_payload
+from app.config import settings
+from app.db import AsyncReadSessionLocal
+from app.events import NODE_FINISHED, NODE_LOG, NODE_OUTPUT, NODE_STARTED, run_events
+from app.graph import CompiledGraph, CompiledNode, GraphError, compile_graph, get_compiled_graph
+from app.http_clients import http_clients
+from app.integrations import RunCredentials, auth_headers, get_credential, get_provider
+from app.memo import RunMemo, stable_hash
+
+logger = logging.getLogger(__name__)
+
+
+class NodeExecutionError(Exception):
+    """Bir node çalışırken hata verdiğinde run'ı durdurur."""
+
+    def __init__(self, node_id: str, original: BaseException):
+        self.node_id = node_id
+        self.original = original
+        super().__init__(f"Node '{node_id}' failed: {original}")
+
+
+class NonRetryableError(Exception):
+    """Tekrar denemeyle düzelmeyecek node hatası (ör. dış servisten 4xx)."""
+
+
+@dataclass
+class RunContext:
+    """Node handler'larına geçirilen run bilgisi."""
+
+    run_id: Optional[int] = None
+    workflow_id: Optional[int] = None
+    user_id: Optional[int] = None
+    input_data: Dict[str, Any] = field(default_factory=dict)
+    # Workflow.ai_cache_enabled
+    ai_cache: bool = True
+    # Run başında toplu yüklenen credential'lar (yoksa node başına okunur)
+    credentials: Optional[RunCredentials] = None
+    # Node output memo'su (None -> her node çalışır)
+    memo: Optional[RunMemo] = None
+
+    def log(self, node_id: str, message: str, **data: Any) -> None:
+        """Handler'ların canlı event stream'e log satırı basması için."""
+        run_events.publish(self.run_id, NODE_LOG, node_id, message=message, **data)
+
+
+# handler(ctx, node, inputs) -> output
+# inputs: {upstream_node_id: upstream_output}; kaynak node'lar için boş dict
+NodeHandler = Callable[[RunContext, CompiledNode, Dict[str, Any]], Awaitable[Any]]
+
+NODE_HANDLERS: Dict[str, NodeHandler] = {}
+
+# Çıktısı memo'lanabilen (aynı config + aynı girdiler -> aynı çıktı) node tipleri.
+# Değer, run/node bazında memo'yu kapatabilen bir predicate'tir.
+MemoPredicate = Callable[[RunContext, CompiledNode], bool]
+NODE_MEMOIZE: Dict[str, MemoPredicate] = {}
+
+
+def register_node(*node_types: str, memoize: Union[bool, MemoPredicate] = False):
+    """
+    Node tipi için handler kaydeden decorator.
+    memoize=True sadece deterministik ve pahalı handler'lar için verilmeli (app/memo.py).
+    """
+
+    def decorator(func: NodeHandler) -> NodeHandler:
+        for node_type in node_types:
+            NODE_HANDLERS[node_type] = func
+            if memoize:
+                NODE_MEMOIZE[node_type] = memoize if callable(memoize) else (lambda ctx, node: True)
+            else:
+                NODE_MEMOIZE.pop(node_type, None)
+        return func
+
+    return decorator
+
+
+def _memoizable(ctx: RunContext, node: CompiledNode) -> bool:
+    predicate = NODE_MEMOIZE.get(node.type)
+    return predicate is not None and node.config.get("cache", True) is not False and predicate(ctx, node)
+
+
+# ============================================================
+# Yerleşik node tipleri
+# ============================================================
+@register_node("trigger", "input", "manual", "start", "timer", "cron", "schedule", "interval")
+async def _trigger_node(ctx: RunContext, node: CompiledNode, inputs: Dict[str, Any]) -> Any:
+    """Run'ın input_data'sını akışa sokar (timer node'ları için scheduler'ın tetikleme bilgisi)."""
+    return ctx.input_data
+
+
+@register_node("output", "end")
+async def _output_node(ctx: RunContext, node: CompiledNode, inputs: Dict[str, Any]) -> Any:
+    """Tek upstream varsa çıktısını, birden fazlaysa hepsini döner."""
+    if len(inputs) == 1:
+        return next(iter(inputs.values()))
+    return inputs
+
+
+@register_node("delay")
+async def _delay_node(ctx: RunContext, node: CompiledNode, inputs: Dict[str, Any]) -> Any:
+    """config.seconds kadar bekler, girdiyi aynen geçirir. Beklemenin kendisi amaç olduğu için memo'lanmaz."""
+    seconds = float(node.config.get("seconds", 0))
+    await asyncio.sleep(max(seconds, 0))
+    return inputs
+
+
+# ============================================================
+# Entegrasyon node'ları (paylaşılan HTTP client havuzu üzerinden)
+# ============================================================
+def _targets_provider(url: str, base_url: Optional[str]) -> bool:
+    """
+    url provider'ın base_url'ine mi gidiyor? Göreli url'ler base_url'e eklenir;
+    mutlak (veya //host ile başlayan) url'ler için scheme/host/port aynı olmalı.
+    httpx mutlak url'de base_url'i yok saydığı için bu kontrol olmadan credential
+    workflow'da yazan herhangi bir host'a gönderilebilirdi.
+    """
+    if not base_url:
+        return False
+    target = httpx.URL(url)
+    if not target.scheme and not target.host:
+        return True
+    base = httpx.URL(base_url)
+    return (target.scheme, target.host, target.port) == (base.scheme, base.host, base.port)
+
+
+async def _provider_request(
+    ctx: RunContext,
+    provider_ref: Any,
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    İsteği provider'ın paylaşılan client'ı ile gönderir (base_url + kullanıcının credential'ı).
+    Provider verildiyse url göreli olmalı ya da provider'ın host'unu göstermelidir.
+    Provider verilmemişse url mutlak olmalıdır ve "default" havuz kullanılır (credential eklenmez).
+    """
+    key = base_url = None
+    request_headers: Dict[str, str] = {}
+    if provider_ref not in (None, ""):
+        provider = await get_provider(provider_ref)
+        if provider is None:
+            raise NonRetryableError(f"Integration provider not found: {provider_ref}")
+        key, base_url = provider.name, provider.base_url
+        if not _targets_provider(url, base_url):
+            raise NonRetryableError(f"URL '{url}' is outside provider '{provider.name}' base URL")
+        if ctx.credentials is not None:
+            credential = await ctx.credentials.get(provider.id)
+        else:
+            credential = await get_credential(ctx.user_id, provider.id)
+        request_headers.update(auth_headers(credential))
+    request_headers.update(headers or {})
+
+    response = await http_clients.request(method, url, key=key, base_url=base_url, headers=request_headers, **kwargs)
+    if response.is_redirect:
+        # Provider client'ları yönlendirme takip etmez (credential başka host'a gitmesin)
+        raise NonRetryableError(
+            f"{method} {response.request.url} redirected to {response.headers.get('location')}; "
+            "redirects are not followed for provider requests"
+        )
+    if response.status_code >= 400:
+        message = f"{method} {response.request.url} -> HTTP {response.status_code}"
+        # 408 / 429 / 5xx geçicidir, kuyruk tekrar dener
+        if response.status_code < 500 and response.status_code not in (408, 429):
+            raise NonRetryableError(message)
+        raise RuntimeError(message)
+
+    if "json" in response.headers.get("content-type", ""):
+        return response.json()
+    return response.text
+
+
+@register_node("http", "http_request", "webhook_call")
+async def _http_node(ctx: RunContext, node: CompiledNode, inputs: Dict[str, Any]) -> Any:
+    """
+    config: url, method (GET), provider, params, headers, json | body, coalesce (True)
+    Aynı anda uçuşta olan birebir aynı GET'ler tek istekte birleşir.
+    """
+    config = node.config
+    if not config.get("url"):
+        raise GraphError(f"Node '{node.node_id}' has no url")
+    method = str(config.get("method", "GET")).upper()
+    kwargs: Dict[str, Any] = {"params": config.get("params")}
+    if "json" in config:
+        kwargs["json"] = config["json"]
+    elif "body" in config:
+        kwargs["content"] = config["body"] if isinstance(config["body"], (str, bytes)) else str(config["body"])
+    body = await _provider_request(
+        ctx,
+        config.get("provider"),
+        method,
+        config["url"],
+        headers=config.get("headers"),
+        coalesce=bool(config.get("coalesce", True)),
+        **kwargs,
+    )
+    return {"body": body}
+
+
+# Node data'sında provider verilmediğinde kullanılan provider
+DEFAULT_PROVIDER_BY_TYPE: Dict[str, str] = {"ai": "openai", "llm": "openai", "openai": "openai"}
+
+
+def required_provider_refs(graph: CompiledGraph) -> Set[str]:
+    """Graph'taki node'ların kullanacağı provider referansları (credential ön yüklemesi için)."""
+    refs: Set[str] = set()
+    for node in graph.nodes:
+        ref = node.config.get("provider", DEFAULT_PROVIDER_BY_TYPE.get(node.type))
+        if ref not in (None, ""):
+            refs.add(str(ref))
+    return refs
+
+
+@register_node("ai", "llm", "openai", memoize=lambda ctx, node: ctx.ai_cache)
+async def _ai_node(ctx: RunContext, node: CompiledNode, inputs: Dict[str, Any]) -> Any:
+    """
+    OpenAI uyumlu chat completion çağrısı.
+    config: provider ("openai"), model, prompt, system, temperature, max_tokens, path ("/chat/completions"),
+            cache (True)
+    Upstream çıktıları JSON olarak prompt'un sonuna eklenir (include_inputs=False ile kapatılır).
+    Aynı istek daha önce yapıldıysa cevap app/ai_cache.py'den döner.
+    """
+    config = node.config
+    prompt = str(config.get("prompt", ""))
+    if inputs and config.get("include_inputs", True):
+        prompt = f"{prompt}\n\n{json.dumps(inputs, ensure_ascii=False, default=str)}".strip()
+
+    messages = []
+    if config.get("system"):
+        messages.append({"role": "system", "content": str(config["system"])})
+    messages.append({"role": "user", "content": prompt})
+    payload: Dict[str, Any] = {"model": config.get("model", "gpt-4o-mini"), "messages": messages}
+    for option in ("temperature", "max_tokens", "top_p"):
+        if option in config:
+            payload[option] = config[option]
+
+    provider_ref = config.get("provider", DEFAULT_PROVIDER_BY_TYPE[node.type])
+    path = config.get("path", "/chat/completions")
+
+    cache_key = None
+    if settings.AI_CACHE_ENABLED and ctx.ai_cache and config.get("cache", True):
+        provider = await get_provider(provider_ref)
+        cache_key = ai_cache_key(
+            provider.name if provider else str(provider_ref),
+            provider.base_url if provider else None,
+            path,
+            payload,
+        )
+        cached = await ai_cache.get(cache_key)
+        if cached is not None:
+            ctx.log(node.node_id, "AI response served from cache")
+            return cached
+
+    data = await _provider_request(ctx, provider_ref, "POST", path, json=payload)
+    try:
+        content = data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        raise NonRetryableError(f"Unexpected AI response for node '{node.node_id}'")
+    result = {"content": content, "model": data.get("model"), "usage": data.get("usage")}
+
+    if cache_key is not None:
+        await ai_cache.set(cache_key, str(provider_ref), payload["model"], result)
+    return result
+
+
+async def _run_node(ctx: RunContext, node: CompiledNode, inputs: Dict[str, Any]) -> Any:
+    handler = NODE_HANDLERS.get(node.type)
+    if handler is None:
+        raise GraphError(f"Unsupported node type: {node.type}")
+
+    run_events.publish(ctx.run_id, NODE_STARTED, node.node_id, node_type=node.type)
+    started = time.perf_counter()
+    try:
+        output = await handler(ctx, node, inputs)
+    except Exception as exc:
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        run_events.publish(ctx.run_id, NODE_FINISHED, node.node_id, status="failed", error=str(exc), duration_ms=duration_ms)
+        raise
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    run_events.publish(ctx.run_id, NODE_OUTPUT, node.node_id, output=output)
+    run_events.publish(ctx.run_id, NODE_FINISHED, node.node_id, status="success", duration_ms=duration_ms)
+    return output
+
+
+async def run_graph(
+    graph: Union[CompiledGraph, Dict[str, Any]],
+    ctx: Optional[RunContext] = None,
+    max_concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Graph'ı çalıştırır ve {node_id: output} döner.
+    Ham graph_json verilirse önce derlenir; workflow run'ları cache'teki CompiledGraph'ı verir.
+
+    - Tüm bağımlılıkları biten node "ready" kuyruğuna girer.
+    - Aynı anda en fazla max_concurrency node koşar.
+    - Bir node hata verirse koşan diğer node'lar iptal edilir ve NodeExecutionError fırlar.
+    - ctx.memo verilmişse memo'lanabilir node'lar, anahtarları değişmediyse çalıştırılmaz.
+    """
+    if not isinstance(graph, CompiledGraph):
+        graph = compile_graph(graph)
+    ctx = ctx or RunContext()
+    limit = max(1, max_concurrency or settings.RUN_MAX_CONCURRENCY)
+
+    nodes = graph.nodes
+    predecessors = graph.predecessors
+    successors = graph.successors
+    memo = ctx.memo
+
+    remaining = [len(preds) for preds in predecessors]
+    ready = deque(index for index in graph.order if remaining[index] == 0)
+    results: List[Any] = [None] * len(nodes)
+    # Memo açıksa her node çıktısının hash'i (downstream memo anahtarları bunlardan türer)
+    hashes: List[Optional[str]] = [None] * len(nodes)
+    memo_keys: Dict[int, str] = {}
+    running: Dict[asyncio.Task, int] = {}
+
+    def _complete(index: int, output: Any) -> None:
+        results[index] = output
+        for succ in successors[index]:
+            remaining[succ] -= 1
+            if remaining[succ] == 0:
+                ready.append(succ)
+
+    try:
+        while ready or running:
+            while ready and len(running) < limit:
+                index = ready.popleft()
+                node = nodes[index]
+                if memo is not None and _memoizable(ctx, node):
+                    key = memo.key_for(
+                        node.type,
+                        node.config,
+                        [hashes[pred] for pred in predecessors[index]],
+                        is_source=not predecessors[index],
+                    )
+                    hit = await memo.lookup(key)
+                    if hit is not None:
+                        hashes[index] = hit[1]
+                        run_events.publish(ctx.run_id, NODE_FINISHED, node.node_id, status="success", memoized=True)
+                        _complete(index, hit[0])
+                        continue
+                    memo_keys[index] = key
+                inputs = {nodes[pred].node_id: results[pred] for pred in predecessors[index]}
+                task = asyncio.create_task(_run_node(ctx, node, inputs))
+                running[task] = index
+
+            if not running:
+                continue
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = running.pop(task)
+                if task.cancelled():
+                    # run_graph'ın kendisi iptal edilmedi, sadece node task'ı: CancelledError'ı
+                    # yukarı taşımak run'ı "running"te bırakır; node hatası olarak (tekrar denenebilir) ele alınır
+                    raise NodeExecutionError(nodes[index].node_id, RuntimeError("Node task was cancelled"))
+                exc = task.exception()
+                if exc is not None:
+                    raise NodeExecutionError(nodes[index].node_id, exc)
+                output = task.result()
+                if memo is not None:
+                    hashes[index] = stable_hash(output)
+                    if index in memo_keys:
+                        memo.record(memo_keys[index], nodes[index].node_id, output, hashes[index])
+                _complete(index, output)
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    return {nodes[index].node_id: results[index] for index in graph.order}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Geçersiz graph / desteklenmeyen node / NonRetryableError tekrar denemeyle düzelmez; diğerleri denenebilir."""
+    original = getattr(exc, "original", exc)
+    return not isinstance(original, (GraphError, NonRetryableError))
+
+
+async def _load_graph_json(workflow_id: int) -> Tuple[Dict[str, Any], Any]:
+    """Derlenmiş graph cache'te yoksa çağrılır: (graph_json, updated_at)."""
+    workflow = models.Workflow
+    async with AsyncReadSessionLocal() as db:
+        row = (
+            await db.execute(select(workflow.graph_json, workflow.updated_at).where(workflow.id == workflow_id))
+        ).first()
+    if row is None:
+        raise GraphError("Workflow not found")
+    return row.graph_json, row.updated_at
+
+
+async def execute_run(
+    run: models.WorkflowRun,
+    workflow: models.Workflow,
+    max_concurrency: Optional[int] = None,
+) -> Optional[BaseException]:
+    """
+    Run'ı çalıştırır ve sonucu WorkflowRun alanlarına yazar
+    (status, output_data, error_message, finished_at). Commit çağırana aittir.
+    Hata olduysa exception'ı döner (kuyruk retry kararını buna göre verir).
+    """
+    try:
+        input_data = await resolve_payload(run.input_data)
+    except OSError as exc:
+        run.status = "failed"
+        run.error_message = f"Run input could not be loaded: {exc}"
+        run.finished_at = datetime.utcnow()
+        return exc
+
+    ctx = RunContext(
+        run_id=run.id,
+        workflow_id=workflow.id,
+        user_id=workflow.owner_id,
+        input_data=input_data or {},
+        ai_cache=workflow.ai_cache_enabled is not False,
+    )
+    if settings.NODE_MEMO_ENABLED:
+        ctx.memo = RunMemo(workflow.id, ctx.input_data, read=not run.force_full)
+    error: Optional[BaseException] = None
+    try:
+        graph = await get_compiled_graph(workflow, lambda: _load_graph_json(workflow.id))
+        # Graph'ın ihtiyaç duyduğu tüm credential'lar tek sorguda; run bitince ctx ile birlikte bırakılır
+        ctx.credentials = await RunCredentials.load(ctx.user_id, required_provider_refs(graph))
+        outputs = await run_graph(graph, ctx, max_concurrency)
+    except Exception as exc:  # node hatası veya geçersiz graph
+        run.status = "failed"
+        run.error_message = str(exc)
+        error = exc
+    else:
+        run.status = "success"
+        run.output_data = outputs
+        run.error_message = None
+    finally:
+        # Başarısız run'da da biten node'lar saklanır: hata düzeltilip tekrar koşulunca upstream memo'dan gelir
+        if ctx.memo is not None:
+            try:
+                await ctx.memo.flush()
+            except Exception:
+                logger.exception("Node memo write failed for run %s", run.id)
+    run.finished_at = datetime.utcnow()
+    return error
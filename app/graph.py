@@ -0,0 +1,195 @@
+# app/graph.py
+"""
+React Flow graph_json yardımcıları.
+
+graph_json formatı (frontend'den gelen):
+    {
+        "nodes": [{"id": "n1", "type": "ai", "data": {...}, "position": {...}}, ...],
+        "edges": [{"id": "e1", "source": "n1", "target": "n2"}, ...]
+    }
+
+compile_graph() ham dict'i bir kez doğrulayıp CompiledGraph'a çevirir; sonuç
+(workflow_id, updated_at) sürümüne göre LRU cache'te tutulur. Aynı workflow'un
+tekrar çalıştırılması graph hazırlığını tamamen atlar.
+"""
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.cache import TTLCache
+from app.config import settings
+
+
+class GraphError(ValueError):
+    """graph_json geçersiz olduğunda (eksik id, bilinmeyen edge, döngü) fırlatılır."""
+
+
+def parse_graph(graph_json: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
+    """
+    graph_json içinden node listesini ve (source, target) edge çiftlerini çıkarır.
+    Node id'lerinin tekil olduğunu ve edge'lerin var olan node'lara işaret ettiğini kontrol eder.
+    """
+    graph_json = graph_json or {}
+    nodes = graph_json.get("nodes") or []
+    edges = graph_json.get("edges") or []
+
+    seen = set()
+    for node in nodes:
+        node_id = node.get("id") if isinstance(node, dict) else None
+        if not node_id:
+            raise GraphError("Every node must have an 'id'")
+        if node_id in seen:
+            raise GraphError(f"Duplicate node id: {node_id}")
+        seen.add(node_id)
+
+    pairs: List[Tuple[str, str]] = []
+    for edge in edges:
+        source = edge.get("source") if isinstance(edge, dict) else None
+        target = edge.get("target") if isinstance(edge, dict) else None
+        if source not in seen or target not in seen:
+            raise GraphError(f"Edge references unknown node: {source} -> {target}")
+        pairs.append((source, target))
+
+    return nodes, pairs
+
+
+def topological_order(node_ids: List[str], edges: List[Tuple[str, str]]) -> List[str]:
+    """
+    Kahn algoritması ile topolojik sıra.
+    Aynı seviyedeki node'lar graph_json'daki sıralarını korur; döngü varsa GraphError.
+    """
+    indegree = {node_id: 0 for node_id in node_ids}
+    successors: Dict[str, List[str]] = {node_id: [] for node_id in node_ids}
+    for source, target in edges:
+        successors[source].append(target)
+        indegree[target] += 1
+
+    queue = deque(node_id for node_id in node_ids if indegree[node_id] == 0)
+    order: List[str] = []
+    while queue:
+        node_id = queue.popleft()
+        order.append(node_id)
+        for succ in successors[node_id]:
+            indegree[succ] -= 1
+            if indegree[succ] == 0:
+                queue.append(succ)
+
+    if len(order) != len(node_ids):
+        raise GraphError("Workflow graph contains a cycle")
+    return order
+
+
+# ============================================================
+# Derlenmiş graph
+# ============================================================
+class CompiledNode:
+    """Tek node'un doğrulanmış hali. `index`, CompiledGraph dizilerindeki konumudur."""
+
+    __slots__ = ("index", "node_id", "type", "config")
+
+    def __init__(self, index: int, node_id: str, type: str, config: Dict[str, Any]):
+        self.index = index
+        self.node_id = node_id
+        self.type = type
+        self.config = config
+
+    def __repr__(self) -> str:
+        return f"CompiledNode({self.node_id!r}, type={self.type!r})"
+
+
+class CompiledGraph:
+    """
+    graph_json'ın çalıştırmaya hazır hali:
+    - nodes:        CompiledNode tuple'ı (graph_json sırasıyla)
+    - index_by_id:  node_id -> index
+    - successors / predecessors: index -> komşu index tuple'ları
+    - order:        topolojik sıradaki index'ler
+    """
+
+    __slots__ = ("workflow_id", "version", "nodes", "index_by_id", "successors", "predecessors", "order")
+
+    def __init__(self, workflow_id, version, nodes, index_by_id, successors, predecessors, order):
+        self.workflow_id = workflow_id
+        self.version = version
+        self.nodes: Tuple[CompiledNode, ...] = nodes
+        self.index_by_id: Dict[str, int] = index_by_id
+        self.successors: Tuple[Tuple[int, ...], ...] = successors
+        self.predecessors: Tuple[Tuple[int, ...], ...] = predecessors
+        self.order: Tuple[int, ...] = order
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def node(self, node_id: str) -> CompiledNode:
+        return self.nodes[self.index_by_id[node_id]]
+
+
+def compile_graph(
+    graph_json: Dict[str, Any],
+    workflow_id: Optional[int] = None,
+    version: Any = None,
+) -> CompiledGraph:
+    """graph_json'ı doğrular ve CompiledGraph üretir (GraphError fırlatabilir)."""
+    raw_nodes, edges = parse_graph(graph_json)
+
+    nodes: List[CompiledNode] = []
+    index_by_id: Dict[str, int] = {}
+    for index, raw in enumerate(raw_nodes):
+        node_type = raw.get("type")
+        if not node_type or not isinstance(node_type, str):
+            raise GraphError(f"Node '{raw['id']}' has no type")
+        config = raw.get("data") or {}
+        if not isinstance(config, dict):
+            raise GraphError(f"Node '{raw['id']}' data must be an object")
+        nodes.append(CompiledNode(index, raw["id"], node_type, config))
+        index_by_id[raw["id"]] = index
+
+    successors: List[List[int]] = [[] for _ in nodes]
+    predecessors: List[List[int]] = [[] for _ in nodes]
+    for source, target in edges:
+        successors[index_by_id[source]].append(index_by_id[target])
+        predecessors[index_by_id[target]].append(index_by_id[source])
+
+    order = topological_order([node.node_id for node in nodes], edges)
+
+    return CompiledGraph(
+        workflow_id=workflow_id,
+        version=version,
+        nodes=tuple(nodes),
+        index_by_id=index_by_id,
+        successors=tuple(tuple(s) for s in successors),
+        predecessors=tuple(tuple(p) for p in predecessors),
+        order=tuple(index_by_id[node_id] for node_id in order),
+    )
+
+
+# workflow_id -> CompiledGraph; sürüm (updated_at) uyuşmazsa yeniden derlenir
+compiled_graph_cache = TTLCache(maxsize=settings.GRAPH_CACHE_SIZE)
+
+
+async def get_compiled_graph(
+    workflow,
+    load_graph: Optional[Callable[[], Awaitable[Tuple[Dict[str, Any], Any]]]] = None,
+) -> CompiledGraph:
+    """
+    Workflow'un derlenmiş graph'ını cache'ten verir, yoksa derleyip cache'ler.
+    Sürüm kontrolü için workflow'tan sadece id ve updated_at okunur. Cache'te yoksa graph_json
+    load_graph() -> (graph_json, updated_at) ile yüklenir (verilmezse workflow.graph_json);
+    cache hit'te graph_json hiç okunmaz / açılmaz.
+    """
+    version = workflow.updated_at
+    compiled = compiled_graph_cache.get(workflow.id)
+    if compiled is not None and compiled.version == version:
+        return compiled
+
+    if load_graph is not None:
+        # Yüklenen içerik ile aynı satırdaki sürüm kullanılır (arada güncellenmiş olabilir)
+        graph_json, version = await load_graph()
+    else:
+        graph_json = workflow.graph_json
+    compiled = compile_graph(graph_json, workflow_id=workflow.id, version=version)
+    compiled_graph_cache.set(workflow.id, compiled)
+    return compiled
+
+
+def invalidate_compiled_graph(workflow_id: int) -> None:
+    compiled_graph_cache.pop(workflow_id)
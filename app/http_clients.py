@@ -0,0 +1,172 @@
+# app/http_clients.py
+"""
+Dış servislere giden istekler için process genelinde paylaşılan httpx client'ları.
+
+Her IntegrationProvider (yoksa "default") için tek bir httpx.AsyncClient tutulur;
+node'lar istek başına client açmaz, böylece keep-alive bağlantılar ve TLS
+oturumları binlerce node çalıştırması boyunca tekrar kullanılır.
+
+- Havuz ve timeout limitleri provider bazında ayarlanabilir (HTTP_PROVIDER_LIMITS).
+- `h2` kuruluysa HTTP/2 kullanılır (tek bağlantı üzerinde çoklu istek).
+- Aynı anda uçuşta olan birebir aynı GET istekleri tek istekte birleştirilir.
+- Provider client'ları yönlendirme (3xx) takip etmez: httpx çapraz-origin yönlendirmede
+  sadece Authorization'ı düşürür, x-api-key / credential["headers"] gibi header'lar
+  başka host'a gönderilirdi. 3xx cevap çağırana aynen döner. Credential taşımayan
+  "default" havuz yönlendirmeleri takip eder.
+"""
+import asyncio
+import contextlib
+import importlib.util
+from typing import Any, AsyncIterator, Dict, Hashable, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+
+DEFAULT_CLIENT_KEY = "default"
+
+# İsteği birleştirirken anahtara dahil edilen header'lar (kimlik farklıysa cevap da farklıdır)
+_COALESCE_HEADERS = ("authorization", "accept", "x-api-key")
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _LeaderCancelled(Exception):
+    """Birleştirilmiş isteği atan çağıran iptal edildi; bekleyenler isteği kendileri tekrarlar."""
+
+
+def _limits_for(key: str) -> Tuple[httpx.Limits, httpx.Timeout]:
+    override = settings.HTTP_PROVIDER_LIMITS.get(key, {})
+    limits = httpx.Limits(
+        max_connections=int(override.get("max_connections", settings.HTTP_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(
+            override.get("max_keepalive_connections", settings.HTTP_MAX_KEEPALIVE_CONNECTIONS)
+        ),
+        keepalive_expiry=override.get("keepalive_expiry", settings.HTTP_KEEPALIVE_EXPIRY_SECONDS),
+    )
+    read_timeout = override.get("read_timeout", settings.HTTP_READ_TIMEOUT_SECONDS)
+    timeout = httpx.Timeout(
+        read_timeout,
+        connect=override.get("connect_timeout", settings.HTTP_CONNECT_TIMEOUT_SECONDS),
+    )
+    return limits, timeout
+
+
+class HttpClientRegistry:
+    def __init__(self):
+        # (provider, base_url) -> client; base_url değişirse yeni havuz açılır
+        self._clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    def client(self, key: Optional[str] = None, base_url: Optional[str] = None) -> httpx.AsyncClient:
+        """Provider için paylaşılan client'ı döner (ilk çağrıda oluşturur)."""
+        key = key or DEFAULT_CLIENT_KEY
+        client = self._clients.get((key, base_url or ""))
+        if client is None or client.is_closed:
+            limits, timeout = _limits_for(key)
+            client = httpx.AsyncClient(
+                base_url=base_url or "",
+                limits=limits,
+                timeout=timeout,
+                http2=settings.HTTP2_ENABLED and HTTP2_AVAILABLE,
+                follow_redirects=key == DEFAULT_CLIENT_KEY,
+            )
+            self._clients[(key, base_url or "")] = client
+        return client
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        coalesce: bool = True,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        İsteği provider client'ı üzerinden gönderir; cevap gövdesi okunmuş olarak döner.
+        coalesce=True iken aynı GET zaten uçuştaysa yeni istek atılmaz, onun cevabı paylaşılır.
+        """
+        client = self.client(key, base_url)
+        self.requests += 1
+        if method.upper() != "GET" or not coalesce or "content" in kwargs or "json" in kwargs:
+            return await self._send(client, method, url, **kwargs)
+
+        request = client.build_request(method, url, params=kwargs.get("params"), headers=kwargs.get("headers"))
+        coalesce_key = (
+            key or DEFAULT_CLIENT_KEY,
+            str(request.url),
+            tuple((name, request.headers.get(name)) for name in _COALESCE_HEADERS),
+        )
+        while True:
+            pending = self._inflight.get(coalesce_key)
+            if pending is None:
+                return await self._lead(coalesce_key, client, method, url, **kwargs)
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except _LeaderCancelled:
+                # İsteği atan iptal edildi (ör. kendi run'ında kardeş node hata verdi);
+                # bekleyenler başka run'lara ait olabilir, istek yeniden atılır / yeni lidere bağlanılır
+                continue
+
+    async def _lead(
+        self, coalesce_key: Hashable, client: httpx.AsyncClient, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[coalesce_key] = future
+        try:
+            response = await self._send(client, method, url, **kwargs)
+        except asyncio.CancelledError:
+            # Paylaşılan future iptal edilmez: bekleyenler CancelledError almamalı
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # bekleyen yoksa "never retrieved" uyarısı çıkmasın
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            self._inflight.pop(coalesce_key, None)
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[httpx.Response]:
+        """Gövdesi okunmamış cevap (aiter_lines / aiter_bytes ile parça parça okunur); birleştirme yapılmaz."""
+        client = self.client(key, base_url)
+        self.requests += 1
+        async with client.stream(method, url, **kwargs) as response:
+            yield response
+
+    @staticmethod
+    async def _send(client: httpx.AsyncClient, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        response = await client.request(method, url, **kwargs)
+        await response.aread()
+        return response
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": sorted(f"{key} {base_url}".strip() for key, base_url in self._clients),
+            "http2": settings.HTTP2_ENABLED and HTTP2_AVAILABLE,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+http_clients = HttpClientRegistry()
@@ -0,0 +1,182 @@
+# app/integrations.py
+"""
+IntegrationProvider / UserCredential lookup'ları (http ve ai node'ları için).
+
+Provider kayıtları nadiren değişir; adı veya id'si ile process içinde cache'lenir.
+Credential'lar ise process genelinde cache'lenmez: RunCredentials run başında
+graph'ın ihtiyaç duyduğu tüm credential'ları tek sorguda yükler ve sadece run
+boyunca tutar.
+
+Paylaşılan (user_id NULL) credential'lar sadece INTEGRATION_SHARED_CREDENTIALS
+açıkken kullanılır; varsayılan olarak her kullanıcı yalnızca kendi kaydını kullanır.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import or_, select
+
+from app import models
+from app.cache import TTLCache
+from app.config import settings
+from app.db import AsyncReadSessionLocal
+
+# "name:<ad>" / "id:<id>" -> ayrılmış IntegrationProvider kopyası
+provider_cache = TTLCache(maxsize=256, ttl=settings.PROVIDER_CACHE_TTL_SECONDS)
+
+
+def _provider_key(ref: Union[int, str]) -> str:
+    return f"id:{ref}" if isinstance(ref, int) or str(ref).isdigit() else f"name:{ref}"
+
+
+async def get_provider(ref: Union[int, str, None]) -> Optional[models.IntegrationProvider]:
+    """Provider'ı id (int veya "3") ya da ad ("openai") ile bulur."""
+    if ref is None or ref == "":
+        return None
+    key = _provider_key(ref)
+    provider = provider_cache.get(key)
+    if provider is not None:
+        return provider
+
+    if key.startswith("id:"):
+        condition = models.IntegrationProvider.id == int(ref)
+    else:
+        condition = models.IntegrationProvider.name == str(ref)
+    async with AsyncReadSessionLocal() as db:
+        provider = (await db.execute(select(models.IntegrationProvider).where(condition))).scalar_one_or_none()
+    if provider is not None:
+        provider_cache.set(f"id:{provider.id}", provider)
+        provider_cache.set(f"name:{provider.name}", provider)
+    return provider
+
+
+async def get_providers(refs: Iterable[Union[int, str]]) -> Dict[str, models.IntegrationProvider]:
+    """Birden çok provider'ı çözer: cache'te olmayanlar tek sorguda okunur. ref(str) -> provider."""
+    found: Dict[str, models.IntegrationProvider] = {}
+    missing_ids: List[int] = []
+    missing_names: List[str] = []
+    for ref in {str(ref) for ref in refs if ref not in (None, "")}:
+        provider = provider_cache.get(_provider_key(ref))
+        if provider is not None:
+            found[ref] = provider
+        elif ref.isdigit():
+            missing_ids.append(int(ref))
+        else:
+            missing_names.append(ref)
+
+    if missing_ids or missing_names:
+        table = models.IntegrationProvider
+        async with AsyncReadSessionLocal() as db:
+            rows = (
+                await db.execute(select(table).where(or_(table.id.in_(missing_ids), table.name.in_(missing_names))))
+            ).scalars().all()
+        for provider in rows:
+            provider_cache.set(f"id:{provider.id}", provider)
+            provider_cache.set(f"name:{provider.name}", provider)
+            if provider.id in missing_ids:
+                found[str(provider.id)] = provider
+            if provider.name in missing_names:
+                found[provider.name] = provider
+    return found
+
+
+def _owner_condition(user_id: Optional[int]):
+    """Okunabilecek credential kayıtları: kullanıcının kendisi (+ açıksa paylaşılan kayıtlar)."""
+    table = models.UserCredential
+    own = table.user_id == user_id if user_id is not None else None
+    if settings.INTEGRATION_SHARED_CREDENTIALS:
+        return or_(own, table.user_id.is_(None)) if own is not None else table.user_id.is_(None)
+    return own
+
+
+async def load_credentials(user_id: Optional[int], provider_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    (user_id, provider_id) çiftleri için credential'ları tek sorguda yükler.
+    Kullanıcının kendi kaydı, paylaşılan (user_id NULL, opt-in) kayda tercih edilir; aynı türden
+    birden çok kayıt varsa en yenisi alınır.
+    """
+    provider_ids = sorted(set(provider_ids))
+    condition = _owner_condition(user_id)
+    if not provider_ids or condition is None:
+        return {}
+    table = models.UserCredential
+    async with AsyncReadSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(table.provider_id, table.user_id, table.credential_json)
+                .where(table.provider_id.in_(provider_ids), condition)
+                .order_by(table.id)
+            )
+        ).all()
+
+    credentials: Dict[int, Dict[str, Any]] = {}
+    owned: set = set()
+    for row in rows:
+        if row.user_id is not None:
+            credentials[row.provider_id] = row.credential_json
+            owned.add(row.provider_id)
+        elif row.provider_id not in owned:
+            credentials[row.provider_id] = row.credential_json
+    return credentials
+
+
+class RunCredentials:
+    """
+    Tek run'a ait credential'lar (provider_id -> credential_json).
+    Run başında load() ile doldurulur; graph'ta önceden görünmeyen bir provider
+    istenirse bir kez okunup run sonuna kadar burada tutulur.
+    """
+
+    def __init__(self, user_id: Optional[int], credentials: Optional[Dict[int, Dict[str, Any]]] = None):
+        self.user_id = user_id
+        self._credentials: Dict[int, Optional[Dict[str, Any]]] = dict(credentials or {})
+
+    @classmethod
+    async def load(cls, user_id: Optional[int], provider_refs: Iterable[Union[int, str]]) -> "RunCredentials":
+        providers = await get_providers(provider_refs)
+        provider_ids = {provider.id for provider in providers.values()}
+        credentials: Dict[int, Optional[Dict[str, Any]]] = dict(await load_credentials(user_id, provider_ids))
+        for provider_id in provider_ids:
+            credentials.setdefault(provider_id, None)  # "kayıt yok" da cevaptır; tekrar sorulmaz
+        return cls(user_id, credentials)
+
+    async def get(self, provider_id: int) -> Optional[Dict[str, Any]]:
+        if provider_id not in self._credentials:
+            self._credentials[provider_id] = await get_credential(self.user_id, provider_id)
+        return self._credentials[provider_id]
+
+    def __len__(self) -> int:
+        return len(self._credentials)
+
+
+async def get_credential(user_id: Optional[int], provider_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Kullanıcının provider için girdiği credential_json'u döner
+    (INTEGRATION_SHARED_CREDENTIALS açıksa, yoksa paylaşılan / user_id NULL kaydı).
+    """
+    condition = _owner_condition(user_id)
+    if condition is None:
+        return None
+    async with AsyncReadSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(models.UserCredential.user_id, models.UserCredential.credential_json)
+                .where(models.UserCredential.provider_id == provider_id, condition)
+                .order_by(models.UserCredential.id.desc())
+            )
+        ).all()
+    # Kullanıcının kendi kaydı paylaşılan kayda tercih edilir
+    for row in rows:
+        if row.user_id is not None:
+            return row.credential_json
+    return rows[0].credential_json if rows else None
+
+
+def auth_headers(credential: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """credential_json'dan istek header'larını üretir."""
+    if not credential:
+        return {}
+    headers: Dict[str, str] = dict(credential.get("headers") or {})
+    if credential.get("api_key"):
+        headers.setdefault("Authorization", f"Bearer {credential['api_key']}")
+    if credential.get("org_id"):
+        headers.setdefault("OpenAI-Organization", str(credential["org_id"]))
+    return headers
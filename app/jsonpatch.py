@@ -0,0 +1,121 @@
+# app/jsonpatch.py
+"""
+RFC 6902 JSON Patch (ve RFC 6901 JSON Pointer) uygulaması.
+
+Editör graph_json'ın tamamını göndermek yerine sadece değişikliği (ör. tek node'un
+pozisyonu) gönderir:
+    [{"op": "replace", "path": "/nodes/3/position/x", "value": 120}]
+"""
+import copy
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class JsonPatchError(ValueError):
+    """Geçersiz operasyon, bulunamayan path veya başarısız 'test' operasyonu."""
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise JsonPatchError(f"Array index out of range: {token}")
+    return index
+
+
+def _walk(doc: Any, tokens: List[str]) -> Any:
+    node = doc
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_list_index(node, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return node
+
+
+def _parent(doc: Any, tokens: List[str]) -> Tuple[Any, str]:
+    parent = _walk(doc, tokens[:-1])
+    if not isinstance(parent, (dict, list)):
+        raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return parent, tokens[-1]
+
+
+def _add(doc: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent, key = _parent(doc, tokens)
+    if isinstance(parent, list):
+        parent.insert(_list_index(parent, key, allow_end=True), value)
+    else:
+        parent[key] = value
+    return doc
+
+
+def _remove(doc: Any, tokens: List[str]) -> Tuple[Any, Any]:
+    if not tokens:
+        raise JsonPatchError("Cannot remove the document root")
+    parent, key = _parent(doc, tokens)
+    if isinstance(parent, list):
+        removed = parent.pop(_list_index(parent, key, allow_end=False))
+    else:
+        if key not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        removed = parent.pop(key)
+    return doc, removed
+
+
+def apply_patch(document: Any, operations: Iterable[Dict[str, Any]]) -> Any:
+    """
+    Operasyonları sırayla uygular ve yeni dokümanı döner.
+    Orijinal doküman değişmez; herhangi bir operasyon başarısız olursa hiçbiri uygulanmaz.
+    """
+    doc = copy.deepcopy(document)
+    for operation in operations:
+        op = operation.get("op")
+        if "path" not in operation:
+            raise JsonPatchError(f"Operation '{op}' requires 'path'")
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"Operation '{op}' requires 'value'")
+        tokens = _parse_pointer(operation["path"])
+
+        if op == "add":
+            doc = _add(doc, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            doc, _ = _remove(doc, tokens)
+        elif op == "replace":
+            if tokens:
+                _walk(doc, tokens)  # hedef var olmalı
+                doc, _ = _remove(doc, tokens)
+            doc = _add(doc, tokens, copy.deepcopy(operation["value"]))
+        elif op in ("move", "copy"):
+            if "from" not in operation:
+                raise JsonPatchError(f"Operation '{op}' requires 'from'")
+            from_tokens = _parse_pointer(operation["from"])
+            if op == "move":
+                if tokens[: len(from_tokens)] == from_tokens and tokens != from_tokens:
+                    raise JsonPatchError("Cannot move a value into one of its children")
+                doc, value = _remove(doc, from_tokens)
+            else:
+                value = copy.deepcopy(_walk(doc, from_tokens))
+            doc = _add(doc, tokens, value)
+        elif op == "test":
+            if _walk(doc, tokens) != operation.get("value"):
+                raise JsonPatchError(f"Test failed at {operation['path']}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {op!r}")
+    return doc
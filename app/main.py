@@ -1,10 +1,21 @@
 # app/main.py
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.config import settings
-from app.db import init_db
-from app.routers import health, workflows, auth, admin  # 👈 admin eklendi
+from app.db import dispose_engines, init_db
+from app.etag import ETAG_HEADER
+from app.http_clients import http_clients
+from app.pagination import NEXT_CURSOR_HEADER
+from app.passwords import password_hasher
+from app.retention import run_retention_worker
+from app.run_queue import run_worker
+from app.scheduler import scheduler
+from app.stats import run_stats_reconciler
+from app.routers import health, workflows, runs, auth, admin, search, chat  # 👈 admin eklendi
 
 
 
@@ -15,6 +26,7 @@ def create_app() -> FastAPI:
         docs_url="/",                 # Swagger root’ta
         redoc_url=None,
         openapi_url="/openapi.json",
+        default_response_class=ORJSONResponse,  # stdlib json yerine orjson
     )
 
     # CORS
@@ -24,18 +36,64 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
     )
 
     # Routers
     app.include_router(health.router)
     app.include_router(auth.router, prefix="/api")         # /api/auth/...
     app.include_router(workflows.router, prefix="/api")    # /api/workflows/...
+    app.include_router(runs.router, prefix="/api")         # /api/workflows/{id}/runs/...
     app.include_router(admin.router, prefix="/api")        # /api/admin/... 
+    app.include_router(search.router, prefix="/api")       # /api/search/...
+    app.include_router(chat.router, prefix="/api")         # /api/chat/...
+
+    # Gömülü run worker'ları: ayrı `python -m app.worker` yoksa tek container yeterli olsun
+    worker_tasks = []
 
     @app.on_event("startup")
     def on_startup():
         init_db()
 
+    @app.on_event("startup")
+    async def start_embedded_workers():
+        app.state.worker_stop = asyncio.Event()
+        for _ in range(settings.RUN_EMBEDDED_WORKERS):
+            worker_tasks.append(asyncio.create_task(run_worker(stop=app.state.worker_stop)))
+
+    @app.on_event("startup")
+    async def start_scheduler():
+        # timer / cron node'ları: process'ler arasında lock ile tek lider tetikler
+        app.state.scheduler_stop = asyncio.Event()
+        if settings.SCHEDULER_ENABLED:
+            worker_tasks.append(asyncio.create_task(scheduler.run(app.state.scheduler_stop)))
+
+    @app.on_event("startup")
+    async def start_stats_reconciler():
+        app.state.stats_stop = asyncio.Event()
+        if settings.STATS_RECONCILE_SECONDS > 0:
+            worker_tasks.append(asyncio.create_task(run_stats_reconciler(app.state.stats_stop)))
+
+    @app.on_event("startup")
+    async def start_run_retention():
+        # Eski run'ları günlük özetlere toplayıp siler, boş sayfaları incremental_vacuum ile geri verir
+        app.state.retention_stop = asyncio.Event()
+        if settings.RUN_RETENTION_INTERVAL_SECONDS > 0:
+            worker_tasks.append(asyncio.create_task(run_retention_worker(app.state.retention_stop)))
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        app.state.scheduler_stop.set()
+        app.state.stats_stop.set()
+        app.state.retention_stop.set()
+        if worker_tasks:
+            app.state.worker_stop.set()
+            await asyncio.gather(*worker_tasks, return_exceptions=True)
+            worker_tasks.clear()
+        password_hasher.shutdown()
+        await http_clients.aclose()
+        await dispose_engines()
+
     return app
 
 
@@ -0,0 +1,122 @@
+# app/maintenance.py
+"""
+Bakım komutları (uygulama kapalıyken veya düşük trafikte çalıştırılır).
+
+    python -m app.maintenance compress-json [--batch 500] [--vacuum]
+    python -m app.maintenance gc-blobs [--orphan-grace 3600]
+    python -m app.maintenance enable-incremental-vacuum
+"""
+import argparse
+from typing import List, Tuple
+
+from app.column_types import CompressedJSON, decode_json, encode_json, is_compressed
+from app.blobstore import gc_blobs
+from app.db import Base, SessionLocal, engine, init_db
+
+
+def _compressed_columns() -> List[Tuple[str, str]]:
+    from app import models  # noqa: F401  (metadata dolsun)
+
+    return [
+        (table.name, column.name)
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, CompressedJSON)
+    ]
+
+
+def compress_json(batch: int = 500, vacuum: bool = False) -> None:
+    """
+    Eski düz-metin JSON satırlarını CompressedJSON formatına çevirir.
+    Eşiğin altındaki değerler zaten metin olarak kalır; sadece büyük olanlar yeniden yazılır.
+    Tablolar rowid üzerinden sayfalanır: birincil anahtarı `id` olmayan tablolar da
+    (ai_response_cache, node_output_memo -> `key`) aynı döngüyle işlenir.
+    """
+    init_db()
+    for table, column in _compressed_columns():
+        rewritten = 0
+        last_id = 0
+        while True:
+            with engine.begin() as conn:
+                rows = conn.exec_driver_sql(
+                    f"SELECT rowid, {column} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_id, batch),
+                ).fetchall()
+                if not rows:
+                    break
+                for row_id, stored in rows:
+                    if stored is None or is_compressed(stored):
+                        continue
+                    encoded = encode_json(decode_json(stored))
+                    if isinstance(encoded, bytes):
+                        conn.exec_driver_sql(
+                            f"UPDATE {table} SET {column} = ? WHERE rowid = ?",
+                            (encoded, row_id),
+                        )
+                        rewritten += 1
+                last_id = rows[-1][0]
+        print(f"{table}.{column}: {rewritten} rows compressed")
+
+    if vacuum:
+        _vacuum()
+        print("VACUUM done")
+
+
+def _vacuum() -> None:
+    # VACUUM transaction içinde çalışamaz; doğrudan DBAPI bağlantısı (autocommit) kullanılır
+    raw = engine.raw_connection()
+    try:
+        raw.cursor().execute("VACUUM")
+    finally:
+        raw.close()
+
+
+def enable_incremental_vacuum() -> None:
+    """
+    Var olan DB'yi auto_vacuum=INCREMENTAL'a geçirir (yeni DB'ler zaten böyle açılır).
+    Mod ancak tam bir VACUUM ile değişir; bir kez, düşük trafikte çalıştırılmalı.
+    """
+    init_db()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        mode = cursor.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode == 2:
+            print("auto_vacuum is already INCREMENTAL")
+            return
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("VACUUM")
+        print(f"auto_vacuum: {mode} -> {cursor.execute('PRAGMA auto_vacuum').fetchone()[0]}")
+    finally:
+        raw.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_compress = sub.add_parser("compress-json", help="Eski JSON satırlarını sıkıştır")
+    p_compress.add_argument("--batch", type=int, default=500)
+    p_compress.add_argument("--vacuum", action="store_true", help="Sonunda VACUUM ile yer aç")
+
+    p_gc = sub.add_parser("gc-blobs", help="Referansı kalmayan blob'ları sil")
+    p_gc.add_argument("--orphan-grace", type=int, default=3600, help="Kayıtsız dosyalar için bekleme (sn)")
+
+    sub.add_parser(
+        "enable-incremental-vacuum",
+        help="auto_vacuum=INCREMENTAL'a geç (tam VACUUM yapar)",
+    )
+
+    args = parser.parse_args()
+    if args.command == "compress-json":
+        compress_json(batch=args.batch, vacuum=args.vacuum)
+    elif args.command == "gc-blobs":
+        init_db()
+        with SessionLocal() as db:
+            print(gc_blobs(db, orphan_grace_seconds=args.orphan_grace))
+    elif args.command == "enable-incremental-vacuum":
+        enable_incremental_vacuum()
+
+
+if __name__ == "__main__":
+    main()
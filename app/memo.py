@@ -0,0 +1,141 @@
+# app/memo.py
+"""
+Node çıktılarının memo'lanması: tekrar çalıştırmada sadece değişen alt graph koşar.
+
+Her memoize edilebilir node için anahtar:
+    sha256(workflow_id, node tipi, node config'i, upstream output hash'leri [, run input hash'i])
+Upstream'i olmayan node'lara run input'u da katılır (trigger input'u okur).
+
+Bir node'un config'i değişirse anahtarı değişir ve yeniden çalışır; çıktısı farklıysa
+output hash'i de değişeceğinden downstream'deki tüm node'lar da "kirlenir". Geri
+kalan her şey memo'dan gelir. Run'da force_full=True ise memo okunmaz (ama yazılır).
+
+Sadece deterministik handler'lar memo'lanır (register_node(..., memoize=True)).
+"""
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.config import settings
+from app.db import AsyncReadSessionLocal, run_write
+
+
+def stable_hash(value: Any) -> str:
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class RunMemo:
+    """Tek run'ın memo durumu: okunan hit'ler ve run sonunda yazılacak yeni çıktılar."""
+
+    def __init__(self, workflow_id: int, input_data: Any, read: bool = True):
+        self.workflow_id = workflow_id
+        self.read = read
+        self.input_hash = stable_hash(input_data)
+        self.hits = 0
+        self.misses = 0
+        self._new: Dict[str, Tuple[str, Any, str]] = {}   # key -> (node_id, output, output_hash)
+        self._used: List[str] = []
+
+    def key_for(self, node_type: str, node_config: Dict[str, Any], upstream_hashes: Iterable[str], is_source: bool) -> str:
+        parts = [self.workflow_id, node_type, node_config, list(upstream_hashes)]
+        if is_source:
+            parts.append(self.input_hash)
+        return stable_hash(parts)
+
+    async def lookup(self, key: str) -> Optional[Tuple[Any, str]]:
+        """Hit ise (output, output_hash) döner."""
+        if not self.read:
+            return None
+        async with AsyncReadSessionLocal() as db:
+            row = (
+                await db.execute(
+                    select(models.NodeOutputMemo.output, models.NodeOutputMemo.output_hash).where(
+                        models.NodeOutputMemo.key == key
+                    )
+                )
+            ).first()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.append(key)
+        return row.output, row.output_hash
+
+    def record(self, key: str, node_id: str, output: Any, output_hash: str) -> None:
+        self._new[key] = (node_id, output, output_hash)
+
+    async def flush(self) -> None:
+        """Yeni çıktıları yazar, kullanılanları tazeler, node başına eski kayıtları budar (tek transaction)."""
+        if not self._new and not self._used:
+            return
+        new, used = dict(self._new), list(self._used)
+        self._new.clear()
+        self._used.clear()
+        await run_write(lambda session: _store(session, self.workflow_id, new, used))
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+async def _store(
+    session: AsyncSession,
+    workflow_id: int,
+    new: Dict[str, Tuple[str, Any, str]],
+    used: List[str],
+) -> None:
+    table = models.NodeOutputMemo
+    now = datetime.utcnow()
+    if new:
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.key],
+            set_={"last_used_at": stmt.excluded.last_used_at},
+        )
+        await session.execute(
+            stmt,
+            [
+                {
+                    "key": key,
+                    "workflow_id": workflow_id,
+                    "node_id": node_id,
+                    "output": output,
+                    "output_hash": output_hash,
+                    "created_at": now,
+                    "last_used_at": now,
+                }
+                for key, (node_id, output, output_hash) in new.items()
+            ],
+        )
+    if used:
+        await session.execute(
+            update(table).where(table.key.in_(used)).values(last_used_at=now).execution_options(synchronize_session=False)
+        )
+
+    keep = max(1, settings.NODE_MEMO_KEEP_PER_NODE)
+    for node_id in {node_id for node_id, _, _ in new.values()}:
+        newest = (
+            select(table.key)
+            .where(table.workflow_id == workflow_id, table.node_id == node_id)
+            .order_by(table.last_used_at.desc())
+            .limit(keep)
+        )
+        await session.execute(
+            delete(table)
+            .where(table.workflow_id == workflow_id, table.node_id == node_id, table.key.not_in(newest.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def delete_workflow_memos(session: AsyncSession, workflow_id: int) -> None:
+    await session.execute(
+        delete(models.NodeOutputMemo)
+        .where(models.NodeOutputMemo.workflow_id == workflow_id)
+        .execution_options(synchronize_session=False)
+    )
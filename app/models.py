@@ -2,15 +2,18 @@ from datetime import datetime
 from sqlalchemy import (
     Column,
     Integer,
+    Float,
     String,
     Boolean,
     DateTime,
     ForeignKey,
     Text,
     JSON,
+    Index,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
+from app.column_types import CompressedJSON
 from app.db import Base
 
 
@@ -44,14 +47,44 @@ class Workflow(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    graph_json = Column(JSON, nullable=False)     # tüm node/edge yapısı
+    # tüm node/edge yapısı. Sıkıştırılmış JSON her yüklemede açılıp parse edildiği için
+    # entity sorgularında yüklenmez; gereken yerde undefer(Workflow.graph_json) verilir
+    # (yüklenmemişken erişim hata verir, sessizce ek sorgu atılmaz).
+    graph_json = deferred(Column(CompressedJSON, nullable=False), raiseload=True)
     is_active = Column(Boolean, default=True)
 
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     owner = relationship("User", back_populates="workflows")
 
+    # Her yazmada +1 (optimistic concurrency: PATCH istemcinin gördüğü version'ı ister)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # False -> bu workflow'un ai node'ları cevap cache'ini kullanmaz (app/ai_cache.py)
+    ai_cache_enabled = Column(Boolean, nullable=False, default=True, server_default="1")
+
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Listeleme: WHERE owner_id = ? ORDER BY created_at DESC, id DESC
+        # (SQLite index'i rowid=id ile bitirir -> keyset sayfalama index range scan olur)
+        Index("ix_workflows_owner_created", "owner_id", "created_at"),
+        # Scheduler: WHERE updated_at > ? (sadece değişen workflow'lar yeniden okunur)
+        Index("ix_workflows_updated_at", "updated_at"),
+    )
+
+
+# graph_json hariç listeleme kolonları (schemas.WorkflowSummary ile aynı alanlar)
+WORKFLOW_SUMMARY_COLUMNS = (
+    Workflow.id,
+    Workflow.name,
+    Workflow.description,
+    Workflow.is_active,
+    Workflow.owner_id,
+    Workflow.version,
+    Workflow.created_at,
+    Workflow.updated_at,
+)
 
 
 # ============================================================
@@ -62,13 +95,130 @@ class WorkflowRun(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     workflow_id = Column(Integer, ForeignKey("workflows.id"))
-    status = Column(String, default="running")  # running | success | failed
-    input_data = Column(JSON, nullable=True)
-    output_data = Column(JSON, nullable=True)
+    status = Column(String, default="queued")  # queued | running | success | failed
+    # Payload'lar deferred: sadece undefer(...) ile veya kolon olarak seçilince okunur
+    input_data = deferred(Column(CompressedJSON, nullable=True), raiseload=True)
+    output_data = deferred(Column(CompressedJSON, nullable=True), raiseload=True)
     error_message = Column(Text, nullable=True)
     started_at = Column(DateTime, default=datetime.utcnow)
     finished_at = Column(DateTime, nullable=True)
 
+    # Kalıcı iş kuyruğu alanları (app/run_queue.py)
+    max_concurrency = Column(Integer, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=3, server_default="3")
+    available_at = Column(DateTime, nullable=True)       # retry backoff: bu zamandan önce alınmaz
+    lease_owner = Column(String, nullable=True)           # işi tutan worker
+    lease_expires_at = Column(DateTime, nullable=True)    # geçerse iş tekrar kuyruğa düşer
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    # True -> node output memo'ları okunmaz, tüm node'lar yeniden çalışır (app/memo.py)
+    force_full = Column(Boolean, nullable=False, default=False, server_default="0")
+
+    __table_args__ = (
+        # Worker'ların iş çekme sorgusu: WHERE status = ? AND available_at <= ?
+        Index("ix_workflow_runs_claim", "status", "available_at"),
+        # Run geçmişi sayfalama / günlük gruplama ve saklama politikası (workflow başına en yeni N)
+        Index("ix_workflow_runs_workflow_started", "workflow_id", "started_at"),
+        # Gün aralığına göre tarama (süresi dolan run'lar)
+        Index("ix_workflow_runs_started", "started_at"),
+    )
+
+
+# ============================================================
+# RUN DAILY STATS – Saklama politikasıyla silinen run'ların günlük özetleri
+# ============================================================
+class RunDailyStat(Base):
+    __tablename__ = "run_daily_stats"
+
+    workflow_id = Column(Integer, primary_key=True)     # workflow silinse de özet kalır (FK yok)
+    day = Column(String(10), primary_key=True)          # YYYY-MM-DD (UTC, started_at)
+    status = Column(String, primary_key=True)
+    runs = Column(Integer, nullable=False, default=0, server_default="0")
+    total_duration_seconds = Column(Float, nullable=False, default=0.0, server_default="0")
+    max_duration_seconds = Column(Float, nullable=False, default=0.0, server_default="0")
+
+
+# ============================================================
+# BLOBS – Büyük run payload'ları için içerik-adresli depo kayıtları
+# ============================================================
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)   # dosya adı = içerik hash'i
+    size = Column(Integer, nullable=False, default=0)
+    refcount = Column(Integer, nullable=False, default=0)   # referans veren run alanı sayısı
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ============================================================
+# AI CACHE – ai node cevaplarının disk katmanı (app/ai_cache.py)
+# ============================================================
+class AIResponseCache(Base):
+    __tablename__ = "ai_response_cache"
+
+    key = Column(String(64), primary_key=True)      # sha256(provider, model, prompt, parametreler)
+    provider = Column(String, nullable=True)
+    model = Column(String, nullable=True)
+    response = Column(CompressedJSON, nullable=False)
+    hits = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # TTL temizliği ve boyut sınırı aşılınca en eski kullanılanların silinmesi
+        Index("ix_ai_response_cache_expires", "expires_at"),
+        Index("ix_ai_response_cache_last_used", "last_used_at"),
+    )
+
+
+# ============================================================
+# NODE OUTPUT MEMO – değişmeyen alt graph'ın yeniden çalıştırılmaması (app/memo.py)
+# ============================================================
+class NodeOutputMemo(Base):
+    __tablename__ = "node_output_memo"
+
+    key = Column(String(64), primary_key=True)      # sha256(workflow, node tipi, config, upstream output hash'leri)
+    workflow_id = Column(Integer, ForeignKey("workflows.id"), nullable=False)
+    node_id = Column(String, nullable=False)
+    output = Column(CompressedJSON, nullable=True)
+    output_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Node başına son NODE_MEMO_KEEP_PER_NODE kayıt tutulur; workflow silinince hepsi silinir
+        Index("ix_node_output_memo_node", "workflow_id", "node_id", "last_used_at"),
+    )
+
+
+# ============================================================
+# SCHEDULER LOCK – Birden çok process'te tek scheduler lideri (app/scheduler.py)
+# ============================================================
+class SchedulerLock(Base):
+    __tablename__ = "scheduler_locks"
+
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+# ============================================================
+# STAT COUNTERS – Admin istatistikleri, trigger'larla artımlı (app/stats.py)
+# ============================================================
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+
+    scope = Column(String, primary_key=True)        # users | workflows | workflows_by_owner | runs | runs_by_status
+    key = Column(String, primary_key=True)          # total, active, owner_id, status...
+    value = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        # "En çok workflow'u olan owner'lar": WHERE scope = ? ORDER BY value DESC
+        Index("ix_stat_counters_scope_value", "scope", "value"),
+    )
+
 
 # ============================================================
 # NODES – Her workflow içindeki tek tek node’lar
@@ -80,11 +230,23 @@ class WorkflowNode(Base):
     workflow_id = Column(Integer, ForeignKey("workflows.id"))
     node_id = Column(String, nullable=False)       # frontend'deki unique node key
     type = Column(String, nullable=False)          # ai, http, timer, condition...
-    config = Column(JSON, nullable=True)           # node'un ayarları (prompt, url, headers)
+    config = deferred(Column(CompressedJSON, nullable=True), raiseload=True)  # node'un ayarları (prompt, url, headers)
 
     position_x = Column(Integer, default=0)
     position_y = Column(Integer, default=0)
 
+    # graph_json'dan türetilen sorgu alanları (app/workflow_nodes.py eşitler)
+    provider = Column(String, nullable=True)       # data.provider veya tipin varsayılanı (ai -> openai)
+    label = Column(String, nullable=True)          # data.label
+
+    __table_args__ = (
+        # Eşitleme: WHERE workflow_id = ?  (node_id workflow içinde tekil)
+        Index("ix_workflow_nodes_workflow", "workflow_id", "node_id", unique=True),
+        # "Bu tipte node kullanan workflow'lar": WHERE type = ? -> workflow_id index'ten okunur
+        Index("ix_workflow_nodes_type", "type", "workflow_id"),
+        Index("ix_workflow_nodes_provider", "provider", "workflow_id"),
+    )
+
 
 # ============================================================
 # INTEGRATION PROVIDERS — OpenAI, HF, Slack, Gmail vs.
@@ -111,6 +273,11 @@ class UserCredential(Base):
     credential_json = Column(JSON, nullable=False)   # {"api_key": "...", "org_id": "..."}
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Run başında: WHERE provider_id IN (...) AND (user_id = ? OR user_id IS NULL)
+        Index("ix_user_credentials_user_provider", "user_id", "provider_id"),
+    )
+
 
 # ============================================================
 # CHAT SESSION — Chat ara yüzü konuşmaları tutar
@@ -124,7 +291,14 @@ class ChatSession(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="chat_sessions")
-    messages = relationship("ChatMessage", back_populates="session")
+    # write_only: session.messages hiçbir zaman tüm konuşmayı yüklemez;
+    # okuma app/routers/chat.py'deki (session_id, id) keyset sorgularıyla yapılır
+    messages = relationship("ChatMessage", back_populates="session", lazy="write_only", order_by="ChatMessage.id")
+
+    __table_args__ = (
+        # Listeleme: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_chat_sessions_user_created", "user_id", "created_at"),
+    )
 
 
 # ============================================================
@@ -140,3 +314,8 @@ class ChatMessage(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     session = relationship("ChatSession", back_populates="messages")
+
+    __table_args__ = (
+        # Sayfalama: WHERE session_id = ? AND id < ? ORDER BY id DESC
+        Index("ix_chat_messages_session_id", "session_id", "id"),
+    )
@@ -0,0 +1,69 @@
+# app/pagination.py
+"""
+Keyset (cursor) sayfalama yardımcıları.
+
+Sıralama her zaman (created_at DESC, id DESC). Cursor, sayfanın son kaydının
+(created_at, id) çiftidir; sonraki sayfa `(created_at, id) < cursor` ile başlar.
+OFFSET kullanılmadığı için derin sayfalar da index range scan olarak kalır.
+"""
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_raw, id_raw = base64.urlsafe_b64decode(padded).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(created_raw), int(id_raw)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def limit_query(
+    limit: int = Query(
+        default=settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="Sayfa boyutu",
+    ),
+) -> int:
+    return limit
+
+
+def keyset_page(query: Select, created_col, id_col, cursor: Optional[str], limit: int) -> Select:
+    """
+    Sorguya keyset filtresi + sıralama + limit ekler.
+    Sonraki sayfa olup olmadığını anlamak için limit + 1 kayıt istenir.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(created_col, id_col) < tuple_(created_at, row_id))
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int, created_attr: str = "created_at") -> Tuple[List[Any], Optional[str]]:
+    """
+    limit + 1 kayıttan (sayfa, next_cursor) üretir. Kayıtlarda id ve created_attr
+    (varsayılan created_at; ör. run'larda started_at) olmalı.
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(getattr(last, created_attr), last.id)
@@ -0,0 +1,151 @@
+# app/passwords.py
+"""
+Parola hash'leme (scrypt).
+
+scrypt bilerek yavaş ve bellek-yoğun (varsayılan N=2^14, r=8 -> ~16 MiB, ~50 ms CPU);
+event loop'ta çalışırsa tüm API'yi bekletir. Bu yüzden hesaplama sınırlı boyutlu bir
+ProcessPoolExecutor'da yapılır:
+    - PASSWORD_HASH_WORKERS process -> login yağmurunda bile en fazla bu kadar çekirdek harcanır
+    - PASSWORD_HASH_MAX_PENDING -> kuyrukta (çalışan + bekleyen) bu kadar iş varsa
+      yeni istek beklemeden 429 + Retry-After ile reddedilir
+
+Saklama formatı:  scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>
+Eski kayıtlar tuzsuz SHA-256 hex; doğrulanırlar ve başarılı login'de scrypt'e çevrilir
+(needs_rehash). Parametreler artırıldığında eski scrypt hash'leri de aynı yolla yenilenir.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+SCHEME = "scrypt"
+_SALT_BYTES = 16
+_KEY_BYTES = 32
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    """Worker process'inde çalışır (pickle edilebilir modül fonksiyonu)."""
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=256 * n * r * p,
+        dklen=_KEY_BYTES,
+    )
+
+
+def _current_params() -> Tuple[int, int, int]:
+    return settings.PASSWORD_SCRYPT_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P
+
+
+def _is_legacy(stored: str) -> bool:
+    return len(stored) == 64 and all(ch in "0123456789abcdef" for ch in stored)
+
+
+class PasswordHasher:
+    """Sınırlı process havuzu + bekleyen iş sınırı."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.rejected = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: API process'inin thread'leri / açık bağlantıları fork'la kopyalanmasın
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def _run(self, password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests, try again shortly",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+            )
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor(), _scrypt, password, salt, n, r, p)
+        except BrokenProcessPool:
+            # Worker öldüyse (ör. OOM) havuz kullanılamaz; sonraki istek yenisini açar
+            self._pool = None
+            raise
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        n, r, p = _current_params()
+        salt = os.urandom(_SALT_BYTES)
+        key = await self._run(password, salt, n, r, p)
+        return "$".join(
+            (SCHEME, str(n), str(r), str(p), base64.b64encode(salt).decode("ascii"), base64.b64encode(key).decode("ascii"))
+        )
+
+    async def verify(self, password: str, stored: Optional[str]) -> Tuple[bool, bool]:
+        """
+        (eşleşti mi, yeniden hash'lenmeli mi) döner.
+        stored None ise (kullanıcı yok) sahte bir hash'e karşı aynı maliyette doğrulanır, sonuç False.
+        """
+        if stored is None:
+            # Kullanıcı yokken de aynı süre harcansın (email'in kayıtlı olup olmadığı zamanlamadan anlaşılmasın)
+            await self._run(password, bytes(_SALT_BYTES), *_current_params())
+            return False, False
+        if _is_legacy(stored):
+            legacy = hashlib.sha256(password.encode("utf-8")).hexdigest()
+            return hmac.compare_digest(legacy, stored), True
+
+        try:
+            scheme, n, r, p, salt, expected = stored.split("$")
+            n, r, p = int(n), int(r), int(p)
+            salt_bytes = base64.b64decode(salt)
+            expected_bytes = base64.b64decode(expected)
+        except ValueError:
+            return False, False
+        if scheme != SCHEME:
+            return False, False
+
+        key = await self._run(password, salt_bytes, n, r, p)
+        return hmac.compare_digest(key, expected_bytes), (n, r, p) != _current_params()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "rejected": self.rejected,
+            "started": self._pool is not None,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def verify_password(password: str, stored: Optional[str]) -> Tuple[bool, bool]:
+    return await password_hasher.verify(password, stored)
@@ -0,0 +1,254 @@
+# app/retention.py
+"""
+Run geçmişi saklama politikası ve sıkıştırma.
+
+Bitmiş (success / failed) bir run şu durumda silinmeye adaydır:
+    - workflow'unun en yeni RUN_RETENTION_KEEP_PER_WORKFLOW run'ı arasında değilse VE
+    - RUN_RETENTION_DAYS günden eskiyse.
+(Ayarlardan biri 0 ise sadece diğeri uygulanır; ikisi de 0 ise hiçbir şey silinmez.)
+
+Silinmeden önce run'lar run_daily_stats'a (workflow, gün, status) bazında toplanır,
+böylece geçmiş grafikleri / sayılar kaybolmaz; büyük payload'ların blob refcount'ları
+düşürülür (dosyalar gc_blobs ile silinir). Workflow başına sınır (en yeni N'inci bitmiş
+run'ın started_at, id'si) pass başına bir kez okuma bağlantısında hesaplanır; her batch
+ayrı bir run_write işidir ve sadece `workflow_id = ? AND (started_at, id) < sınır`
+aralığını (workflow_id, started_at) index'i üzerinden siler, yazma kuyruğu uzun süre tutulmaz.
+
+Veritabanı auto_vacuum=INCREMENTAL ise silinen sayfalar arka planda
+PRAGMA incremental_vacuum ile parça parça dosyadan geri verilir (tam VACUUM gibi
+tüm DB'yi kilitleyip yeniden yazmaz). Var olan bir DB'yi bu moda geçirmek için bir kez:
+    python -m app.maintenance enable-incremental-vacuum
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, select, text, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.blobstore import release_payload
+from app.config import settings
+from app.db import AsyncReadSessionLocal, run_write
+from app.events import TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+async def _cutoffs(now: datetime) -> Optional[List[Tuple[Optional[int], Optional[tuple]]]]:
+    """
+    Pass başına bir kez, okuma bağlantısında: [(workflow_id, (started_at, id)), ...].
+    Sınır, workflow'un en yeni RUN_RETENTION_KEEP_PER_WORKFLOW'uncu bitmiş run'ıdır; ondan
+    eski run'lar silinebilir. Sadece gün kuralı varsa tek eleman döner: (None, None).
+    Pass sırasında gelen yeni run'lar sınırı sadece ileri iter; eski sınır güvenli tarafta kalır.
+    """
+    keep = settings.RUN_RETENTION_KEEP_PER_WORKFLOW
+    if keep <= 0 and settings.RUN_RETENTION_DAYS <= 0:
+        return None
+    if keep <= 0:
+        return [(None, None)]
+
+    run = models.WorkflowRun
+    terminal = run.status.in_(TERMINAL_STATUSES)
+    cutoffs: List[Tuple[Optional[int], Optional[tuple]]] = []
+    async with AsyncReadSessionLocal() as db:
+        workflow_ids = (
+            await db.execute(
+                select(run.workflow_id).where(terminal).group_by(run.workflow_id).having(func.count() > keep)
+            )
+        ).scalars().all()
+        for workflow_id in workflow_ids:
+            # (workflow_id, started_at) index'i üzerinde geriye doğru keep satır
+            row = (
+                await db.execute(
+                    select(run.started_at, run.id)
+                    .where(run.workflow_id == workflow_id, terminal)
+                    .order_by(run.started_at.desc(), run.id.desc())
+                    .offset(keep - 1)
+                    .limit(1)
+                )
+            ).first()
+            if row is not None and row.started_at is not None:
+                cutoffs.append((workflow_id, (row.started_at, row.id)))
+    return cutoffs
+
+
+def _candidates(limit: int, now: datetime, workflow_id: Optional[int], cutoff: Optional[tuple]):
+    """Silinecek run id'leri (workflow'un sınırından eski + gün kuralı), en eskiden başlayarak."""
+    run = models.WorkflowRun
+    conditions = [run.status.in_(TERMINAL_STATUSES)]
+    if settings.RUN_RETENTION_DAYS > 0:
+        conditions.append(run.started_at < now - timedelta(days=settings.RUN_RETENTION_DAYS))
+    if workflow_id is not None:
+        conditions.append(run.workflow_id == workflow_id)
+        conditions.append(tuple_(run.started_at, run.id) < tuple_(*cutoff))
+    return select(run.id).where(*conditions).order_by(run.started_at, run.id).limit(limit)
+
+
+async def compact_batch(
+    session: AsyncSession,
+    now: datetime,
+    workflow_id: Optional[int] = None,
+    cutoff: Optional[tuple] = None,
+) -> int:
+    """
+    Bir batch run'ı günlük özetlere ekleyip siler. Silinen run sayısını döner.
+    workflow_id / cutoff _cutoffs()'tan gelir (None -> sadece gün kuralı, tüm workflow'lar).
+    """
+    query = _candidates(settings.RUN_RETENTION_BATCH_SIZE, now, workflow_id, cutoff)
+    ids = (await session.execute(query)).scalars().all()
+    if not ids:
+        return 0
+
+    run = models.WorkflowRun
+    rows = (
+        await session.execute(
+            select(run.workflow_id, run.status, run.started_at, run.finished_at, run.input_data, run.output_data).where(
+                run.id.in_(ids)
+            )
+        )
+    ).all()
+
+    daily: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        day = (row.started_at or now).date().isoformat()
+        bucket = daily.setdefault((row.workflow_id, day, row.status), {"runs": 0, "duration": 0.0, "max": 0.0})
+        bucket["runs"] += 1
+        if row.started_at and row.finished_at:
+            duration = max((row.finished_at - row.started_at).total_seconds(), 0.0)
+            bucket["duration"] += duration
+            bucket["max"] = max(bucket["max"], duration)
+        await release_payload(session, row.input_data)
+        await release_payload(session, row.output_data)
+
+    stats = models.RunDailyStat
+    stmt = sqlite_insert(stats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[stats.workflow_id, stats.day, stats.status],
+        set_={
+            "runs": stats.runs + stmt.excluded.runs,
+            "total_duration_seconds": stats.total_duration_seconds + stmt.excluded.total_duration_seconds,
+            "max_duration_seconds": func.max(stats.max_duration_seconds, stmt.excluded.max_duration_seconds),
+        },
+    )
+    await session.execute(
+        stmt,
+        [
+            {
+                "workflow_id": workflow_id,
+                "day": day,
+                "status": status,
+                "runs": bucket["runs"],
+                "total_duration_seconds": bucket["duration"],
+                "max_duration_seconds": bucket["max"],
+            }
+            for (workflow_id, day, status), bucket in daily.items()
+        ],
+    )
+    await session.execute(delete(run).where(run.id.in_(ids)).execution_options(synchronize_session=False))
+    return len(ids)
+
+
+async def incremental_vacuum(session: AsyncSession, pages: int) -> int:
+    """auto_vacuum=INCREMENTAL ise en fazla `pages` boş sayfayı dosyadan geri verir."""
+    if (await session.execute(text("PRAGMA auto_vacuum"))).scalar() != 2:
+        return 0
+    free = (await session.execute(text("PRAGMA freelist_count"))).scalar() or 0
+    if free <= 0:
+        return 0
+    # incremental_vacuum her adımda (sqlite3_step) bir sayfa boşaltır; pysqlite sonuç kolonu
+    # olmayan ifadeyi tek adım çalıştırdığı için sayfa başına bir kez çağrılır
+    for _ in range(min(free, pages)):
+        await session.execute(text("PRAGMA incremental_vacuum(1)"))
+    remaining = (await session.execute(text("PRAGMA freelist_count"))).scalar() or 0
+    return free - remaining
+
+
+async def apply_retention(max_batches: Optional[int] = None) -> Dict[str, int]:
+    """
+    Politikayı uygular: workflow sınırları bir kez hesaplanır, her workflow için aday kalmayana
+    kadar batch batch sıkıştırılır, sonra boş sayfalar geri verilir.
+    """
+    removed = 0
+    batches = 0
+    now = datetime.utcnow()
+    for workflow_id, cutoff in await _cutoffs(now) or ():
+        while max_batches is None or batches < max_batches:
+            count = await run_write(lambda session: compact_batch(session, now, workflow_id, cutoff))
+            removed += count
+            batches += 1 if count else 0
+            await asyncio.sleep(0)  # diğer yazmalar araya girebilsin
+            if count < settings.RUN_RETENTION_BATCH_SIZE:
+                break
+    freed = 0
+    if removed and settings.RUN_RETENTION_VACUUM_PAGES > 0:
+        freed = await run_write(lambda session: incremental_vacuum(session, settings.RUN_RETENTION_VACUUM_PAGES))
+    return {"removed": removed, "batches": batches, "freed_pages": freed}
+
+
+async def run_retention_worker(stop: asyncio.Event, interval: Optional[float] = None) -> None:
+    """RUN_RETENTION_INTERVAL_SECONDS'ta bir apply_retention."""
+    interval = interval or settings.RUN_RETENTION_INTERVAL_SECONDS
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+            break
+        except asyncio.TimeoutError:
+            pass
+        try:
+            result = await apply_retention()
+        except Exception:
+            logger.exception("Run retention failed")
+            continue
+        if result["removed"]:
+            logger.info("Run retention: %s", result)
+
+
+# ============================================================
+# Geçmiş okuma
+# ============================================================
+async def daily_history(db: AsyncSession, workflow_id: int, since: datetime) -> List[Dict[str, Any]]:
+    """
+    (gün, status) bazında run sayıları: sıkıştırılmış günlük özetler + henüz silinmemiş run'lar.
+    Silinmemiş run'lar (workflow_id, started_at) index'inden gruplanır.
+    """
+    run, stats = models.WorkflowRun, models.RunDailyStat
+    day = func.date(run.started_at)
+    live = (
+        await db.execute(
+            select(
+                day.label("day"),
+                run.status,
+                func.count().label("runs"),
+                func.coalesce(
+                    func.sum((func.julianday(run.finished_at) - func.julianday(run.started_at)) * 86400.0), 0.0
+                ).label("duration"),
+            )
+            .where(run.workflow_id == workflow_id, run.started_at >= since)
+            .group_by(day, run.status)
+        )
+    ).all()
+    compacted = (
+        await db.execute(
+            select(stats.day, stats.status, stats.runs, stats.total_duration_seconds.label("duration")).where(
+                and_(stats.workflow_id == workflow_id, stats.day >= since.date().isoformat())
+            )
+        )
+    ).all()
+
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for row in list(compacted) + list(live):
+        entry = merged.setdefault((row.day, row.status), {"day": row.day, "status": row.status, "runs": 0, "duration": 0.0})
+        entry["runs"] += row.runs
+        entry["duration"] += float(row.duration or 0.0)
+    return [
+        {
+            "day": entry["day"],
+            "status": entry["status"],
+            "runs": entry["runs"],
+            "avg_duration_seconds": round(entry["duration"] / entry["runs"], 3) if entry["runs"] else None,
+        }
+        for _, entry in sorted(merged.items())
+    ]
@@ -1,13 +1,29 @@
 # app/routers/admin.py
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
-from app.db import get_db
+from app.ai_cache import ai_cache
+from app.bulk import JSON_ARRAY, MEDIA_TYPES, NDJSON, export_rows, import_users, import_workflows, run_import
+from app.db import get_db, run_write
+from app.etag import ETAG_HEADER, if_none_match, not_modified, page_etag, probe_workflow_page_etag
+from app.graph import compiled_graph_cache
+from app.http_clients import http_clients
 from app import models
-from app.schemas import WorkflowRead
+from app.pagination import NEXT_CURSOR_HEADER, keyset_page, limit_query, split_page
+from app.passwords import password_hasher
+from app.retention import apply_retention
+from app.scheduler import scheduler
+from app.schemas import UserAdminUpdate, UserImport, WorkflowImport, WorkflowRead, WorkflowSummary
+from app.security import invalidate_user, require_admin, user_cache
+from app.stats import read_summary, read_workflows_by_owner, reconcile_stats
+from app.workflow_nodes import rebuild_workflow_nodes
 
 router = APIRouter(
     prefix="/admin",
@@ -15,38 +31,125 @@ router = APIRouter(
 )
 
 
+# Parola hash'i export edilmez
+USER_EXPORT_COLUMNS = (
+    models.User.id,
+    models.User.full_name,
+    models.User.email,
+    models.User.is_active,
+    models.User.created_at,
+    models.User.last_login,
+)
+
+
 # ==========================
 # Users – tüm kullanıcıları listele
 # ==========================
 
 @router.get("/users/")
-def list_users(
-    db: Session = Depends(get_db),
-):
+async def list_users():
     """
     Tüm kullanıcıları basit bir JSON listesi olarak döner.
     Admin panelde tabloya basmak için.
+    Liste bellekte kurulmaz; satırlar server-side cursor'dan parça parça yazılır.
     """
-    users: List[models.User] = db.query(models.User).order_by(models.User.id.asc()).all()
-
-    result = []
-    for u in users:
-        result.append(
-            {
-                "id": u.id,
-                "full_name": u.full_name,
-                "email": u.email,
-                "is_active": u.is_active,
-                "created_at": (
-                    u.created_at.isoformat() + "Z" if isinstance(u.created_at, datetime) else u.created_at
-                ),
-                "last_login": (
-                    u.last_login.isoformat() + "Z" if isinstance(u.last_login, datetime) and u.last_login else None
-                ),
-            }
-        )
+    query = select(*USER_EXPORT_COLUMNS).order_by(models.User.id.asc())
+    return StreamingResponse(
+        export_rows(query, [column.key for column in USER_EXPORT_COLUMNS], JSON_ARRAY, to_dict=_user_to_dict),
+        media_type=MEDIA_TYPES[JSON_ARRAY],
+    )
+
+
+@router.patch("/users/{user_id}", dependencies=[Depends(require_admin)])
+async def update_user(
+    user_id: int,
+    payload: UserAdminUpdate,
+):
+    """
+    Kullanıcıyı güncelle (isim / aktiflik). X-Admin-Token gerekir.
+    Bu process'in auth cache'indeki kaydı da düşürür; diğer process'lerde pasifleştirme
+    en geç AUTH_USER_CACHE_TTL_SECONDS sonra geçerli olur.
+    """
+    update_data = payload.dict(exclude_unset=True)
+
+    async def _update(session: AsyncSession) -> models.User:
+        result = await session.execute(select(models.User).filter_by(id=user_id))
+        user = result.scalar_one_or_none()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
+            )
+        for field, value in update_data.items():
+            setattr(user, field, value)
+        await session.flush()
+        return user
+
+    user = await run_write(_update)
+    # after_update event'i flush anında temizliyor; commit'ten önce araya giren bir
+    # istek eski kaydı tekrar cache'lemiş olabilir -> commit sonrası bir kez daha
+    invalidate_user(user_id)
+    return _user_to_dict(user)
+
+
+@router.get("/cache/auth")
+async def auth_cache_stats():
+    """get_current_user cache'inin hit/miss sayaçları."""
+    return user_cache.stats()
+
+
+@router.get("/cache/graphs")
+async def graph_cache_stats():
+    """Derlenmiş workflow graph cache'inin hit/miss sayaçları."""
+    return compiled_graph_cache.stats()
+
+
+@router.get("/cache/ai")
+async def ai_cache_stats():
+    """ai node cevap cache'i: bellek / disk hit, miss ve hit oranı."""
+    return ai_cache.stats()
+
+
+@router.get("/http-clients")
+async def http_client_stats():
+    """Paylaşılan dış HTTP client havuzları: açık client'lar, istek ve birleştirilen GET sayısı."""
+    return http_clients.stats()
+
 
-    return result
+@router.get("/scheduler")
+async def scheduler_stats():
+    """Bu process'in scheduler durumu: lider mi, planlı timer sayısı, en yakın tetikleme."""
+    return scheduler.stats()
+
+
+@router.get("/password-hasher")
+async def password_hasher_stats():
+    """Parola hash havuzu: bekleyen iş sayısı ve 429 ile reddedilen istekler."""
+    return password_hasher.stats()
+
+
+@router.post("/workflow-nodes/rebuild")
+async def rebuild_node_index():
+    """
+    workflow_nodes tablosunu tüm workflow'ların graph_json'ından yeniden eşitler.
+    Tablo doldurulmaya başlanmadan önce kaydedilmiş workflow'lar için bir kez çalıştırılır.
+    """
+    return await run_write(rebuild_workflow_nodes)
+
+
+def _user_to_dict(u) -> dict:
+    return {
+        "id": u.id,
+        "full_name": u.full_name,
+        "email": u.email,
+        "is_active": u.is_active,
+        "created_at": (
+            u.created_at.isoformat() + "Z" if isinstance(u.created_at, datetime) else u.created_at
+        ),
+        "last_login": (
+            u.last_login.isoformat() + "Z" if isinstance(u.last_login, datetime) and u.last_login else None
+        ),
+    }
 
 
 # ==========================
@@ -54,38 +157,202 @@ def list_users(
 # ==========================
 
 @router.get("/workflows/", response_model=List[WorkflowRead])
-def admin_list_workflows(
+async def admin_list_workflows(
+    response: Response,
     owner_id: Optional[int] = Query(default=None, description="Opsiyonel filtre: belirli owner_id için"),
-    db: Session = Depends(get_db),
-) -> List[WorkflowRead]:
+    cursor: Optional[str] = Query(default=None, description="Önceki sayfanın X-Next-Cursor değeri"),
+    limit: int = Depends(limit_query),
+    if_none_match_header: Optional[str] = Header(default=None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Admin için tüm workflow kayıtlarını listeler.
-    (owner filtresi opsiyonel)
+    Admin için workflow kayıtlarını sayfalı listeler.
+    (owner filtresi opsiyonel, sonraki sayfa cursor'ı X-Next-Cursor header'ında)
     Auth yok – sadece internal kullanım.
     """
-    query = db.query(models.Workflow)
-
+    conditions = []
     if owner_id is not None:
-        query = query.filter(models.Workflow.owner_id == owner_id)
+        conditions.append(models.Workflow.owner_id == owner_id)
 
-    workflows: List[models.Workflow] = (
-        query.order_by(models.Workflow.created_at.desc()).all()
-    )
+    if if_none_match_header:
+        etag = await probe_workflow_page_etag(db, conditions, cursor, limit)
+        if if_none_match(if_none_match_header, etag):
+            return not_modified(etag)
+
+    query = select(models.Workflow).where(*conditions).options(undefer(models.Workflow.graph_json))
+    query = keyset_page(query, models.Workflow.created_at, models.Workflow.id, cursor, limit)
+    result = await db.execute(query)
+    workflows, next_cursor = split_page(result.scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    response.headers[ETAG_HEADER] = page_etag(workflows, next_cursor)
     return workflows
 
 
+@router.get("/workflows/summary", response_model=List[WorkflowSummary])
+async def admin_list_workflow_summaries(
+    response: Response,
+    owner_id: Optional[int] = Query(default=None, description="Opsiyonel filtre: belirli owner_id için"),
+    cursor: Optional[str] = Query(default=None, description="Önceki sayfanın X-Next-Cursor değeri"),
+    limit: int = Depends(limit_query),
+    if_none_match_header: Optional[str] = Header(default=None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    admin_list_workflows'un graph_json içermeyen hafif versiyonu.
+    """
+    query = select(*models.WORKFLOW_SUMMARY_COLUMNS)
+
+    if owner_id is not None:
+        query = query.where(models.Workflow.owner_id == owner_id)
+
+    query = keyset_page(query, models.Workflow.created_at, models.Workflow.id, cursor, limit)
+    result = await db.execute(query)
+    rows, next_cursor = split_page(result.all(), limit)
+    etag = page_etag(rows, next_cursor)
+    if if_none_match(if_none_match_header, etag):
+        return not_modified(etag)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    response.headers[ETAG_HEADER] = etag
+    return [row._mapping for row in rows]
+
+
 @router.get("/workflows/{workflow_id}", response_model=WorkflowRead)
-def admin_get_workflow(
+async def admin_get_workflow(
     workflow_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> WorkflowRead:
     """
     Admin için tek bir workflow getirir (auth yok).
     """
-    wf = db.query(models.Workflow).filter_by(id=workflow_id).first()
+    result = await db.execute(
+        select(models.Workflow).filter_by(id=workflow_id).options(undefer(models.Workflow.graph_json))
+    )
+    wf = result.scalar_one_or_none()
     if not wf:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Workflow not found",
         )
     return wf
+
+
+# ==========================
+# İstatistikler – stat_counters'tan (tablo taranmaz)
+# ==========================
+
+@router.get("/stats")
+async def admin_stats(
+    db: AsyncSession = Depends(get_db),
+):
+    """Kullanıcı / workflow / run sayıları ve status dağılımı (trigger'larla güncel tutulan sayaçlar)."""
+    return await read_summary(db)
+
+
+@router.get("/stats/workflows-by-owner")
+async def admin_stats_workflows_by_owner(
+    limit: int = Depends(limit_query),
+    owner_id: Optional[int] = Query(default=None, description="Opsiyonel: tek bir owner'ın sayısı"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Owner başına workflow sayısı, çoktan aza."""
+    return await read_workflows_by_owner(db, limit, owner_id)
+
+
+@router.post("/stats/reconcile")
+async def admin_stats_reconcile():
+    """Sayaçları tablolardan yeniden hesaplar; düzeltilen sayaçları döner (normalde boş)."""
+    return await run_write(reconcile_stats)
+
+
+@router.post("/runs/compact")
+async def admin_compact_runs(
+    max_batches: Optional[int] = Query(default=None, ge=1, description="En fazla bu kadar batch (boş -> hepsi)"),
+):
+    """
+    Run saklama politikasını hemen uygular (normalde RUN_RETENTION_INTERVAL_SECONDS'ta bir arka planda).
+    Silinen run'lar günlük özetlere eklenir; boş sayfalar incremental_vacuum ile geri verilir.
+    """
+    return await apply_retention(max_batches=max_batches)
+
+
+# ==========================
+# Toplu export / import
+# ==========================
+
+def _export_response(rows, fmt: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+@router.get("/export/users")
+async def export_users(
+    format: Literal["ndjson", "csv"] = Query(default=NDJSON),
+):
+    """Tüm kullanıcıları NDJSON / CSV olarak stream eder (sabit bellek)."""
+    columns = [column.key for column in USER_EXPORT_COLUMNS]
+    query = select(*USER_EXPORT_COLUMNS).order_by(models.User.id.asc())
+    return _export_response(export_rows(query, columns, format), format, "users")
+
+
+@router.get("/export/workflows")
+async def export_workflows(
+    format: Literal["ndjson", "csv"] = Query(default=NDJSON),
+    owner_id: Optional[int] = Query(default=None, description="Opsiyonel filtre: belirli owner_id için"),
+    include_graph: bool = Query(default=True, description="False -> graph_json okunmaz"),
+):
+    """
+    Workflow'ları NDJSON / CSV olarak stream eder (CSV'de graph_json JSON metni olarak).
+    Çıktı POST /admin/import/workflows ile tekrar içeri alınabilir.
+    """
+    columns = list(models.WORKFLOW_SUMMARY_COLUMNS) + [models.Workflow.ai_cache_enabled]
+    if include_graph:
+        columns.append(models.Workflow.graph_json)
+    query = select(*columns).order_by(models.Workflow.id.asc())
+    if owner_id is not None:
+        query = query.where(models.Workflow.owner_id == owner_id)
+    return _export_response(export_rows(query, [column.key for column in columns], format), format, "workflows")
+
+
+@router.post("/import/workflows", status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
+async def import_workflow_records(request: Request):
+    """
+    NDJSON (application/x-ndjson) veya CSV (text/csv) gövdesinden workflow'ları toplu ekler.
+    X-Admin-Token gerekir (owner_id dahil tüm alanlar gövdeden gelir).
+    Önce tüm kayıtlar doğrulanır (hatalı satır -> 422, hiçbir şey yazılmaz),
+    sonra hepsi tek transaction'da executemany ile yazılır.
+    Timer node'lu workflow'lar commit sonrası scheduler'a bildirilir (sonraki sync beklenmez).
+    """
+    async def _write(batches):
+        timer_workflow_ids: List[int] = []
+        totals = await run_write(lambda session: import_workflows(session, batches, timer_workflow_ids))
+        for workflow_id in timer_workflow_ids:
+            scheduler.workflow_changed(workflow_id)
+        return totals
+
+    return await run_import(request, WorkflowImport, _write)
+
+
+@router.post("/import/users", status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
+async def import_user_records(
+    request: Request,
+    skip_existing: bool = Query(default=False, description="True -> kayıtlı email'ler atlanır, False -> 409"),
+):
+    """
+    Kullanıcıları toplu ekler (parola hash'i hazır gelir: password_hash). X-Admin-Token gerekir.
+    Aynı email varsa skip_existing=False iken tüm import geri alınır.
+    """
+    async def _write(batches):
+        try:
+            return await run_write(lambda session: import_users(session, batches, skip_existing))
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Import contains an email that is already registered",
+            )
+
+    return await run_import(request, UserImport, _write)
@@ -1,14 +1,15 @@
 # app/routers/auth.py
 from datetime import datetime
 from typing import Optional
-import hashlib
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import get_db, run_write
 from app import models
+from app.passwords import hash_password, verify_password
 
 
 router = APIRouter(
@@ -17,17 +18,6 @@ router = APIRouter(
 )
 
 
-# -----------------------
-# Helpers
-# -----------------------
-def _hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
-
-
-def _verify_password(password: str, password_hash: str) -> bool:
-    return _hash_password(password) == password_hash
-
-
 # -----------------------
 # Schemas
 # -----------------------
@@ -63,42 +53,62 @@ class LoginResponse(BaseModel):
 # Register
 # -----------------------
 @router.post("/register", response_model=AuthUser, status_code=201)
-def register_user(payload: RegisterRequest, db: Session = Depends(get_db)):
-
-    # email varsa hata
-    existing = db.query(models.User).filter_by(email=payload.email).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered.")
-
-    user = models.User(
-        full_name=payload.full_name,
-        email=payload.email,
-        password_hash=_hash_password(payload.password),
-        is_active=True,              # doğrulama yok → direk aktif
-    )
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-
-    return user
+async def register_user(payload: RegisterRequest):
+    # scrypt yazma kuyruğu dışında (process havuzunda) hesaplanır
+    password_hash = await hash_password(payload.password)
+
+    async def _register(session: AsyncSession) -> models.User:
+        # email varsa hata (kontrol yazma transaction'ı içinde → yarış yok)
+        result = await session.execute(select(models.User).filter_by(email=payload.email))
+        existing = result.scalar_one_or_none()
+        if existing:
+            raise HTTPException(status_code=400, detail="Email already registered.")
+
+        user = models.User(
+            full_name=payload.full_name,
+            email=payload.email,
+            password_hash=password_hash,
+            is_active=True,              # doğrulama yok → direk aktif
+        )
+        session.add(user)
+        await session.flush()
+        return user
+
+    return await run_write(_register)
 
 
 # -----------------------
 # Login
 # -----------------------
 @router.post("/login", response_model=LoginResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter_by(email=payload.email).first()
-    if not user or not _verify_password(payload.password, user.password_hash):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(models.User).filter_by(email=payload.email))
+    user = result.scalar_one_or_none()
+    valid, needs_rehash = await verify_password(payload.password, user.password_hash if user else None)
+    if not user or not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password.")
 
     if not user.is_active:
         raise HTTPException(status_code=403, detail="User disabled.")
 
     user.last_login = datetime.utcnow()
-    db.add(user)
-    db.commit()
+    values = {"last_login": user.last_login}
+    if needs_rehash:
+        # Eski SHA-256 / eski parametreli hash: parola elimizdeyken yenile.
+        # Havuz doluysa login yine başarılı, yenileme sonraki login'e kalır.
+        try:
+            values["password_hash"] = await hash_password(payload.password)
+        except HTTPException:
+            pass
+
+    async def _touch_last_login(session: AsyncSession) -> None:
+        await session.execute(
+            update(models.User)
+            .where(models.User.id == user.id)
+            .values(**values)
+        )
+
+    await run_write(_touch_last_login)
 
     token = str(user.id)  # ❗ Çok basit token — Bearer <id>
 
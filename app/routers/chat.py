@@ -0,0 +1,236 @@
+# app/routers/chat.py
+import asyncio
+import json
+from typing import List, Optional
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.chat import ChatError, append_messages, recent_messages, stream_completion
+from app.config import settings
+from app.db import AsyncReadSessionLocal, get_db, run_write
+from app import models
+from app.pagination import NEXT_CURSOR_HEADER, keyset_page, limit_query, split_page
+from app.schemas import (
+    ChatMessageAppend,
+    ChatMessageRead,
+    ChatReplyRequest,
+    ChatSessionCreate,
+    ChatSessionRead,
+)
+from app.security import get_current_user
+
+router = APIRouter(
+    prefix="/chat",
+    tags=["chat"],
+)
+
+
+async def _get_owned_session(db: AsyncSession, session_id: int, user: models.User) -> models.ChatSession:
+    result = await db.execute(select(models.ChatSession).filter_by(id=session_id, user_id=user.id))
+    chat_session = result.scalar_one_or_none()
+    if chat_session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat session not found",
+        )
+    return chat_session
+
+
+def _message_to_dict(m: models.ChatMessage) -> dict:
+    return {
+        "id": m.id,
+        "session_id": m.session_id,
+        "role": m.role,
+        "content": m.content,
+        "timestamp": m.timestamp.isoformat() if m.timestamp else None,
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+# ==========================
+# Sessions
+# ==========================
+
+@router.post("/sessions", response_model=ChatSessionRead, status_code=status.HTTP_201_CREATED)
+async def create_chat_session(
+    payload: ChatSessionCreate,
+    current_user: models.User = Depends(get_current_user),
+):
+    async def _create(session: AsyncSession) -> models.ChatSession:
+        chat_session = models.ChatSession(title=payload.title, user_id=current_user.id)
+        session.add(chat_session)
+        await session.flush()
+        return chat_session
+
+    return await run_write(_create)
+
+
+@router.get("/sessions", response_model=List[ChatSessionRead])
+async def list_chat_sessions(
+    response: Response,
+    cursor: Optional[str] = Query(default=None, description="Önceki sayfanın X-Next-Cursor değeri"),
+    limit: int = Depends(limit_query),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Kullanıcının chat session'ları, yeniden eskiye (created_at, id) keyset sayfalı."""
+    query = keyset_page(
+        select(models.ChatSession).where(models.ChatSession.user_id == current_user.id),
+        models.ChatSession.created_at,
+        models.ChatSession.id,
+        cursor,
+        limit,
+    )
+    result = await db.execute(query)
+    sessions, next_cursor = split_page(result.scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return sessions
+
+
+# ==========================
+# Messages
+# ==========================
+
+@router.get("/sessions/{session_id}/messages", response_model=List[ChatMessageRead])
+async def list_chat_messages(
+    session_id: int,
+    response: Response,
+    before: Optional[int] = Query(default=None, description="Bu mesaj id'sinden eskiler (geriye kaydırma)"),
+    after: Optional[int] = Query(default=None, description="Bu mesaj id'sinden yeniler (eskiden yeniye)"),
+    limit: int = Depends(limit_query),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Mesajları (session_id, id) index'i üzerinden keyset sayfalar.
+    Varsayılan / before: en yeniden geriye doğru (id DESC). after: verilen id'den ileri (id ASC).
+    Devamı varsa sonraki sayfanın before/after değeri X-Next-Cursor header'ında döner.
+    """
+    if before is not None and after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either 'before' or 'after', not both",
+        )
+    await _get_owned_session(db, session_id, current_user)
+
+    message = models.ChatMessage
+    query = select(message).where(message.session_id == session_id)
+    if after is not None:
+        query = query.where(message.id > after).order_by(message.id.asc())
+    else:
+        if before is not None:
+            query = query.where(message.id < before)
+        query = query.order_by(message.id.desc())
+    rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+
+    messages = list(rows[:limit])
+    if len(rows) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(messages[-1].id)
+    return messages
+
+
+@router.post(
+    "/sessions/{session_id}/messages",
+    response_model=List[ChatMessageRead],
+    status_code=status.HTTP_201_CREATED,
+)
+async def append_chat_messages(
+    session_id: int,
+    payload: ChatMessageAppend,
+    current_user: models.User = Depends(get_current_user),
+):
+    """Mesajları tek transaction'da toplu ekler (en fazla CHAT_APPEND_MAX_BATCH)."""
+    if len(payload.messages) > settings.CHAT_APPEND_MAX_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.CHAT_APPEND_MAX_BATCH} messages per request",
+        )
+    messages = [m.dict() for m in payload.messages]
+
+    async def _append(session: AsyncSession) -> List[models.ChatMessage]:
+        await _get_owned_session(session, session_id, current_user)
+        return await append_messages(session, session_id, messages)
+
+    return await run_write(_append)
+
+
+@router.post("/sessions/{session_id}/reply")
+async def stream_chat_reply(
+    session_id: int,
+    payload: ChatReplyRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Asistan cevabını Server-Sent Events olarak stream eder:
+        message  -> (content verildiyse) kaydedilen kullanıcı mesajı
+        token    -> {"delta": "..."} provider'dan geldikçe
+        error    -> {"detail": "..."} provider hatası
+        done     -> kaydedilen asistan mesajı
+    İstemci bağlantıyı yarıda keserse o ana kadar gelen kısım yine kaydedilir.
+    """
+    await _get_owned_session(db, session_id, current_user)
+    user_id = current_user.id
+
+    user_message = None
+    if payload.content:
+        user_message = (
+            await run_write(
+                lambda session: append_messages(session, session_id, [{"role": "user", "content": payload.content}])
+            )
+        )[0]
+
+    async def _save_reply(content: str) -> models.ChatMessage:
+        rows = await run_write(
+            lambda session: append_messages(session, session_id, [{"role": "assistant", "content": content}])
+        )
+        return rows[0]
+
+    async def _stream():
+        if user_message is not None:
+            yield _sse("message", _message_to_dict(user_message))
+
+        # Dependency session'ı stream başlamadan kapanır; bağlam ayrı okunur
+        async with AsyncReadSessionLocal() as read_db:
+            context = await recent_messages(read_db, session_id, settings.CHAT_CONTEXT_MESSAGES)
+        if payload.system:
+            context.insert(0, {"role": "system", "content": payload.system})
+
+        parts: List[str] = []
+        error = None
+        saved = None
+        try:
+            async for delta in stream_completion(
+                user_id,
+                context,
+                provider_ref=payload.provider,
+                model=payload.model,
+                temperature=payload.temperature,
+                max_tokens=payload.max_tokens,
+            ):
+                parts.append(delta)
+                yield _sse("token", {"delta": delta})
+        except (ChatError, httpx.HTTPError) as exc:
+            error = str(exc) or exc.__class__.__name__
+        finally:
+            if parts:
+                saved = await asyncio.shield(_save_reply("".join(parts)))
+
+        if error is not None:
+            yield _sse("error", {"detail": error})
+        if saved is not None:
+            yield _sse("done", _message_to_dict(saved))
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
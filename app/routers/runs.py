@@ -0,0 +1,262 @@
+# app/routers/runs.py
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from app.blobstore import JSON_CONTENT_TYPE, blob_digest, blob_store
+from app.config import settings
+from app.db import AsyncReadSessionLocal, get_db
+from app import models
+from app.events import run_events
+from app.pagination import NEXT_CURSOR_HEADER, keyset_page, limit_query, split_page
+from app.retention import daily_history
+from app.run_queue import enqueue_run
+from app.serialization import rows_response
+from app.schemas import RunDailyHistory, WorkflowRunCreate, WorkflowRunRead, WorkflowRunSummary
+from app.security import authenticate_token, get_current_user
+
+
+router = APIRouter(
+    prefix="/workflows",
+    tags=["runs"],
+)
+
+# WorkflowRunSummary alanları; liste satırları bu kolonlardan doğrudan encode edilir
+RUN_SUMMARY_FIELDS = ("id", "workflow_id", "status", "error_message", "attempts", "started_at", "finished_at")
+
+
+async def _check_owned_workflow(db: AsyncSession, workflow_id: int, user: models.User) -> None:
+    """Sahiplik kontrolü; sadece id okunur (graph_json yüklenmez)."""
+    result = await db.execute(
+        select(models.Workflow.id).filter_by(id=workflow_id, owner_id=user.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workflow not found",
+        )
+
+
+async def _check_owned_run(db: AsyncSession, workflow_id: int, run_id: int, user: models.User) -> None:
+    await _check_owned_workflow(db, workflow_id, user)
+    result = await db.execute(
+        select(models.WorkflowRun.id).filter_by(id=run_id, workflow_id=workflow_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Run not found",
+        )
+
+
+async def _get_owned_run(db: AsyncSession, workflow_id: int, run_id: int, user: models.User) -> models.WorkflowRun:
+    await _check_owned_workflow(db, workflow_id, user)
+    run = models.WorkflowRun
+    result = await db.execute(
+        select(run)
+        .filter_by(id=run_id, workflow_id=workflow_id)
+        .options(undefer(run.input_data), undefer(run.output_data))
+    )
+    row = result.scalar_one_or_none()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Run not found",
+        )
+    return row
+
+
+@router.post(
+    "/{workflow_id}/runs",
+    response_model=WorkflowRunRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def start_run(
+    workflow_id: int,
+    payload: WorkflowRunCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> WorkflowRunRead:
+    """
+    Workflow'u çalıştırmak üzere kuyruğa ekle.
+    Run hemen "queued" olarak döner; worker'lar çalıştırıp sonucu WorkflowRun
+    kaydına yazar. Durum GET /{workflow_id}/runs/{run_id} ile izlenir.
+    Değişmeyen node'ların çıktıları önceki run'lardan kullanılır; force_full=True
+    ile tüm graph baştan çalıştırılır.
+    """
+    await _check_owned_workflow(db, workflow_id, current_user)
+
+    max_concurrency = payload.max_concurrency
+    if max_concurrency is not None:
+        max_concurrency = min(max_concurrency, settings.RUN_MAX_CONCURRENCY_LIMIT)
+
+    return await enqueue_run(workflow_id, payload.input_data, max_concurrency, force_full=payload.force_full)
+
+
+@router.get("/{workflow_id}/runs", response_model=List[WorkflowRunSummary])
+async def list_runs(
+    workflow_id: int,
+    status_filter: Optional[str] = Query(default=None, alias="status", description="ör. success, failed"),
+    cursor: Optional[str] = Query(default=None, description="Önceki sayfanın X-Next-Cursor değeri"),
+    limit: int = Depends(limit_query),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Run geçmişi, yeniden eskiye (started_at, id) keyset sayfalı.
+    (workflow_id, started_at) index'i üzerinden okunur; input/output payload'ları dönmez.
+    Saklama süresini aşıp silinen run'lar için: GET /{workflow_id}/runs/daily
+    """
+    await _check_owned_workflow(db, workflow_id, current_user)
+    run = models.WorkflowRun
+    query = select(*(getattr(run, field) for field in RUN_SUMMARY_FIELDS)).where(run.workflow_id == workflow_id)
+    if status_filter:
+        query = query.where(run.status == status_filter)
+    result = await db.execute(keyset_page(query, run.started_at, run.id, cursor, limit))
+    runs, next_cursor = split_page(result.all(), limit, created_attr="started_at")
+    return rows_response(runs, RUN_SUMMARY_FIELDS, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+
+@router.get("/{workflow_id}/runs/daily", response_model=List[RunDailyHistory])
+async def get_daily_run_history(
+    workflow_id: int,
+    days: int = Query(default=30, ge=1, le=366),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Son `days` günün (gün, status) bazında run sayıları ve ortalama süreleri.
+    Saklama politikasıyla silinmiş run'lar günlük özetlerden gelir.
+    """
+    await _check_owned_workflow(db, workflow_id, current_user)
+    since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    return await daily_history(db, workflow_id, since)
+
+
+@router.get("/{workflow_id}/runs/{run_id}", response_model=WorkflowRunRead)
+async def get_run(
+    workflow_id: int,
+    run_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> WorkflowRunRead:
+    """
+    Tek bir run kaydını getir (sadece workflow sahibi).
+    """
+    return await _get_owned_run(db, workflow_id, run_id, current_user)
+
+
+def _sse_message(event: Optional[dict]) -> str:
+    if event is None:
+        return ": keepalive\n\n"
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+@router.get("/{workflow_id}/runs/{run_id}/events")
+async def stream_run_events(
+    workflow_id: int,
+    run_id: int,
+    after: Optional[int] = Query(None, ge=0, description="Bu seq'ten sonraki event'ler"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Run event'lerini Server-Sent Events olarak stream et.
+    Yeniden bağlanan EventSource'un Last-Event-ID'si ile kaçan event'ler replay edilir;
+    run bitince (run.finished) stream kapanır.
+    """
+    await _check_owned_run(db, workflow_id, run_id, current_user)
+    if after is None:
+        after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    async def _stream():
+        async for event in run_events.subscribe(run_id, after, keepalive=settings.RUN_EVENT_KEEPALIVE_SECONDS):
+            yield _sse_message(event)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{workflow_id}/runs/{run_id}/ws")
+async def run_events_websocket(
+    websocket: WebSocket,
+    workflow_id: int,
+    run_id: int,
+    token: Optional[str] = Query(None),
+    after: int = Query(0, ge=0),
+):
+    """
+    Run event'lerini WebSocket üzerinden JSON mesajlar olarak gönder.
+    Tarayıcı header set edemediği için token ?token=<token> ile de verilebilir.
+    """
+    if token is None:
+        scheme, _, value = (websocket.headers.get("authorization") or "").partition(" ")
+        token = value if scheme.lower() == "bearer" else None
+
+    # Yetki kontrolü için kısa ömürlü session; stream boyunca bağlantı tutulmaz
+    async with AsyncReadSessionLocal() as db:
+        try:
+            if not token:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+            user = await authenticate_token(token, db)
+            await _check_owned_run(db, workflow_id, run_id, user)
+        except HTTPException as exc:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail))
+            return
+
+    await websocket.accept()
+    try:
+        async for event in run_events.subscribe(run_id, after, keepalive=settings.RUN_EVENT_KEEPALIVE_SECONDS):
+            await websocket.send_json(event if event is not None else {"type": "keepalive"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+@router.get("/{workflow_id}/runs/{run_id}/output")
+async def download_run_output(
+    workflow_id: int,
+    run_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Run çıktısını indir.
+    Blob store'daki büyük çıktılar belleğe alınmadan dosyadan stream edilir
+    (sunucu destekliyorsa pathsend/sendfile ile).
+    """
+    await _check_owned_workflow(db, workflow_id, current_user)
+    result = await db.execute(
+        select(models.WorkflowRun.output_data).filter_by(id=run_id, workflow_id=workflow_id)
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Run not found",
+        )
+
+    digest = blob_digest(row.output_data)
+    if digest is None:
+        return JSONResponse(content=row.output_data)
+    if not blob_store.exists(digest):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Run output blob is no longer available",
+        )
+    return FileResponse(
+        blob_store.path_for(digest),
+        media_type=JSON_CONTENT_TYPE,
+        filename=f"run-{run_id}-output.json",
+    )
@@ -0,0 +1,46 @@
+# app/routers/search.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import get_db
+from app import models
+from app.pagination import limit_query
+from app.schemas import ChatMessageSearchHit, WorkflowSearchHit
+from app.search import search_chat_messages, search_workflows
+from app.security import get_current_user
+
+router = APIRouter(
+    prefix="/search",
+    tags=["search"],
+)
+
+
+@router.get("/workflows", response_model=List[WorkflowSearchHit])
+async def search_workflow_index(
+    q: str = Query(..., min_length=1, description="Aranacak kelimeler (son kelime önek olarak aranır)"),
+    limit: int = Depends(limit_query),
+    offset: int = Query(default=0, ge=0, le=settings.SEARCH_MAX_OFFSET),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Kullanıcının workflow'larında ad, açıklama ve node etiketlerine göre arama.
+    Sonuçlar bm25 skoruna göre sıralı (küçük skor = daha alakalı).
+    """
+    return await search_workflows(db, current_user.id, q, limit, offset)
+
+
+@router.get("/chat", response_model=List[ChatMessageSearchHit])
+async def search_chat_index(
+    q: str = Query(..., min_length=1, description="Aranacak kelimeler (son kelime önek olarak aranır)"),
+    session_id: Optional[int] = Query(default=None, description="Sadece bu chat session'ında ara"),
+    limit: int = Depends(limit_query),
+    offset: int = Query(default=0, ge=0, le=settings.SEARCH_MAX_OFFSET),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Kullanıcının chat mesajlarında arama."""
+    return await search_chat_messages(db, current_user.id, q, limit, offset, session_id)
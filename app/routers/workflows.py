@@ -1,17 +1,43 @@
 # app/routers/workflows.py
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
-from app.db import get_db
+from app.db import get_db, run_write
+from app.etag import (
+    ETAG_HEADER,
+    check_if_match,
+    if_none_match,
+    not_modified,
+    page_etag,
+    probe_workflow_page_etag,
+    workflow_etag,
+)
+from app.graph import invalidate_compiled_graph
+from app.jsonpatch import JsonPatchError, apply_patch
+from app.memo import delete_workflow_memos
 from app import models
+from app.pagination import NEXT_CURSOR_HEADER, keyset_page, limit_query, split_page
+from app.scheduler import scheduler
+from app.serialization import (
+    WORKFLOW_SUMMARY_FIELDS,
+    rows_response,
+    workflow_read_columns,
+    workflow_response,
+    workflows_response,
+)
 from app.schemas import (
     WorkflowCreate,
+    WorkflowPatch,
     WorkflowRead,
+    WorkflowSummary,
     WorkflowUpdate,
 )
 from app.security import get_current_user  # 👈 Auth dependency
+from app.workflow_nodes import delete_workflow_nodes, sync_workflow_nodes
 
 
 router = APIRouter(
@@ -21,123 +47,329 @@ router = APIRouter(
 
 
 @router.get("/", response_model=List[WorkflowRead])
-def list_workflows(
-    db: Session = Depends(get_db),
+async def list_workflows(
+    cursor: Optional[str] = Query(default=None, description="Önceki sayfanın X-Next-Cursor değeri"),
+    limit: int = Depends(limit_query),
+    if_none_match_header: Optional[str] = Header(default=None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
-) -> List[WorkflowRead]:
+):
     """
-    Giriş yapmış kullanıcının tüm workflow kayıtlarını listele.
+    Giriş yapmış kullanıcının workflow kayıtlarını (created_at, id) sırasıyla sayfalı listele.
+    Sonraki sayfa varsa cursor X-Next-Cursor header'ında döner.
+    Sayfa ETag'i If-None-Match ile eşleşirse 304 (graph_json okunmadan).
+    graph_json parse edilmeden, saklandığı JSON byte'larıyla cevaba eklenir (app/serialization.py).
     """
-    workflows: List[models.Workflow] = (
-        db.query(models.Workflow)
-        .filter_by(owner_id=current_user.id)
-        .order_by(models.Workflow.created_at.desc())
-        .all()
+    if if_none_match_header:
+        etag = await probe_workflow_page_etag(
+            db, [models.Workflow.owner_id == current_user.id], cursor, limit
+        )
+        if if_none_match(if_none_match_header, etag):
+            return not_modified(etag)
+
+    query = keyset_page(
+        select(*workflow_read_columns()).where(models.Workflow.owner_id == current_user.id),
+        models.Workflow.created_at,
+        models.Workflow.id,
+        cursor,
+        limit,
     )
-    return workflows
+    result = await db.execute(query)
+    rows, next_cursor = split_page(result.all(), limit)
+    headers = {ETAG_HEADER: page_etag(rows, next_cursor)}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return workflows_response(rows, headers)
+
+
+@router.get("/summary", response_model=List[WorkflowSummary])
+async def list_workflow_summaries(
+    cursor: Optional[str] = Query(default=None, description="Önceki sayfanın X-Next-Cursor değeri"),
+    limit: int = Depends(limit_query),
+    if_none_match_header: Optional[str] = Header(default=None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    list_workflows ile aynı sayfalama, fakat graph_json SQL seviyesinde hiç okunmaz.
+    Liste ekranları için.
+    """
+    query = keyset_page(
+        select(*models.WORKFLOW_SUMMARY_COLUMNS).where(models.Workflow.owner_id == current_user.id),
+        models.Workflow.created_at,
+        models.Workflow.id,
+        cursor,
+        limit,
+    )
+    result = await db.execute(query)
+    rows, next_cursor = split_page(result.all(), limit)
+    etag = page_etag(rows, next_cursor)
+    if if_none_match(if_none_match_header, etag):
+        return not_modified(etag)
+    headers = {ETAG_HEADER: etag}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows_response(rows, WORKFLOW_SUMMARY_FIELDS, headers)
+
+
+@router.get("/using-node", response_model=List[WorkflowSummary])
+async def list_workflows_using_node(
+    type: Optional[str] = Query(default=None, description="Node tipi (ör. http, ai)"),
+    provider: Optional[str] = Query(default=None, description="Provider adı veya id'si (ör. openai)"),
+    cursor: Optional[str] = Query(default=None, description="Önceki sayfanın X-Next-Cursor değeri"),
+    limit: int = Depends(limit_query),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Verilen tipte ve/veya provider'da node içeren workflow'lar (summary alanları).
+    graph_json taranmaz; workflow_nodes (type) / (provider) index'lerinden okunur.
+    """
+    if type is None and provider is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Either 'type' or 'provider' is required",
+        )
+    nodes = select(models.WorkflowNode.workflow_id)
+    if type is not None:
+        nodes = nodes.where(models.WorkflowNode.type == type)
+    if provider is not None:
+        nodes = nodes.where(models.WorkflowNode.provider == provider)
+
+    query = keyset_page(
+        select(*models.WORKFLOW_SUMMARY_COLUMNS).where(
+            models.Workflow.owner_id == current_user.id,
+            models.Workflow.id.in_(nodes),
+        ),
+        models.Workflow.created_at,
+        models.Workflow.id,
+        cursor,
+        limit,
+    )
+    result = await db.execute(query)
+    rows, next_cursor = split_page(result.all(), limit)
+    return rows_response(rows, WORKFLOW_SUMMARY_FIELDS, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+
+@router.get("/node-types")
+async def list_node_types(
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Kullanıcının workflow'larında kullanılan node tipleri: tip başına node ve workflow sayısı."""
+    node = models.WorkflowNode
+    result = await db.execute(
+        select(
+            node.type,
+            func.count().label("nodes"),
+            func.count(func.distinct(node.workflow_id)).label("workflows"),
+        )
+        .join(models.Workflow, models.Workflow.id == node.workflow_id)
+        .where(models.Workflow.owner_id == current_user.id)
+        .group_by(node.type)
+        .order_by(node.type)
+    )
+    return [row._mapping for row in result.all()]
 
 
 @router.post(
     "/", response_model=WorkflowRead, status_code=status.HTTP_201_CREATED
 )
-def create_workflow(
+async def create_workflow(
     payload: WorkflowCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ) -> WorkflowRead:
     """
     Giriş yapmış kullanıcı için yeni bir workflow yarat.
     owner_id dışarıdan gelmez, current_user'dan alınır.
     """
-    wf = models.Workflow(
-        name=payload.name,
-        description=payload.description,
-        graph_json=payload.graph_json,
-        is_active=payload.is_active,
-        owner_id=current_user.id,  # 👈 kritik nokta
-    )
-    db.add(wf)
-    db.commit()
-    db.refresh(wf)
+    async def _create(session: AsyncSession) -> models.Workflow:
+        wf = models.Workflow(
+            name=payload.name,
+            description=payload.description,
+            graph_json=payload.graph_json,
+            is_active=payload.is_active,
+            ai_cache_enabled=payload.ai_cache_enabled,
+            owner_id=current_user.id,  # 👈 kritik nokta
+        )
+        session.add(wf)
+        await session.flush()
+        await sync_workflow_nodes(session, wf.id, wf.graph_json)
+        return wf
+
+    wf = await run_write(_create)
+    scheduler.workflow_changed(wf.id)
+    response.headers[ETAG_HEADER] = workflow_etag(wf.id, wf.version)
     return wf
 
 
 @router.get("/{workflow_id}", response_model=WorkflowRead)
-def get_workflow(
+async def get_workflow(
     workflow_id: int,
-    db: Session = Depends(get_db),
+    if_none_match_header: Optional[str] = Header(default=None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
-) -> WorkflowRead:
+):
     """
     Tek bir workflow getir.
     Sadece sahibiyse görebilir.
+    If-None-Match güncel ETag ile eşleşirse graph_json okunmadan 304 döner.
     """
-    wf = (
-        db.query(models.Workflow)
-        .filter_by(id=workflow_id, owner_id=current_user.id)
-        .first()
+    if if_none_match_header:
+        result = await db.execute(
+            select(models.Workflow.version).filter_by(id=workflow_id, owner_id=current_user.id)
+        )
+        version = result.scalar_one_or_none()
+        if version is not None and if_none_match(if_none_match_header, workflow_etag(workflow_id, version)):
+            return not_modified(workflow_etag(workflow_id, version))
+
+    result = await db.execute(
+        select(*workflow_read_columns()).where(
+            models.Workflow.id == workflow_id, models.Workflow.owner_id == current_user.id
+        )
     )
-    if not wf:
+    row = result.first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Workflow not found",
         )
-    return wf
+    return workflow_response(row, {ETAG_HEADER: workflow_etag(row.id, row.version)})
 
 
 @router.put("/{workflow_id}", response_model=WorkflowRead)
-def update_workflow(
+async def update_workflow(
     workflow_id: int,
     payload: WorkflowUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(default=None, alias="If-Match"),
     current_user: models.User = Depends(get_current_user),
 ) -> WorkflowRead:
     """
     Workflow güncelle.
     Kullanıcı sadece kendi workflow'unu güncelleyebilir.
+    If-Match verilirse ve ETag eşleşmezse 412 (kayıp güncelleme engellenir).
     """
-    wf = (
-        db.query(models.Workflow)
-        .filter_by(id=workflow_id, owner_id=current_user.id)
-        .first()
-    )
-    if not wf:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Workflow not found",
+    update_data = payload.dict(exclude_unset=True)
+
+    async def _update(session: AsyncSession) -> models.Workflow:
+        result = await session.execute(
+            select(models.Workflow)
+            .filter_by(id=workflow_id, owner_id=current_user.id)
+            .options(undefer(models.Workflow.graph_json))
         )
+        wf = result.scalar_one_or_none()
+        if not wf:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workflow not found",
+            )
+        check_if_match(if_match, workflow_etag(wf.id, wf.version))
 
-    update_data = payload.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(wf, field, value)
+        for field, value in update_data.items():
+            setattr(wf, field, value)
+        wf.version += 1
+        if "graph_json" in update_data:
+            await sync_workflow_nodes(session, wf.id, wf.graph_json)
 
-    db.add(wf)
-    db.commit()
-    db.refresh(wf)
+        await session.flush()
+        return wf
+
+    wf = await run_write(_update)
+    invalidate_compiled_graph(workflow_id)
+    scheduler.workflow_changed(workflow_id)
+    response.headers[ETAG_HEADER] = workflow_etag(wf.id, wf.version)
+    return wf
+
+
+@router.patch("/{workflow_id}", response_model=WorkflowRead)
+async def patch_workflow(
+    workflow_id: int,
+    payload: WorkflowPatch,
+    response: Response,
+    if_match: Optional[str] = Header(default=None, alias="If-Match"),
+    current_user: models.User = Depends(get_current_user),
+) -> WorkflowRead:
+    """
+    graph_json'a RFC 6902 JSON Patch operasyonlarını uygula (editör autosave'i için).
+    İstemci sadece değişikliği ve elindeki version'ı gönderir; version eskiyse 409 döner.
+    Okuma, patch ve yazma tek transaction içinde yapılır.
+    """
+    operations = [op.dict(by_alias=True, exclude_unset=True) for op in payload.operations]
+
+    async def _patch(session: AsyncSession) -> models.Workflow:
+        result = await session.execute(
+            select(models.Workflow)
+            .filter_by(id=workflow_id, owner_id=current_user.id)
+            .options(undefer(models.Workflow.graph_json))
+        )
+        wf = result.scalar_one_or_none()
+        if not wf:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workflow not found",
+            )
+        if wf.version != payload.version:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Version conflict: current version is {wf.version}",
+            )
+        check_if_match(if_match, workflow_etag(wf.id, wf.version))
+
+        try:
+            graph_json = apply_patch(wf.graph_json or {}, operations)
+        except JsonPatchError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(exc),
+            )
+        if not isinstance(graph_json, dict):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="graph_json must remain an object",
+            )
+
+        wf.graph_json = graph_json
+        wf.version += 1
+        await sync_workflow_nodes(session, wf.id, graph_json)
+        await session.flush()
+        return wf
+
+    wf = await run_write(_patch)
+    invalidate_compiled_graph(workflow_id)
+    scheduler.workflow_changed(workflow_id)
+    response.headers[ETAG_HEADER] = workflow_etag(wf.id, wf.version)
     return wf
 
 
 @router.delete("/{workflow_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_workflow(
+async def delete_workflow(
     workflow_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ) -> None:
     """
     Workflow sil.
     Kullanıcı sadece kendi workflow'unu silebilir.
     """
-    wf = (
-        db.query(models.Workflow)
-        .filter_by(id=workflow_id, owner_id=current_user.id)
-        .first()
-    )
-    if not wf:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Workflow not found",
+
+    async def _delete(session: AsyncSession) -> None:
+        result = await session.execute(
+            select(models.Workflow).filter_by(id=workflow_id, owner_id=current_user.id)
         )
+        wf = result.scalar_one_or_none()
+        if not wf:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workflow not found",
+            )
+        await delete_workflow_memos(session, workflow_id)
+        await delete_workflow_nodes(session, workflow_id)
+        await session.delete(wf)
 
-    db.delete(wf)
-    db.commit()
+    await run_write(_delete)
+    invalidate_compiled_graph(workflow_id)
+    scheduler.workflow_changed(workflow_id)
     return None
@@ -0,0 +1,313 @@
+# app/run_queue.py
+"""
+SQLite üzerinde kalıcı run kuyruğu.
+
+Kuyruk ayrı bir tablo değil, workflow_runs satırlarıdır:
+    queued  --(claim: lease alınır, attempts+1)-->  running
+    running --(başarı / kalıcı hata)-------------->  success | failed
+    running --(geçici hata, deneme hakkı var)----->  queued (available_at = backoff)
+    running --(lease süresi doldu: worker öldü)--->  tekrar claim edilebilir
+
+Worker'lar (API içindeki gömülü worker ve/veya `python -m app.worker`) işleri
+toplu çeker, çalışırken heartbeat ile lease'i uzatır ve sonucu sadece lease hâlâ
+kendilerindeyse yazar. API tarafı sadece satırı kuyruğa ekler; istek süresi run
+süresinden bağımsızdır.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, undefer
+
+from app import models
+from app.blobstore import discard_payload, offload_payload, retain_payload
+from app.config import settings
+from app.db import AsyncReadSessionLocal, run_write
+from app.events import RUN_FINISHED, RUN_RETRY, RUN_STARTED, run_events
+from app.executor import execute_run, is_retryable
+
+logger = logging.getLogger(__name__)
+
+# Aynı process'teki worker'ları yeni iş eklendiğinde beklemeden uyandırır (event loop başına)
+_wakeup: Optional[asyncio.Event] = None
+_wakeup_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _wakeup_event() -> asyncio.Event:
+    global _wakeup, _wakeup_loop
+    loop = asyncio.get_running_loop()
+    if _wakeup is None or _wakeup_loop is not loop:
+        _wakeup, _wakeup_loop = asyncio.Event(), loop
+    return _wakeup
+
+
+def notify_workers() -> None:
+    if _wakeup is not None and _wakeup_loop is asyncio.get_running_loop():
+        _wakeup.set()
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def retry_delay(attempts: int) -> float:
+    delay = settings.RUN_RETRY_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return min(delay, settings.RUN_RETRY_BACKOFF_MAX_SECONDS)
+
+
+# ============================================================
+# Kuyruk operasyonları (yazma transaction'ı içinde çağrılır)
+# ============================================================
+async def add_run(
+    session: AsyncSession,
+    workflow_id: int,
+    stored_input: Any,
+    max_concurrency: Optional[int] = None,
+    force_full: bool = False,
+) -> models.WorkflowRun:
+    """Kuyruğa run satırı ekler. stored_input offload_payload()'dan geçmiş olmalı."""
+    run = models.WorkflowRun(
+        workflow_id=workflow_id,
+        status="queued",
+        input_data=stored_input,
+        output_data=None,
+        max_concurrency=max_concurrency,
+        force_full=force_full,
+        attempts=0,
+        max_attempts=settings.RUN_MAX_ATTEMPTS,
+        available_at=datetime.utcnow(),
+    )
+    session.add(run)
+    await retain_payload(session, stored_input)
+    await session.flush()
+    return run
+
+
+async def claim_runs(session: AsyncSession, worker_id: str, limit: int) -> List[int]:
+    """
+    Uygun en fazla `limit` run'ı tek UPDATE ... RETURNING ile bu worker'a kiralar.
+    Uygun: zamanı gelmiş queued run'lar + lease'i dolmuş running run'lar.
+    """
+    now = datetime.utcnow()
+    run = models.WorkflowRun
+
+    # Deneme hakkı bitmişken worker'ı ölen run'lar kalıcı olarak düşer
+    await session.execute(
+        update(run)
+        .where(run.status == "running", run.lease_expires_at < now, run.attempts >= run.max_attempts)
+        .values(
+            status="failed",
+            error_message="Worker lease expired",
+            finished_at=now,
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    eligible = (
+        select(run.id)
+        .where(
+            or_(
+                and_(run.status == "queued", run.available_at <= now),
+                and_(run.status == "running", run.lease_expires_at < now),
+            )
+        )
+        .order_by(run.available_at, run.id)
+        .limit(limit)
+    )
+    result = await session.execute(
+        update(run)
+        .where(run.id.in_(eligible.scalar_subquery()))
+        .values(
+            status="running",
+            lease_owner=worker_id,
+            lease_expires_at=now + timedelta(seconds=settings.RUN_LEASE_SECONDS),
+            heartbeat_at=now,
+            started_at=now,
+            attempts=run.attempts + 1,
+        )
+        .returning(run.id)
+        .execution_options(synchronize_session=False)
+    )
+    return sorted(result.scalars().all())
+
+
+async def extend_lease(session: AsyncSession, worker_id: str, run_ids: List[int]) -> None:
+    now = datetime.utcnow()
+    await session.execute(
+        update(models.WorkflowRun)
+        .where(models.WorkflowRun.id.in_(run_ids), models.WorkflowRun.lease_owner == worker_id)
+        .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=settings.RUN_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ============================================================
+# API tarafı
+# ============================================================
+async def enqueue_run(
+    workflow_id: int,
+    input_data: Optional[Dict[str, Any]] = None,
+    max_concurrency: Optional[int] = None,
+    force_full: bool = False,
+) -> models.WorkflowRun:
+    """Run'ı kuyruğa ekler ve hemen döner; çalıştırma worker'larda yapılır."""
+    stored_input = await offload_payload(input_data or {})
+    run = await run_write(
+        lambda session: add_run(session, workflow_id, stored_input, max_concurrency, force_full)
+    )
+    notify_workers()
+    return run
+
+
+# ============================================================
+# Worker tarafı
+# ============================================================
+async def _heartbeat(worker_id: str, run_id: int) -> None:
+    """Lease'i run bitene kadar uzatır; tek bir başarısız yazma döngüyü durdurmaz."""
+    interval = max(settings.RUN_LEASE_SECONDS / 3, 0.1)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_write(lambda session: extend_lease(session, worker_id, [run_id]))
+        except Exception:
+            logger.exception("Heartbeat for run %s failed; retrying in %.1fs", run_id, interval)
+
+
+async def process_run(run_id: int, worker_id: str) -> None:
+    """Kiralanmış tek run'ı çalıştırır ve sonucunu lease hâlâ bizdeyse yazar."""
+    async with AsyncReadSessionLocal() as db:
+        run = await db.get(
+            models.WorkflowRun,
+            run_id,
+            options=[undefer(models.WorkflowRun.input_data), undefer(models.WorkflowRun.output_data)],
+        )
+        workflow = None
+        if run is not None:
+            # graph_json yüklenmez: derlenmiş graph cache'te yoksa executor ayrıca okur
+            workflow = await db.get(
+                models.Workflow,
+                run.workflow_id,
+                options=[
+                    load_only(models.Workflow.owner_id, models.Workflow.ai_cache_enabled, models.Workflow.updated_at)
+                ],
+            )
+    if run is None:
+        return
+
+    run_events.publish(run_id, RUN_STARTED, attempt=run.attempts, max_attempts=run.max_attempts)
+    if workflow is None:
+        run.status = "failed"
+        run.error_message = "Workflow not found"
+        run.finished_at = datetime.utcnow()
+        error: Optional[BaseException] = None
+    else:
+        heartbeat = asyncio.create_task(_heartbeat(worker_id, run_id))
+        try:
+            error = await execute_run(run, workflow, run.max_concurrency)
+        finally:
+            heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat
+
+    values: Dict[str, Any] = {"lease_owner": None, "lease_expires_at": None, "error_message": run.error_message}
+    output: Any = None
+    if error is not None and is_retryable(error) and run.attempts < run.max_attempts:
+        values.update(
+            status="queued",
+            available_at=datetime.utcnow() + timedelta(seconds=retry_delay(run.attempts)),
+            finished_at=None,
+        )
+    else:
+        # Çıktı sadece kalıcı sonuçta blob store'a yazılır (retry denemeleri blob bırakmaz)
+        output = await offload_payload(run.output_data)
+        values.update(status=run.status, output_data=output, finished_at=run.finished_at)
+
+    async def _finish(session: AsyncSession) -> bool:
+        result = await session.execute(
+            update(models.WorkflowRun)
+            .where(models.WorkflowRun.id == run_id, models.WorkflowRun.lease_owner == worker_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False  # lease başka worker'a geçmiş; sonucu o yazacak
+        if "output_data" in values:
+            await retain_payload(session, output)
+        return True
+
+    if not await run_write(_finish):
+        logger.warning("Run %s lease lost by %s; result discarded", run_id, worker_id)
+        if "output_data" in values:
+            # retain edilmedi: offload'un yazdığı dosya geri alınır
+            await run_write(lambda session: discard_payload(session, output))
+        run_events.detach(run_id)
+    elif values["status"] == "queued":
+        run_events.publish(
+            run_id,
+            RUN_RETRY,
+            attempt=run.attempts,
+            error=run.error_message,
+            available_at=values["available_at"].isoformat(),
+        )
+        run_events.detach(run_id)
+    else:
+        run_events.publish(run_id, RUN_FINISHED, status=run.status, error=run.error_message)
+        run_events.close(run_id)
+
+
+async def run_worker(
+    worker_id: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    poll_interval: Optional[float] = None,
+    stop: Optional[asyncio.Event] = None,
+) -> None:
+    """
+    Worker döngüsü: boş slot oldukça iş çeker, en fazla batch_size run'ı aynı anda koşturur.
+    stop set edilince yeni iş almaz, eldekileri bitirip döner.
+    """
+    wakeup = _wakeup_event()
+    worker_id = worker_id or new_worker_id()
+    batch_size = max(1, batch_size or settings.WORKER_BATCH_SIZE)
+    poll_interval = poll_interval or settings.WORKER_POLL_INTERVAL_SECONDS
+    stop = stop or asyncio.Event()
+    inflight: Set[asyncio.Task] = set()
+
+    logger.info("Run worker %s started (batch=%s)", worker_id, batch_size)
+    try:
+        while not stop.is_set():
+            claimed: List[int] = []
+            free = batch_size - len(inflight)
+            if free > 0:
+                wakeup.clear()
+                try:
+                    claimed = await run_write(lambda session: claim_runs(session, worker_id, free))
+                except Exception:
+                    logger.exception("Run claim failed")
+                for run_id in claimed:
+                    task = asyncio.create_task(process_run(run_id, worker_id))
+                    inflight.add(task)
+                    task.add_done_callback(inflight.discard)
+            if claimed and len(inflight) < batch_size:
+                continue
+
+            # Yeni iş bildirimi, biten bir run veya poll süresi — hangisi önce gelirse
+            waiters = [asyncio.create_task(wakeup.wait()), asyncio.create_task(stop.wait())]
+            await asyncio.wait([*waiters, *inflight], timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+    finally:
+        if inflight:
+            results = await asyncio.gather(*inflight, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error("Run processing failed: %r", result)
+        logger.info("Run worker %s stopped", worker_id)
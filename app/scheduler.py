@@ -0,0 +1,279 @@
+# app/scheduler.py
+"""
+timer / cron node'larını zamanı gelince çalıştıran scheduler.
+
+- Aktif workflow'lardaki timer node'ları bir min-heap'te (sonraki çalışma zamanına göre)
+  tutulur; döngü sadece en yakın tetikleme zamanına kadar uyur, her tick'te tablo taranmaz.
+- Workflow create/update/patch/delete sonrası router'lar workflow_changed() çağırır;
+  başka process'lerde yapılan değişiklikler için updated_at > son_görülen sorgusu
+  (ix_workflows_updated_at) SCHEDULER_SYNC_SECONDS'ta bir çalışır.
+- Birden çok uvicorn worker'ı varsa sadece scheduler_locks satırını tutan lider
+  tetikler; lock SCHEDULER_LOCK_TTL_SECONDS içinde yenilenmezse başkası devralır.
+
+timer node data'sı:
+    {"cron": "*/5 * * * *"}          # UTC
+    {"interval_seconds": 300}         # veya "seconds" / "minutes"
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.config import settings
+from app.cron import CronError, CronExpression
+from app.db import AsyncReadSessionLocal, run_write
+from app.run_queue import enqueue_run, new_worker_id
+
+logger = logging.getLogger(__name__)
+
+TIMER_NODE_TYPES = ("timer", "cron", "schedule", "interval")
+LOCK_NAME = "scheduler"
+
+
+class TimerSpec:
+    __slots__ = ("node_id", "cron", "interval")
+
+    def __init__(self, node_id: str, cron: Optional[CronExpression] = None, interval: Optional[float] = None):
+        self.node_id = node_id
+        self.cron = cron
+        self.interval = interval
+
+    def next_after(self, moment: datetime) -> datetime:
+        if self.cron is not None:
+            return self.cron.next_after(moment)
+        return moment + timedelta(seconds=self.interval)
+
+
+def timer_specs(graph_json: Dict[str, Any]) -> List[TimerSpec]:
+    """graph_json'daki timer node'larını okur; geçersiz ayarlı node'lar loglanıp atlanır."""
+    specs: List[TimerSpec] = []
+    for node in (graph_json or {}).get("nodes") or []:
+        if not isinstance(node, dict) or node.get("type") not in TIMER_NODE_TYPES:
+            continue
+        config = node.get("data") or {}
+        try:
+            if config.get("cron"):
+                specs.append(TimerSpec(node["id"], cron=CronExpression(str(config["cron"]))))
+                continue
+            seconds = config.get("interval_seconds", config.get("seconds"))
+            if seconds is None and config.get("minutes") is not None:
+                seconds = float(config["minutes"]) * 60
+            if seconds is not None and float(seconds) > 0:
+                specs.append(TimerSpec(node["id"], interval=float(seconds)))
+        except (CronError, KeyError, TypeError, ValueError) as exc:
+            logger.warning("Skipping timer node %r: %s", node.get("id"), exc)
+    return specs
+
+
+# ============================================================
+# Liderlik (SQLite lock satırı)
+# ============================================================
+async def _acquire_lock(session: AsyncSession, owner: str) -> bool:
+    now = datetime.utcnow()
+    lock = models.SchedulerLock
+    stmt = sqlite_insert(lock).values(
+        name=LOCK_NAME,
+        owner=owner,
+        expires_at=now + timedelta(seconds=settings.SCHEDULER_LOCK_TTL_SECONDS),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[lock.name],
+        set_={"owner": stmt.excluded.owner, "expires_at": stmt.excluded.expires_at},
+        # Lock bizdeyse yenile, süresi dolmuşsa devral; aksi halde satır değişmez
+        where=or_(lock.owner == owner, lock.expires_at < now),
+    ).returning(lock.owner)
+    return (await session.execute(stmt)).first() is not None
+
+
+async def _release_lock(session: AsyncSession, owner: str) -> None:
+    lock = models.SchedulerLock
+    await session.execute(delete(lock).where(lock.name == LOCK_NAME, lock.owner == owner))
+
+
+class Scheduler:
+    def __init__(self):
+        self.owner = new_worker_id()
+        self.is_leader = False
+        self.fired = 0
+        # (due, seq, workflow_id, generation, spec)
+        self._heap: List[Tuple[datetime, int, int, int, TimerSpec]] = []
+        self._seq = itertools.count()
+        # workflow_id -> generation; değişen workflow'un heap'teki eski kayıtları bununla elenir
+        self._generation: Dict[int, int] = {}
+        self._seen_version: Dict[int, datetime] = {}
+        self._last_seen: Optional[datetime] = None
+        self._dirty: Set[int] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # ------------------------------------------------------------
+    # Router hook'ları
+    # ------------------------------------------------------------
+    def workflow_changed(self, workflow_id: int) -> None:
+        """Workflow eklendi / değişti / silindi: lider bu process'teyse hemen yeniden planlanır."""
+        self._dirty.add(workflow_id)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ------------------------------------------------------------
+    # Heap yönetimi
+    # ------------------------------------------------------------
+    def _schedule(self, workflow_id: int, specs: Iterable[TimerSpec], now: datetime) -> None:
+        generation = self._generation.get(workflow_id, 0) + 1
+        self._generation[workflow_id] = generation
+        for spec in specs:
+            heapq.heappush(self._heap, (spec.next_after(now), next(self._seq), workflow_id, generation, spec))
+
+    def _unschedule(self, workflow_id: int) -> None:
+        # Heap'ten silmek yerine generation artırılır; eski kayıtlar pop edilirken atlanır
+        self._generation[workflow_id] = self._generation.get(workflow_id, 0) + 1
+        self._seen_version.pop(workflow_id, None)
+
+    def _apply(self, rows, now: datetime, force: Set[int] = frozenset()) -> None:
+        for row in rows:
+            if self._seen_version.get(row.id) == row.updated_at and row.id not in force:
+                continue  # zaten bu sürümle planlı
+            self._unschedule(row.id)
+            self._seen_version[row.id] = row.updated_at
+            if row.is_active:
+                specs = timer_specs(row.graph_json)
+                if specs:
+                    self._schedule(row.id, specs, now)
+            if self._last_seen is None or (row.updated_at and row.updated_at > self._last_seen):
+                self._last_seen = row.updated_at
+
+    async def _load_all(self) -> None:
+        self._heap.clear()
+        self._generation.clear()
+        self._seen_version.clear()
+        self._dirty.clear()
+        self._last_seen = None
+        started = datetime.utcnow()
+        wf = models.Workflow
+        async with AsyncReadSessionLocal() as db:
+            rows = (await db.execute(select(wf.id, wf.graph_json, wf.is_active, wf.updated_at).where(wf.is_active.is_(True)))).all()
+        self._apply(rows, datetime.utcnow())
+        if self._last_seen is None:
+            self._last_seen = started
+        logger.info("Scheduler loaded %s timer(s)", len(self._heap))
+
+    async def _sync_changed(self) -> None:
+        wf = models.Workflow
+        dirty, self._dirty = self._dirty, set()
+        conditions = []
+        if self._last_seen is not None:
+            conditions.append(wf.updated_at >= self._last_seen)
+        if dirty:
+            conditions.append(wf.id.in_(dirty))
+        if not conditions:
+            return
+        async with AsyncReadSessionLocal() as db:
+            rows = (await db.execute(select(wf.id, wf.graph_json, wf.is_active, wf.updated_at).where(or_(*conditions)))).all()
+        # Hook'tan gelenler version aynı görünse de (aynı timestamp) yeniden planlanır
+        self._apply(rows, datetime.utcnow(), force=dirty)
+        for workflow_id in dirty - {row.id for row in rows}:
+            self._unschedule(workflow_id)  # silinmiş
+
+    # ------------------------------------------------------------
+    # Tetikleme
+    # ------------------------------------------------------------
+    async def _fire(self, workflow_id: int, spec: TimerSpec, due: datetime) -> None:
+        async with AsyncReadSessionLocal() as db:
+            active = (
+                await db.execute(select(models.Workflow.id).where(models.Workflow.id == workflow_id, models.Workflow.is_active.is_(True)))
+            ).scalar_one_or_none()
+        if active is None:
+            self._unschedule(workflow_id)
+            return
+        await enqueue_run(
+            workflow_id,
+            {"trigger": {"type": "schedule", "node_id": spec.node_id, "scheduled_at": due.isoformat()}},
+        )
+        self.fired += 1
+
+    async def _fire_due(self) -> None:
+        now = datetime.utcnow()
+        while self._heap and self._heap[0][0] <= now:
+            due, _, workflow_id, generation, spec = heapq.heappop(self._heap)
+            if self._generation.get(workflow_id) != generation:
+                continue
+            try:
+                await self._fire(workflow_id, spec, due)
+            except Exception:
+                logger.exception("Scheduled run for workflow %s failed to enqueue", workflow_id)
+            if self._generation.get(workflow_id) == generation:
+                # Geride kalındıysa kaçırılan tetiklemeler toplu atılmaz, bir sonrakinden devam edilir
+                next_due = spec.next_after(due)
+                if next_due <= now:
+                    next_due = spec.next_after(now)
+                heapq.heappush(self._heap, (next_due, next(self._seq), workflow_id, generation, spec))
+
+    # ------------------------------------------------------------
+    # Ana döngü
+    # ------------------------------------------------------------
+    async def run(self, stop: asyncio.Event) -> None:
+        self._wakeup = asyncio.Event()
+        renew_every = max(settings.SCHEDULER_LOCK_TTL_SECONDS / 3, 0.1)
+        next_renew = next_sync = datetime.utcnow()
+        try:
+            while not stop.is_set():
+                now = datetime.utcnow()
+                if now >= next_renew:
+                    try:
+                        leader = await run_write(lambda session: _acquire_lock(session, self.owner))
+                    except Exception:
+                        logger.exception("Scheduler lock renewal failed")
+                        leader = False
+                    next_renew = now + timedelta(seconds=renew_every)
+                    if leader and not self.is_leader:
+                        logger.info("Scheduler %s became leader", self.owner)
+                        await self._load_all()
+                        next_sync = now + timedelta(seconds=settings.SCHEDULER_SYNC_SECONDS)
+                    elif not leader and self.is_leader:
+                        logger.warning("Scheduler %s lost leadership", self.owner)
+                        self._heap.clear()
+                    self.is_leader = leader
+
+                if self.is_leader:
+                    if self._dirty or now >= next_sync:
+                        await self._sync_changed()
+                        if now >= next_sync:
+                            next_sync = now + timedelta(seconds=settings.SCHEDULER_SYNC_SECONDS)
+                    await self._fire_due()
+
+                # Bir sonraki olaya kadar uyu: en yakın timer, lock yenileme veya sync
+                wake_at = min(next_renew, next_sync) if self.is_leader else next_renew
+                if self.is_leader and self._heap:
+                    wake_at = min(wake_at, self._heap[0][0])
+                timeout = max((wake_at - datetime.utcnow()).total_seconds(), 0)
+                self._wakeup.clear()
+                waiters = [asyncio.create_task(self._wakeup.wait()), asyncio.create_task(stop.wait())]
+                await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in waiters:
+                    waiter.cancel()
+        finally:
+            if self.is_leader:
+                self.is_leader = False
+                try:
+                    await run_write(lambda session: _release_lock(session, self.owner))
+                except Exception:
+                    logger.exception("Scheduler lock release failed")
+
+    def stats(self) -> Dict[str, Any]:
+        live = [entry for entry in self._heap if self._generation.get(entry[2]) == entry[3]]
+        return {
+            "owner": self.owner,
+            "leader": self.is_leader,
+            "timers": len(live),
+            "next_due": min(entry[0] for entry in live).isoformat() if live else None,
+            "fired": self.fired,
+        }
+
+
+scheduler = Scheduler()
@@ -1,8 +1,8 @@
 # app/schemas.py
 from datetime import datetime
-from typing import Any, Optional, List, Dict
+from typing import Any, ClassVar, Optional, List, Dict, Literal, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # ==============================
@@ -15,6 +15,8 @@ class WorkflowBase(BaseModel):
     # React Flow graph (nodes + edges)
     graph_json: Dict[str, Any] = {}
     is_active: bool = True
+    # False -> ai node cevapları cache'ten okunmaz / cache'e yazılmaz
+    ai_cache_enabled: bool = True
 
 
 class WorkflowCreate(WorkflowBase):
@@ -27,11 +29,30 @@ class WorkflowUpdate(BaseModel):
     description: Optional[str] = None
     graph_json: Optional[Dict[str, Any]] = None
     is_active: Optional[bool] = None
+    ai_cache_enabled: Optional[bool] = None
+
+
+class JsonPatchOperation(BaseModel):
+    """RFC 6902 operasyonu; path'ler graph_json köküne göredir."""
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    from_: Optional[str] = Field(default=None, alias="from")
+    value: Any = None
+
+    class Config:
+        populate_by_name = True
+
+
+class WorkflowPatch(BaseModel):
+    # İstemcinin elindeki version; sunucudaki ile aynı değilse 409
+    version: int
+    operations: List[JsonPatchOperation] = Field(min_length=1)
 
 
 class WorkflowRead(WorkflowBase):
     id: int
     owner_id: Optional[int] = None
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -39,6 +60,57 @@ class WorkflowRead(WorkflowBase):
         orm_mode = True  # Pydantic v2 için uyarı verse de çalışıyor
 
 
+class WorkflowSummary(BaseModel):
+    """graph_json olmadan listeleme satırı."""
+    id: int
+    name: str
+    description: Optional[str] = None
+    is_active: bool = True
+    owner_id: Optional[int] = None
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class WorkflowSearchHit(BaseModel):
+    """FTS5 arama sonucu; *_highlight / *snippet alanlarında eşleşmeler <mark> ile işaretli."""
+    id: int
+    name: str
+    description: Optional[str] = None
+    is_active: bool = True
+    updated_at: Optional[datetime] = None
+    name_highlight: str
+    snippet: Optional[str] = None
+    labels_snippet: Optional[str] = None
+    score: float
+
+
+class ChatMessageSearchHit(BaseModel):
+    id: int
+    session_id: int
+    session_title: Optional[str] = None
+    role: str
+    timestamp: Optional[datetime] = None
+    snippet: str
+    score: float
+
+
+class WorkflowImport(BaseModel):
+    """Toplu import satırı (NDJSON / CSV, app/bulk.py)."""
+    json_fields: ClassVar[Tuple[str, ...]] = ("graph_json",)
+
+    name: str
+    description: Optional[str] = None
+    graph_json: Dict[str, Any] = {}
+    is_active: bool = True
+    ai_cache_enabled: bool = True
+    owner_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+
 class WorkflowList(BaseModel):
     items: List[WorkflowRead]
 
@@ -46,6 +118,104 @@ class WorkflowList(BaseModel):
         orm_mode = True
 
 
+# ==============================
+# Workflow Run Schemas
+# ==============================
+
+class WorkflowRunCreate(BaseModel):
+    input_data: Dict[str, Any] = {}
+    # Boş bırakılırsa settings.RUN_MAX_CONCURRENCY kullanılır
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    # True -> memo'lanmış node çıktıları kullanılmaz, tüm graph baştan çalışır
+    force_full: bool = False
+
+
+class WorkflowRunRead(BaseModel):
+    id: int
+    workflow_id: int
+    status: str
+    input_data: Optional[Dict[str, Any]] = None
+    output_data: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    attempts: int = 0
+    max_attempts: Optional[int] = None
+    force_full: bool = False
+    available_at: Optional[datetime] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class WorkflowRunSummary(BaseModel):
+    """Run geçmişi listesi: payload'lar (input/output) okunmaz."""
+    id: int
+    workflow_id: int
+    status: str
+    error_message: Optional[str] = None
+    attempts: int = 0
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class RunDailyHistory(BaseModel):
+    day: str
+    status: str
+    runs: int
+    avg_duration_seconds: Optional[float] = None
+
+
+# ==============================
+# Chat Schemas
+# ==============================
+
+class ChatSessionCreate(BaseModel):
+    title: Optional[str] = None
+
+
+class ChatSessionRead(BaseModel):
+    id: int
+    title: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class ChatMessageCreate(BaseModel):
+    role: Literal["user", "assistant", "system"]
+    content: str = Field(min_length=1)
+
+
+class ChatMessageAppend(BaseModel):
+    messages: List[ChatMessageCreate] = Field(min_length=1)
+
+
+class ChatMessageRead(BaseModel):
+    id: int
+    session_id: int
+    role: str
+    content: str
+    timestamp: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class ChatReplyRequest(BaseModel):
+    """content verilirse önce kullanıcı mesajı olarak eklenir, sonra asistan cevabı stream edilir."""
+    content: Optional[str] = None
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    system: Optional[str] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+
+
 # ==============================
 # Basit User / Token şemaları (ileride işine yarar)
 # ==============================
@@ -71,6 +241,20 @@ class UserRead(UserBase):
         orm_mode = True
 
 
+class UserAdminUpdate(BaseModel):
+    full_name: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class UserImport(BaseModel):
+    """Toplu import satırı; başka sistemden taşıma için parola hash'i hazır gelir."""
+    email: str
+    full_name: Optional[str] = None
+    password_hash: str = Field(min_length=1)
+    is_active: bool = True
+    created_at: Optional[datetime] = None
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -0,0 +1,229 @@
+# app/search.py
+"""
+SQLite FTS5 tam metin arama.
+
+İki FTS5 tablosu, rowid = kaynak satırın id'si:
+
+    workflows_fts(name, description, labels, owner)
+        labels: workflow_nodes.label'ların birleşimi (graph_json'daki node etiketleri)
+    chat_messages_fts(content, owner, session)
+
+Tablolar trigger'larla güncel tutulur (uygulama kodu FTS'e hiç yazmaz).
+owner ("u<id>") ve session ("s<id>") sütunları index'lenen token'lardır: kullanıcı
+sorgusu `owner:u5 AND (...)` olarak çalışır, yani sahiplik filtresi FTS posting
+list kesişimiyle yapılır; milyonlarca satırda başka kullanıcıların eşleşmeleri
+taranmaz. Yetki yine de asıl tablolarla join'de kontrol edilir.
+
+init_db() içinde install_search() çağrılır: tablolar / trigger'lar yoksa yaratılır,
+tablo yeni yaratıldıysa mevcut satırlar bir kez index'lenir.
+"""
+import re
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+_TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Sorgudaki kelimeler; FTS5 operatörleri kullanıcıdan alınmaz, her kelime tırnaklanır
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_WORKFLOW_LABELS = (
+    "(SELECT coalesce(group_concat(label, ' '), '') FROM workflow_nodes "
+    "WHERE workflow_id = {id} AND label IS NOT NULL)"
+)
+_CHAT_OWNER = "(SELECT 'u' || coalesce(user_id, 0) FROM chat_sessions WHERE id = {session_id})"
+
+_DDL: List[str] = [
+    # --- workflows ---
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS workflows_fts
+    USING fts5(name, description, labels, owner, tokenize = '{_TOKENIZER}')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS workflows_fts_ai AFTER INSERT ON workflows BEGIN
+        INSERT INTO workflows_fts(rowid, name, description, labels, owner)
+        VALUES (new.id, new.name, coalesce(new.description, ''),
+                {_WORKFLOW_LABELS.format(id="new.id")}, 'u' || coalesce(new.owner_id, 0));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS workflows_fts_au AFTER UPDATE OF name, description, owner_id ON workflows BEGIN
+        DELETE FROM workflows_fts WHERE rowid = old.id;
+        INSERT INTO workflows_fts(rowid, name, description, labels, owner)
+        VALUES (new.id, new.name, coalesce(new.description, ''),
+                {_WORKFLOW_LABELS.format(id="new.id")}, 'u' || coalesce(new.owner_id, 0));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS workflows_fts_ad AFTER DELETE ON workflows BEGIN
+        DELETE FROM workflows_fts WHERE rowid = old.id;
+    END
+    """,
+    # Node etiketleri değişince sadece labels sütunu yenilenir
+    f"""
+    CREATE TRIGGER IF NOT EXISTS workflow_nodes_fts_ai AFTER INSERT ON workflow_nodes
+    WHEN new.label IS NOT NULL BEGIN
+        UPDATE workflows_fts SET labels = {_WORKFLOW_LABELS.format(id="new.workflow_id")}
+        WHERE rowid = new.workflow_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS workflow_nodes_fts_au AFTER UPDATE OF label ON workflow_nodes
+    WHEN new.label IS NOT old.label BEGIN
+        UPDATE workflows_fts SET labels = {_WORKFLOW_LABELS.format(id="new.workflow_id")}
+        WHERE rowid = new.workflow_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS workflow_nodes_fts_ad AFTER DELETE ON workflow_nodes
+    WHEN old.label IS NOT NULL BEGIN
+        UPDATE workflows_fts SET labels = {_WORKFLOW_LABELS.format(id="old.workflow_id")}
+        WHERE rowid = old.workflow_id;
+    END
+    """,
+    # --- chat ---
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS chat_messages_fts
+    USING fts5(content, owner, session, tokenize = '{_TOKENIZER}')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS chat_messages_fts_ai AFTER INSERT ON chat_messages BEGIN
+        INSERT INTO chat_messages_fts(rowid, content, owner, session)
+        VALUES (new.id, new.content, coalesce({_CHAT_OWNER.format(session_id="new.session_id")}, 'u0'),
+                's' || coalesce(new.session_id, 0));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS chat_messages_fts_au AFTER UPDATE OF content, session_id ON chat_messages BEGIN
+        DELETE FROM chat_messages_fts WHERE rowid = old.id;
+        INSERT INTO chat_messages_fts(rowid, content, owner, session)
+        VALUES (new.id, new.content, coalesce({_CHAT_OWNER.format(session_id="new.session_id")}, 'u0'),
+                's' || coalesce(new.session_id, 0));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chat_messages_fts_ad AFTER DELETE ON chat_messages BEGIN
+        DELETE FROM chat_messages_fts WHERE rowid = old.id;
+    END
+    """,
+]
+
+# Tablo ilk kez yaratıldığında mevcut satırları index'le
+_BACKFILL = {
+    "workflows_fts": f"""
+        INSERT INTO workflows_fts(rowid, name, description, labels, owner)
+        SELECT id, name, coalesce(description, ''), {_WORKFLOW_LABELS.format(id="workflows.id")},
+               'u' || coalesce(owner_id, 0)
+        FROM workflows
+    """,
+    "chat_messages_fts": """
+        INSERT INTO chat_messages_fts(rowid, content, owner, session)
+        SELECT m.id, m.content, 'u' || coalesce(s.user_id, 0), 's' || coalesce(m.session_id, 0)
+        FROM chat_messages m LEFT JOIN chat_sessions s ON s.id = m.session_id
+    """,
+}
+
+
+def install_search(conn: Connection) -> None:
+    """FTS5 tablolarını ve trigger'larını yaratır (idempotent)."""
+    existing = {
+        row[0]
+        for row in conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('workflows_fts', 'chat_messages_fts')"
+        )
+    }
+    for statement in _DDL:
+        conn.exec_driver_sql(statement)
+    for table, backfill in _BACKFILL.items():
+        if table not in existing:
+            conn.exec_driver_sql(backfill)
+
+
+def fts_query(text: str, columns: Sequence[str], owner_id: int, session_id: Optional[int] = None) -> str:
+    """
+    Kullanıcı metnini güvenli bir FTS5 MATCH ifadesine çevirir.
+    Kelimeler AND ile bağlanır ve sadece `columns` içinde aranır (owner/session token'larında değil),
+    son kelime önek olarak aranır (yazarken arama). Kelime yoksa boş string döner.
+    """
+    terms = _TERM_RE.findall(text or "")
+    if not terms:
+        return ""
+    quoted = ['"{}"'.format(term.replace('"', '""')) for term in terms]
+    quoted[-1] += "*"
+    scope = [f"owner:u{int(owner_id)}"]
+    if session_id is not None:
+        scope.append(f"session:s{int(session_id)}")
+    return " AND ".join(scope + ["{{{}}} : ({})".format(" ".join(columns), " ".join(quoted))])
+
+
+_MARK_OPEN, _MARK_CLOSE, _ELLIPSIS = "<mark>", "</mark>", "…"
+
+# bm25 ağırlıkları sütun sırasıyla; owner/session 0 (her satırda eşleşir, sıralamaya katılmaz)
+_SEARCH_WORKFLOWS = text(
+    """
+    SELECT w.id, w.name, w.description, w.is_active, w.updated_at,
+           highlight(workflows_fts, 0, :open, :close) AS name_highlight,
+           snippet(workflows_fts, 1, :open, :close, :ellipsis, :tokens) AS snippet,
+           snippet(workflows_fts, 2, :open, :close, :ellipsis, :tokens) AS labels_snippet,
+           bm25(workflows_fts, 10.0, 4.0, 2.0, 0.0) AS score
+    FROM workflows_fts
+    JOIN workflows w ON w.id = workflows_fts.rowid
+    WHERE workflows_fts MATCH :query AND w.owner_id = :owner_id
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+    """
+)
+
+_SEARCH_CHAT = text(
+    """
+    SELECT m.id, m.session_id, s.title AS session_title, m.role, m.timestamp,
+           snippet(chat_messages_fts, 0, :open, :close, :ellipsis, :tokens) AS snippet,
+           bm25(chat_messages_fts, 1.0, 0.0, 0.0) AS score
+    FROM chat_messages_fts
+    JOIN chat_messages m ON m.id = chat_messages_fts.rowid
+    JOIN chat_sessions s ON s.id = m.session_id
+    WHERE chat_messages_fts MATCH :query AND s.user_id = :owner_id
+      AND (:session_id IS NULL OR m.session_id = :session_id)
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+    """
+)
+
+
+def _params(query: str, owner_id: int, limit: int, offset: int) -> dict:
+    return {
+        "query": query,
+        "owner_id": owner_id,
+        "limit": limit,
+        "offset": offset,
+        "open": _MARK_OPEN,
+        "close": _MARK_CLOSE,
+        "ellipsis": _ELLIPSIS,
+        "tokens": settings.SEARCH_SNIPPET_TOKENS,
+    }
+
+
+async def search_workflows(db: AsyncSession, owner_id: int, q: str, limit: int, offset: int = 0) -> list:
+    """Kullanıcının workflow'larında arama: ad > açıklama > node etiketleri ağırlığıyla bm25 sıralı."""
+    query = fts_query(q, ("name", "description", "labels"), owner_id)
+    if not query:
+        return []
+    result = await db.execute(_SEARCH_WORKFLOWS, _params(query, owner_id, limit, offset))
+    return [row._mapping for row in result.all()]
+
+
+async def search_chat_messages(
+    db: AsyncSession, owner_id: int, q: str, limit: int, offset: int = 0, session_id: Optional[int] = None
+) -> list:
+    """Kullanıcının chat mesajlarında arama (opsiyonel olarak tek session içinde)."""
+    query = fts_query(q, ("content",), owner_id, session_id)
+    if not query:
+        return []
+    params = _params(query, owner_id, limit, offset)
+    params["session_id"] = session_id
+    result = await db.execute(_SEARCH_CHAT, params)
+    return [row._mapping for row in result.all()]
@@ -1,14 +1,55 @@
 # app/security.py
+import hmac
+from typing import Optional
+
 from fastapi import Depends, Header, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import TTLCache
+from app.config import settings
 from app.db import get_db
 from app import models
 
 
-def get_current_user(
+# token -> aktif User (session'dan ayrılmış, sadece okunur kopya).
+# Cache hit'te get_current_user veritabanına hiç dokunmaz. Invalidation sadece bu process'te
+# geçerlidir; diğer process'lerde değişiklik en geç AUTH_USER_CACHE_TTL_SECONDS sonra görünür.
+user_cache = TTLCache(
+    maxsize=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Kullanıcıya ait tüm cache kayıtlarını düşür (güncelleme / pasifleştirme)."""
+    user_cache.invalidate_where(lambda token, user: user.id == user_id)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _on_user_changed(mapper, connection, target) -> None:
+    # ORM üzerinden yapılan her User güncellemesi (is_active dahil) cache'i temizler
+    invalidate_user(target.id)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")) -> None:
+    """Admin yazma endpoint'leri için: X-Admin-Token == settings.ADMIN_API_TOKEN."""
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled (ADMIN_API_TOKEN is not set)",
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_API_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token",
+        )
+
+
+async def get_current_user(
     authorization: str = Header(None, alias="Authorization"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> models.User:
     """
     Basit token auth:
@@ -36,6 +77,14 @@ def get_current_user(
             detail="Authorization must start with Bearer",
         )
 
+    return await authenticate_token(token, db)
+
+
+async def authenticate_token(token: str, db: AsyncSession) -> models.User:
+    """
+    Token'ı (şimdilik user_id) aktif kullanıcıya çözer.
+    Header okuyamayan yerler (WebSocket query param'ı gibi) doğrudan bunu kullanır.
+    """
     # Token = user_id
     try:
         user_id = int(token)
@@ -45,7 +94,12 @@ def get_current_user(
             detail="Invalid token format",
         )
 
-    user = db.query(models.User).filter_by(id=user_id).first()
+    user = user_cache.get(token)
+    if user is not None:
+        return user
+
+    result = await db.execute(select(models.User).filter_by(id=user_id))
+    user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,4 +115,6 @@ def get_current_user(
             detail="User account disabled",
         )
 
+    # Sadece aktif kullanıcılar cache'lenir
+    user_cache.set(token, user)
     return user
@@ -0,0 +1,89 @@
+# app/serialization.py
+"""
+Hızlı JSON cevapları (orjson).
+
+response_model'li bir endpoint ORM nesnesi döndürdüğünde FastAPI her satırı
+Pydantic ile doğrular (orm_mode -> from_attributes), jsonable_encoder'dan geçirir
+ve stdlib json ile yeniden encode eder. Büyük listelerde (özellikle graph_json)
+bu iş sorgunun kendisinden pahalı.
+
+Sıcak listeleme endpoint'leri bunun yerine:
+    - ORM nesnesi değil kolon tuple'ları seçer,
+    - satırları doğrudan orjson ile encode eder (datetime'lar Pydantic ile aynı ISO formatında),
+    - graph_json'u RawJSONBytes ile parse etmeden okuyup byte olarak cevaba ekler
+      (json.loads + json.dumps turu yok; sıkıştırılmışsa sadece zlib açılır).
+response_model şema dokümantasyonu için yerinde kalır; endpoint Response döndürdüğü
+için FastAPI doğrulama / encode adımını atlar. Header'lar bu Response'a verilmeli
+(inject edilen `response: Response` nesnesinin header'ları buna eklenmez).
+
+Diğer endpoint'ler app varsayılanı ORJSONResponse ile encode edilir.
+Ölçüm: python -m benchmarks.bench_serialization
+"""
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import orjson
+from fastapi import Response
+from sqlalchemy import type_coerce
+
+from app import models
+from app.column_types import RawJSONBytes
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(body: bytes, headers: Optional[Dict[str, str]] = None, status_code: int = 200) -> Response:
+    return Response(content=body, status_code=status_code, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def rows_response(
+    rows: Iterable[Any],
+    fields: Sequence[str],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Kolon tuple'larını (Row) `fields` sırasıyla JSON dizisine çevirir."""
+    return json_response(dumps([{field: getattr(row, field) for field in fields} for row in rows]), headers)
+
+
+# ============================================================
+# Workflow (graph_json ön-encode edilmiş byte'lar)
+# ============================================================
+# WorkflowRead alan sırası: graph_json bu iki grubun arasına eklenir
+_WORKFLOW_HEAD_FIELDS = ("name", "description")
+_WORKFLOW_TAIL_FIELDS = ("is_active", "ai_cache_enabled", "id", "owner_id", "version", "created_at", "updated_at")
+
+WORKFLOW_SUMMARY_FIELDS = tuple(column.key for column in models.WORKFLOW_SUMMARY_COLUMNS)
+
+
+def workflow_read_columns() -> tuple:
+    """WorkflowRead için kolonlar; graph_json decode edilmeden bytes olarak gelir."""
+    workflow = models.Workflow
+    return (
+        workflow.id,
+        workflow.name,
+        workflow.description,
+        workflow.is_active,
+        workflow.ai_cache_enabled,
+        workflow.owner_id,
+        workflow.version,
+        workflow.created_at,
+        workflow.updated_at,
+        type_coerce(workflow.graph_json, RawJSONBytes()).label("graph_json"),
+    )
+
+
+def encode_workflow(row: Any) -> bytes:
+    head = dumps({field: getattr(row, field) for field in _WORKFLOW_HEAD_FIELDS})
+    tail = dumps({field: getattr(row, field) for field in _WORKFLOW_TAIL_FIELDS})
+    return head[:-1] + b',"graph_json":' + (row.graph_json or b"{}") + b"," + tail[1:]
+
+
+def workflow_response(row: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    return json_response(encode_workflow(row), headers)
+
+
+def workflows_response(rows: Iterable[Any], headers: Optional[Dict[str, str]] = None) -> Response:
+    return json_response(b"[" + b",".join(encode_workflow(row) for row in rows) + b"]", headers)
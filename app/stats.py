@@ -0,0 +1,255 @@
+# app/stats.py
+"""
+Admin istatistikleri için artımlı sayaçlar.
+
+stat_counters(scope, key, value) tablosu users / workflows / workflow_runs üzerindeki
+trigger'larla her yazmada güncellenir; dashboard tabloları taramaz, birkaç satır okur.
+Trigger kullanıldığı için ORM, Core UPDATE, toplu import ve elle yapılan SQL
+değişiklikleri de sayılır.
+
+    users               total, active
+    workflows           total, active
+    workflows_by_owner  <owner_id> | none
+    runs_by_status      <status>
+    runs                total
+
+Sayaçlar yine de kayabilir (trigger'lar kurulmadan önceki veri, restore vb.);
+reconcile_stats() bunları tablolardan yeniden hesaplar. Uygulama içinde
+STATS_RECONCILE_SECONDS'ta bir çalışır, /admin/stats/reconcile ile elle de tetiklenir.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, case, cast, delete, func, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.config import settings
+from app.db import run_write
+
+logger = logging.getLogger(__name__)
+
+USERS = "users"
+WORKFLOWS = "workflows"
+WORKFLOWS_BY_OWNER = "workflows_by_owner"
+RUNS_BY_STATUS = "runs_by_status"
+RUNS = "runs"
+
+_OWNER_KEY = "coalesce(CAST({row}.owner_id AS TEXT), 'none')"
+_STATUS_KEY = "coalesce({row}.status, 'unknown')"
+
+
+def _bump(scope: str, key_sql: str, delta_sql: str) -> str:
+    return (
+        f"INSERT INTO stat_counters(scope, key, value) VALUES ('{scope}', {key_sql}, {delta_sql}) "
+        "ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+def _active(row: str) -> str:
+    return f"coalesce({row}.is_active, 0)"
+
+
+_TRIGGERS: List[str] = [
+    # --- users ---
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_users_ai AFTER INSERT ON users BEGIN
+        {_bump(USERS, "'total'", "1")}
+        {_bump(USERS, "'active'", _active("new"))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_users_ad AFTER DELETE ON users BEGIN
+        {_bump(USERS, "'total'", "-1")}
+        {_bump(USERS, "'active'", "-" + _active("old"))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_users_au AFTER UPDATE OF is_active ON users
+    WHEN {_active("new")} != {_active("old")} BEGIN
+        {_bump(USERS, "'active'", f"{_active('new')} - {_active('old')}")}
+    END
+    """,
+    # --- workflows ---
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_workflows_ai AFTER INSERT ON workflows BEGIN
+        {_bump(WORKFLOWS, "'total'", "1")}
+        {_bump(WORKFLOWS, "'active'", _active("new"))}
+        {_bump(WORKFLOWS_BY_OWNER, _OWNER_KEY.format(row="new"), "1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_workflows_ad AFTER DELETE ON workflows BEGIN
+        {_bump(WORKFLOWS, "'total'", "-1")}
+        {_bump(WORKFLOWS, "'active'", "-" + _active("old"))}
+        {_bump(WORKFLOWS_BY_OWNER, _OWNER_KEY.format(row="old"), "-1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_workflows_au_active AFTER UPDATE OF is_active ON workflows
+    WHEN {_active("new")} != {_active("old")} BEGIN
+        {_bump(WORKFLOWS, "'active'", f"{_active('new')} - {_active('old')}")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_workflows_au_owner AFTER UPDATE OF owner_id ON workflows
+    WHEN new.owner_id IS NOT old.owner_id BEGIN
+        {_bump(WORKFLOWS_BY_OWNER, _OWNER_KEY.format(row="old"), "-1")}
+        {_bump(WORKFLOWS_BY_OWNER, _OWNER_KEY.format(row="new"), "1")}
+    END
+    """,
+    # --- workflow_runs ---
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_runs_ai AFTER INSERT ON workflow_runs BEGIN
+        {_bump(RUNS, "'total'", "1")}
+        {_bump(RUNS_BY_STATUS, _STATUS_KEY.format(row="new"), "1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_runs_ad AFTER DELETE ON workflow_runs BEGIN
+        {_bump(RUNS, "'total'", "-1")}
+        {_bump(RUNS_BY_STATUS, _STATUS_KEY.format(row="old"), "-1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_runs_au AFTER UPDATE OF status ON workflow_runs
+    WHEN new.status IS NOT old.status BEGIN
+        {_bump(RUNS_BY_STATUS, _STATUS_KEY.format(row="old"), "-1")}
+        {_bump(RUNS_BY_STATUS, _STATUS_KEY.format(row="new"), "1")}
+    END
+    """,
+]
+
+
+def install_stat_triggers(conn: Connection) -> None:
+    """Trigger'ları yaratır (idempotent); sayaç tablosu boşsa ilk değerleri hesaplar."""
+    for statement in _TRIGGERS:
+        conn.exec_driver_sql(statement)
+    if conn.exec_driver_sql("SELECT 1 FROM stat_counters LIMIT 1").first() is None:
+        for scope, key, value in _count_queries_sync(conn):
+            conn.exec_driver_sql(
+                "INSERT INTO stat_counters(scope, key, value) VALUES (?, ?, ?)", (scope, key, value)
+            )
+
+
+# ============================================================
+# Reconciliation
+# ============================================================
+def _count_selects():
+    user, workflow, run = models.User, models.Workflow, models.WorkflowRun
+    active_user = func.coalesce(func.sum(case((func.coalesce(user.is_active, 0) != 0, 1), else_=0)), 0)
+    active_workflow = func.coalesce(func.sum(case((func.coalesce(workflow.is_active, 0) != 0, 1), else_=0)), 0)
+    return [
+        select(literal(USERS), literal("total"), func.count()).select_from(user),
+        select(literal(USERS), literal("active"), active_user),
+        select(literal(WORKFLOWS), literal("total"), func.count()).select_from(workflow),
+        select(literal(WORKFLOWS), literal("active"), active_workflow),
+        select(
+            literal(WORKFLOWS_BY_OWNER),
+            func.coalesce(cast(workflow.owner_id, String), "none"),
+            func.count(),
+        ).group_by(workflow.owner_id),
+        select(literal(RUNS), literal("total"), func.count()).select_from(run),
+        select(literal(RUNS_BY_STATUS), func.coalesce(run.status, "unknown"), func.count()).group_by(run.status),
+    ]
+
+
+def _count_queries_sync(conn: Connection) -> List[Tuple[str, str, int]]:
+    rows: List[Tuple[str, str, int]] = []
+    for query in _count_selects():
+        rows.extend((scope, str(key), int(value or 0)) for scope, key, value in conn.execute(query))
+    return rows
+
+
+async def reconcile_stats(session: AsyncSession) -> Dict[str, Any]:
+    """
+    Sayaçları tablolardan yeniden hesaplar ve farkları düzeltir (run_write içinde, tek transaction).
+    Düzeltilen sayaçları döner; normalde boş olmalı.
+    """
+    counter = models.StatCounter
+    actual: Dict[Tuple[str, str], int] = {}
+    for query in _count_selects():
+        for scope, key, value in (await session.execute(query)).all():
+            actual[(scope, str(key))] = int(value or 0)
+    stored = {
+        (scope, key): value
+        for scope, key, value in (await session.execute(select(counter.scope, counter.key, counter.value))).all()
+    }
+
+    drift = {
+        f"{scope}:{key}": {"stored": stored.get((scope, key), 0), "actual": value}
+        for (scope, key), value in actual.items()
+        if stored.get((scope, key), 0) != value
+    }
+    # Kaynağı kalmamış (ör. silinmiş owner) sayaçlar
+    for (scope, key), value in stored.items():
+        if (scope, key) not in actual and value != 0:
+            drift[f"{scope}:{key}"] = {"stored": value, "actual": 0}
+
+    stmt = sqlite_insert(counter)
+    stmt = stmt.on_conflict_do_update(index_elements=[counter.scope, counter.key], set_={"value": stmt.excluded.value})
+    if actual:
+        await session.execute(
+            stmt, [{"scope": scope, "key": key, "value": value} for (scope, key), value in actual.items()]
+        )
+    for scope, key in [item for item in stored if item not in actual]:
+        await session.execute(
+            delete(counter)
+            .where(counter.scope == scope, counter.key == key)
+            .execution_options(synchronize_session=False)
+        )
+    return {"counters": len(actual), "corrected": drift}
+
+
+async def run_stats_reconciler(stop: asyncio.Event, interval: Optional[float] = None) -> None:
+    """STATS_RECONCILE_SECONDS'ta bir reconcile_stats; kayma bulunursa loglar."""
+    interval = interval or settings.STATS_RECONCILE_SECONDS
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+            break
+        except asyncio.TimeoutError:
+            pass
+        try:
+            result = await run_write(reconcile_stats)
+        except Exception:
+            logger.exception("Stats reconciliation failed")
+            continue
+        if result["corrected"]:
+            logger.warning("Stats counters drifted, corrected: %s", result["corrected"])
+
+
+# ============================================================
+# Okuma
+# ============================================================
+async def read_summary(db: AsyncSession) -> Dict[str, Dict[str, int]]:
+    """Küçük scope'lar (owner bazlı hariç): birkaç satırlık PK okuması."""
+    counter = models.StatCounter
+    rows = (
+        await db.execute(
+            select(counter.scope, counter.key, counter.value).where(
+                counter.scope.in_((USERS, WORKFLOWS, RUNS, RUNS_BY_STATUS))
+            )
+        )
+    ).all()
+    summary: Dict[str, Dict[str, int]] = {USERS: {}, WORKFLOWS: {}, RUNS: {}, RUNS_BY_STATUS: {}}
+    for scope, key, value in rows:
+        if scope == RUNS_BY_STATUS and not value:
+            continue
+        summary[scope][key] = value
+    return summary
+
+
+async def read_workflows_by_owner(db: AsyncSession, limit: int, owner_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    counter = models.StatCounter
+    query = select(counter.key, counter.value).where(counter.scope == WORKFLOWS_BY_OWNER, counter.value > 0)
+    if owner_id is not None:
+        query = query.where(counter.key == str(owner_id))
+    rows = (await db.execute(query.order_by(counter.value.desc()).limit(limit))).all()
+    return [
+        {"owner_id": int(key) if key.isdigit() else None, "workflows": value}
+        for key, value in rows
+    ]
@@ -0,0 +1,74 @@
+# app/worker.py
+"""
+Run kuyruğu worker'ları (API process'inden bağımsız).
+
+    python -m app.worker --processes 4 --batch 8 [--poll-interval 1.0]
+
+Her process kendi event loop'unda run_worker() çalıştırır ve kuyruktan toplu iş
+çeker. Worker'lar arası koordinasyon tamamen SQLite üzerinden (lease) yapılır;
+bir process ölürse işleri lease süresi dolunca diğerleri alır.
+SIGTERM/SIGINT gelince yeni iş alınmaz, eldekiler bitirilip çıkılır.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+from typing import List
+
+from app.config import settings
+
+
+def _worker_main(batch_size: int, poll_interval: float) -> None:
+    # Ağır importlar alt process'te: her process kendi engine/write queue'sunu kurar
+    from app.db import dispose_engines, init_db
+    from app.http_clients import http_clients
+    from app.run_queue import run_worker
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    init_db()
+
+    async def _main() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        try:
+            await run_worker(batch_size=batch_size, poll_interval=poll_interval, stop=stop)
+        finally:
+            await http_clients.aclose()
+            await dispose_engines()
+
+    asyncio.run(_main())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.worker")
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--batch", type=int, default=settings.WORKER_BATCH_SIZE, help="Process başına eşzamanlı run")
+    parser.add_argument("--poll-interval", type=float, default=settings.WORKER_POLL_INTERVAL_SECONDS)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    processes: List[multiprocessing.Process] = [
+        ctx.Process(target=_worker_main, args=(args.batch, args.poll_interval), name=f"run-worker-{i}")
+        for i in range(max(1, args.processes))
+    ]
+    for proc in processes:
+        proc.start()
+
+    def _forward(signum, frame):
+        # Ana process'e gelen sinyal alt process'lere iletilir; onlar eldeki işi bitirip çıkar
+        for proc in processes:
+            if proc.is_alive():
+                os.kill(proc.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+    for proc in processes:
+        proc.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# app/workflow_nodes.py
+"""
+workflow_nodes: graph_json'daki node'ların denormalize index'i.
+
+"http node'u kullanan workflow'lar" veya "provider X'e dokunan workflow'lar" gibi
+sorgular her graph_json'ı okuyup taramak yerine (type) / (provider) index'lerinden
+cevaplanır. graph_json tek doğruluk kaynağıdır; bu tablo create / update / patch
+sırasında aynı transaction içinde node kümeleri karşılaştırılarak güncellenir:
+sadece eklenen node'lar insert, silinenler delete, değişenler update edilir.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.executor import DEFAULT_PROVIDER_BY_TYPE
+
+_SYNCED_FIELDS = ("type", "provider", "label", "config", "position_x", "position_y")
+
+
+def _position(node: Dict[str, Any], axis: str) -> int:
+    try:
+        return int(float((node.get("position") or {}).get(axis) or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def node_rows(graph_json: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    graph_json -> {node_id: satır alanları}.
+    Kayıt sırasında graph doğrulanmadığı için id'siz node'lar atlanır, tekrar eden id'de ilki kalır.
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    nodes = (graph_json or {}).get("nodes") if isinstance(graph_json, dict) else None
+    for node in nodes or []:
+        if not isinstance(node, dict) or not node.get("id"):
+            continue
+        node_id = str(node["id"])
+        if node_id in rows:
+            continue
+        node_type = str(node.get("type") or "unknown")
+        config = node.get("data") if isinstance(node.get("data"), dict) else {}
+        provider = config.get("provider", DEFAULT_PROVIDER_BY_TYPE.get(node_type))
+        label = config.get("label")
+        rows[node_id] = {
+            "type": node_type,
+            "provider": str(provider) if provider not in (None, "") else None,
+            "label": str(label) if label not in (None, "") else None,
+            "config": config,
+            "position_x": _position(node, "x"),
+            "position_y": _position(node, "y"),
+        }
+    return rows
+
+
+async def sync_workflow_nodes(session: AsyncSession, workflow_id: int, graph_json: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    workflow_nodes'u graph_json ile eşitler (çağıranın transaction'ı içinde).
+    Değişiklik sayılarını döner: {"inserted": .., "updated": .., "deleted": ..}.
+    """
+    table = models.WorkflowNode
+    wanted = node_rows(graph_json)
+    existing = (
+        await session.execute(
+            select(table.id, table.node_id, *(getattr(table, field) for field in _SYNCED_FIELDS)).where(
+                table.workflow_id == workflow_id
+            )
+        )
+    ).all()
+
+    stale: List[int] = []
+    changed: List[Dict[str, Any]] = []
+    for row in existing:
+        fields = wanted.pop(row.node_id, None)
+        if fields is None:
+            stale.append(row.id)
+        elif any(getattr(row, field) != fields[field] for field in _SYNCED_FIELDS):
+            changed.append({"id": row.id, **fields})
+
+    if stale:
+        await session.execute(
+            delete(table).where(table.id.in_(stale)).execution_options(synchronize_session=False)
+        )
+    if changed:
+        # Birincil anahtarlı toplu UPDATE (executemany)
+        await session.execute(update(table), changed)
+    if wanted:
+        await session.execute(
+            insert(table),
+            [{"workflow_id": workflow_id, "node_id": node_id, **fields} for node_id, fields in wanted.items()],
+        )
+    return {"inserted": len(wanted), "updated": len(changed), "deleted": len(stale)}
+
+
+async def delete_workflow_nodes(session: AsyncSession, workflow_id: int) -> None:
+    await session.execute(
+        delete(models.WorkflowNode)
+        .where(models.WorkflowNode.workflow_id == workflow_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rebuild_workflow_nodes(session: AsyncSession) -> Dict[str, int]:
+    """Tüm workflow'lar için yeniden eşitleme (tablo eklenmeden önce kaydedilmiş workflow'lar için)."""
+    totals = {"workflows": 0, "inserted": 0, "updated": 0, "deleted": 0}
+    rows = (await session.execute(select(models.Workflow.id, models.Workflow.graph_json))).all()
+    for workflow_id, graph_json in rows:
+        counts = await sync_workflow_nodes(session, workflow_id, graph_json)
+        totals["workflows"] += 1
+        for key, value in counts.items():
+            totals[key] += value
+    # Silinmiş workflow'lardan kalmış satırlar
+    orphans = await session.execute(
+        delete(models.WorkflowNode)
+        .where(models.WorkflowNode.workflow_id.not_in(select(models.Workflow.id)))
+        .execution_options(synchronize_session=False)
+    )
+    totals["deleted"] += orphans.rowcount or 0
+    return totals
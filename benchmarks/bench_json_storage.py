@@ -0,0 +1,113 @@
+# benchmarks/bench_json_storage.py
+"""
+CompressedJSON benchmark'ı: veritabanı boyutu ve listeleme sorgu hızı.
+
+    python -m benchmarks.bench_json_storage --workflows 2000 --nodes 150
+
+"plain"     : graph_json düz JSON metni (eski format)
+"compressed": graph_json CompressedJSON ile (eşik üstü zlib)
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+
+from app import models
+from app.db import Base
+
+
+def _graph(nodes: int, seed: int) -> dict:
+    return {
+        "nodes": [
+            {
+                "id": f"node-{i}",
+                "type": "ai" if i % 3 else "http",
+                "position": {"x": i * 40, "y": (i % 7) * 90},
+                "data": {
+                    "label": f"Step {i} of workflow {seed}",
+                    "prompt": "Summarize the incoming payload and extract action items.",
+                    "model": "gpt-4o-mini",
+                    "temperature": 0.2,
+                },
+            }
+            for i in range(nodes)
+        ],
+        "edges": [{"id": f"e{i}", "source": f"node-{i}", "target": f"node-{i + 1}"} for i in range(nodes - 1)],
+    }
+
+
+def _timed(conn, query, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(query).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def _run(mode: str, workflows: int, nodes: int, page: int, repeat: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="flowmind-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+
+    table = models.Workflow.__table__
+    base = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for i in range(workflows):
+            graph = _graph(nodes, i)
+            row = {
+                "name": f"workflow {i}",
+                "is_active": True,
+                "owner_id": 1,
+                "version": 1,
+                "created_at": base + timedelta(seconds=i),
+                "updated_at": base + timedelta(seconds=i),
+            }
+            if mode == "plain":
+                conn.exec_driver_sql(
+                    "INSERT INTO workflows (name, graph_json, is_active, owner_id, version, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (row["name"], json.dumps(graph), 1, 1, 1, row["created_at"].isoformat(" "), row["updated_at"].isoformat(" ")),
+                )
+            else:
+                conn.execute(table.insert().values(graph_json=graph, **row))
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+        full_page = select(models.Workflow.__table__).where(table.c.owner_id == 1).order_by(table.c.created_at.desc()).limit(page)
+        summary_page = (
+            select(*[col for col in table.c if col.name != "graph_json"])
+            .where(table.c.owner_id == 1)
+            .order_by(table.c.created_at.desc())
+            .limit(page)
+        )
+        full_ms = _timed(conn, full_page, repeat)
+        summary_ms = _timed(conn, summary_page, repeat)
+
+    engine.dispose()
+    return {
+        "db_size_mb": round(os.path.getsize(path) / 1024 / 1024, 2),
+        "full_page_ms": full_ms,
+        "summary_page_ms": summary_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=2000)
+    parser.add_argument("--nodes", type=int, default=150)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for mode in ("plain", "compressed"):
+        print(f"{mode:>10}: {_run(mode, args.workflows, args.nodes, args.page, args.repeat)}")
+
+
+if __name__ == "__main__":
+    main()
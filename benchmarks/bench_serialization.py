@@ -0,0 +1,139 @@
+# benchmarks/bench_serialization.py
+"""
+Workflow listeleme cevabı serileştirme benchmark'ı (p50 / p99 gecikme).
+
+    python -m benchmarks.bench_serialization --workflows 200 --nodes 150 --page 50 --requests 200
+
+"before": select(Workflow) + response_model=List[WorkflowRead]
+          (satır başına Pydantic doğrulaması, jsonable_encoder, stdlib json)
+"after" : kolon tuple'ları + orjson, graph_json parse edilmeden byte olarak eklenir
+          (app/serialization.py; GET /api/workflows/ bu yolu kullanır)
+Her iki endpoint de aynı sorguyu aynı okuma havuzundan çalıştırır; fark sadece serileştirme yolu.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import undefer
+
+from app import models
+from app.db import Base, create_async_engines
+from app.schemas import WorkflowRead
+from app.serialization import workflow_read_columns, workflows_response
+from benchmarks.bench_json_storage import _graph
+
+
+async def _prepare(write_engine, workflows: int, nodes: int) -> None:
+    base = datetime(2024, 1, 1)
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(models.User.__table__.insert(), [{"email": "bench@bench.local", "password_hash": "x"}])
+        await conn.execute(
+            models.Workflow.__table__.insert(),
+            [
+                {
+                    "name": f"workflow {i}",
+                    "description": f"Benchmark workflow {i}",
+                    "graph_json": _graph(nodes, i),
+                    "is_active": True,
+                    "owner_id": 1,
+                    "version": 1,
+                    "created_at": base + timedelta(seconds=i),
+                    "updated_at": base + timedelta(seconds=i),
+                }
+                for i in range(workflows)
+            ],
+        )
+
+
+def _bench_app(sessions: async_sessionmaker, page: int) -> FastAPI:
+    app = FastAPI()
+    order = (models.Workflow.created_at.desc(), models.Workflow.id.desc())
+
+    @app.get("/before", response_model=List[WorkflowRead])
+    async def before():
+        async with sessions() as db:
+            result = await db.execute(
+                select(models.Workflow)
+                .filter_by(owner_id=1)
+                .options(undefer(models.Workflow.graph_json))
+                .order_by(*order)
+                .limit(page)
+            )
+            return result.scalars().all()
+
+    @app.get("/after", response_model=List[WorkflowRead])
+    async def after():
+        async with sessions() as db:
+            result = await db.execute(
+                select(*workflow_read_columns()).where(models.Workflow.owner_id == 1).order_by(*order).limit(page)
+            )
+            return workflows_response(result.all())
+
+    return app
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def _measure(client: httpx.AsyncClient, path: str, requests: int) -> dict:
+    await client.get(path)  # ısınma
+    samples = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path)
+        samples.append((time.perf_counter() - started) * 1000)
+        size = len(response.content)
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "p99_ms": round(_percentile(samples, 0.99), 2),
+        "body_kb": round(size / 1024, 1),
+    }
+
+
+async def _run(workflows: int, nodes: int, page: int, requests: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="flowmind-bench-"), "bench.db")
+    write_engine, read_engine = create_async_engines(f"sqlite:///{path}")
+    await _prepare(write_engine, workflows, nodes)
+    sessions = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+    transport = httpx.ASGITransport(app=_bench_app(sessions, page))
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        before, after = (await client.get("/before")).json(), (await client.get("/after")).json()
+        assert before == after, "serialization paths disagree"
+        for label in ("before", "after"):
+            results[label] = await _measure(client, f"/{label}", requests)
+
+    await write_engine.dispose()
+    await read_engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=200)
+    parser.add_argument("--nodes", type=int, default=150)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    results = asyncio.run(_run(args.workflows, args.nodes, args.page, args.requests))
+    for label, result in results.items():
+        print(f"{label:>6}: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_storage.py
+"""
+SQLite storage profili için karışık okuma/yazma benchmark'ı.
+
+    python -m benchmarks.bench_storage --clients 64 --seconds 5 --write-ratio 0.2
+
+"before": varsayılan SQLite (rollback journal, NullPool, her yazma kendi commit'i)
+"after" : app.db storage profili (WAL + PRAGMA'lar, ayrı okuma havuzu, group-commit kuyruğu)
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app import models
+from app.db import Base, WriteQueue, create_async_engines
+
+
+async def _prepare(write_engine, users: int) -> None:
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            models.User.__table__.insert(),
+            [{"email": f"user{i}@bench.local", "password_hash": "x"} for i in range(users)],
+        )
+
+
+async def _run(tuned: bool, clients: int, seconds: float, write_ratio: float, users: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="flowmind-bench-"), "bench.db")
+    write_engine, read_engine = create_async_engines(f"sqlite:///{path}", tuned=tuned)
+    await _prepare(write_engine, users)
+
+    write_sessions = async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    read_sessions = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    queue = WriteQueue(write_sessions) if tuned else None
+
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def _write(user_id: int) -> None:
+        async def job(session: AsyncSession) -> None:
+            session.add(models.Workflow(name="bench", graph_json={"nodes": []}, owner_id=user_id))
+
+        if queue is not None:
+            await queue.submit(job)
+        else:
+            async with write_sessions() as session:
+                await job(session)
+                await session.commit()
+
+    async def _read(user_id: int) -> None:
+        async with read_sessions() as session:
+            await session.execute(select(models.User).filter_by(id=user_id))
+
+    async def client() -> None:
+        while time.perf_counter() < deadline:
+            user_id = random.randint(1, users)
+            try:
+                if random.random() < write_ratio:
+                    await _write(user_id)
+                    counts["writes"] += 1
+                else:
+                    await _read(user_id)
+                    counts["reads"] += 1
+            except OperationalError:
+                counts["locked"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    if queue is not None:
+        await queue.close()
+    await write_engine.dispose()
+    await read_engine.dispose()
+
+    counts["ops_per_sec"] = round((counts["reads"] + counts["writes"]) / elapsed, 1)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    for label, tuned in (("before", False), ("after", True)):
+        result = asyncio.run(_run(tuned, args.clients, args.seconds, args.write_ratio, args.users))
+        print(f"{label:>6}: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# tests/conftest.py
+"""Testler geçici bir SQLite dosyası ve blob dizini ile çalışır (app import edilmeden önce ayarlanır)."""
+import os
+import tempfile
+
+_root = tempfile.mkdtemp(prefix="flowmind-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_root, 'test.db')}"
+os.environ["BLOB_STORE_DIR"] = os.path.join(_root, "blobs")
+os.environ.setdefault("SCHEDULER_ENABLED", "0")
@@ -0,0 +1,56 @@
+# tests/test_maintenance.py
+import sys
+from datetime import datetime
+
+from app import models  # noqa: F401  (tüm tablolar metadata'da olsun)
+from app.column_types import CompressedJSON, decode_json, is_compressed
+from app.db import Base, engine, init_db
+from app.maintenance import _compressed_columns, main
+
+# JSON_COMPRESS_MIN_BYTES'tan büyük, düz metin olarak yazılacak değer
+PAYLOAD = {"text": "x" * 4096}
+PAYLOAD_TEXT = '{"text":"' + "x" * 4096 + '"}'
+
+_DEFAULTS = {int: 1, str: "x", bool: True, float: 0.0, bytes: b"x"}
+
+
+def _row(table) -> dict:
+    values = {}
+    for column in table.columns:
+        if isinstance(column.type, CompressedJSON):
+            values[column.name] = PAYLOAD
+        elif column.type.python_type is datetime:
+            values[column.name] = datetime.utcnow()
+        else:
+            values[column.name] = _DEFAULTS.get(column.type.python_type, "x")
+    return values
+
+
+def _seed_plain_json() -> None:
+    """Her tabloya bir satır ekler ve CompressedJSON kolonlarını eski (düz metin) formata çevirir."""
+    columns = _compressed_columns()
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            conn.execute(table.insert().values(**_row(table)))
+        for table, column in columns:
+            conn.exec_driver_sql(f"UPDATE {table} SET {column} = ?", (PAYLOAD_TEXT,))
+
+
+def test_compress_json_covers_full_schema(monkeypatch, capsys):
+    init_db()
+    columns = _compressed_columns()
+    # Birincil anahtarı `id` olmayan tablolar da kapsanmalı
+    assert ("ai_response_cache", "response") in columns
+    assert ("node_output_memo", "output") in columns
+
+    _seed_plain_json()
+    monkeypatch.setattr(sys, "argv", ["python -m app.maintenance", "compress-json", "--batch", "1"])
+    main()
+
+    output = capsys.readouterr().out
+    with engine.connect() as conn:
+        for table, column in columns:
+            assert f"{table}.{column}: 1 rows compressed" in output
+            stored = conn.exec_driver_sql(f"SELECT {column} FROM {table}").scalar_one()
+            assert is_compressed(stored), f"{table}.{column} was not compressed"
+            assert decode_json(stored) == PAYLOAD